@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Amaran Acceptance Test Harness
+==============================
+Runs the acceptance queries against one or more retrieval backends and
+records hard numbers per query: retrieval time, context assembly time,
+prompt size and whether the expected SOP section reached the context.
+
+Backends:
+  full    Whole corpus in context (current Markdown + LLM architecture)
+  bm25    Section-level BM25 pre-filter (sop_search_index.py)
+  vector  Chunk embeddings, exact cosine top-k (sop_chunker / sop_vector_index)
+
+The LLM is a local stub so timings isolate the retrieval side; answers
+are recorded for manual RAG Triad scoring. The JSON report has a stable
+schema so runs from different phase gates can be diffed.
+
+Usage:
+  python acceptance_harness.py ../../sops_markdown/ --gate "Phase 0" \
+      --output results/phase0.json
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "sop_conversion"))
+
+from sop_context_packer import estimate_tokens, split_front_matter  # noqa: E402
+from sop_search_index import tokenize, split_sections, update_index  # noqa: E402
+
+VERSION = "1.0.0"
+REPORT_SCHEMA = 1
+DEFAULT_QUERIES = Path(__file__).resolve().parent / "acceptance_queries.json"
+
+PROMPT_TEMPLATE = """You are the Amaran SOP assistant. Answer only from the SOP context below and cite the SOP number and section.
+
+=== SOP CONTEXT ===
+{context}
+=== END CONTEXT ===
+
+Question: {query}
+"""
+
+
+def _corpus_files(corpus_dir):
+    return [f for f in sorted(Path(corpus_dir).glob("*.md"))
+            if f.name.upper() != "README.MD"]
+
+
+# ================================================================
+# BACKENDS
+# ================================================================
+# Each backend implements prepare(corpus_dir) once and retrieve(query, k),
+# returning context items {"file", "sop_number", "heading", "text"}.
+
+class FullContextBackend:
+    """
+    Every document, whole, in every prompt. Items are the documents'
+    sections, so expected sections are scored the same way as for bm25.
+    """
+
+    name = "full"
+
+    def prepare(self, corpus_dir):
+        self.items = []
+        for f in _corpus_files(corpus_dir):
+            meta, body = split_front_matter(f.read_text(encoding="utf-8"))
+            title = str(meta.get("title", "") or f.stem)
+            for s in split_sections(body, title=title):
+                self.items.append({"file": f.name,
+                                   "sop_number": str(meta.get("sop_number", "")),
+                                   "heading": s["heading"],
+                                   "text": s["text"]})
+
+    def retrieve(self, query, k):
+        return self.items
+
+
+class BM25Backend:
+    """Top-k sections from the persistent BM25 index."""
+
+    name = "bm25"
+
+    def prepare(self, corpus_dir):
+        self.index, _ = update_index(corpus_dir)
+        # (file, heading line) -> section text, so retrieval never rereads files
+        self.texts = {}
+        for f in _corpus_files(corpus_dir):
+            content = f.read_text(encoding="utf-8")
+            _, body = split_front_matter(content)
+            first_line = content.count("\n", 0, len(content) - len(body)) + 1
+            for s in split_sections(body, first_line):
+                self.texts[(f.name, s["line"])] = s["text"]
+
+    def retrieve(self, query, k):
+        return [{"file": r["file"],
+                 "sop_number": r["sop_number"],
+                 "heading": r["heading"],
+                 "text": self.texts.get((r["file"], r["line"]), "")}
+                for r in self.index.search(query, k)]
+
+
+class VectorBackend:
+    """Top-k chunks by cosine similarity of offline hash embeddings."""
+
+    name = "vector"
+
+    def prepare(self, corpus_dir):
+        from sop_chunker import iter_corpus_chunks
+        from sop_vector_index import ExactIndex, hash_embed
+
+        self.embed = hash_embed
+        self.chunks = list(iter_corpus_chunks(corpus_dir))
+        self.index = ExactIndex(hash_embed([c["text"] for c in self.chunks]))
+
+    def retrieve(self, query, k):
+        idx, _ = self.index.search(self.embed([query])[0], k)
+        return [{"file": self.chunks[i]["source_file"],
+                 "sop_number": self.chunks[i]["sop_number"],
+                 "heading": " > ".join(self.chunks[i]["heading_path"]),
+                 "text": self.chunks[i]["text"]}
+                for i in idx]
+
+
+BACKENDS = {
+    FullContextBackend.name: FullContextBackend,
+    BM25Backend.name: BM25Backend,
+    VectorBackend.name: VectorBackend,
+}
+
+
+class StubLLM:
+    """
+    Local stand-in for the model: returns the context sentence sharing the
+    most terms with the question. Keeps runs offline and deterministic.
+    """
+
+    name = "stub-extractive"
+
+    def complete(self, prompt, query):
+        terms = set(tokenize(query))
+        context = prompt.split("=== END CONTEXT ===")[0]
+        best, best_score = "", 0
+        for sentence in re.split(r'(?<=[.!?。！？])\s+|\n+', context):
+            score = len(terms & set(tokenize(sentence)))
+            if score > best_score:
+                best, best_score = sentence.strip(), score
+        return best
+
+
+# ================================================================
+# SCORING
+# ================================================================
+def _sop_matches(expected, actual):
+    """Expected SOP number matches with or without a version suffix."""
+    expected, actual = expected.lower(), actual.lower()
+    return bool(expected) and (actual == expected
+                               or actual.startswith(expected + "."))
+
+
+def context_hit(expected, items):
+    """
+    True if any expected section is in the retrieved items, None if the
+    query has no scoreable expectation yet (sop_number still TBD). With
+    an expected section, only an item whose heading contains it counts.
+    """
+    targets = [e for e in expected
+               if e.get("sop_number") and e["sop_number"] != "TBD"]
+    if not targets:
+        return None
+    for e in targets:
+        section = e.get("section", "").lower()
+        for item in items:
+            if _sop_matches(e["sop_number"], item["sop_number"]) and (
+                    not section or section in item["heading"].lower()):
+                return True
+    return False
+
+
+def keyword_coverage(keywords, context):
+    """Fraction of expected keywords present in the assembled context."""
+    if not keywords:
+        return None
+    lowered = context.lower()
+    return round(sum(1 for kw in keywords if kw.lower() in lowered)
+                 / len(keywords), 3)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _fmt(value, spec):
+    """Summary value for the console table; "-" when there is none."""
+    return "-" if value is None else format(value, spec)
+
+
+def _summary(rows):
+    retrieval = [r["retrieval_ms"] for r in rows]
+    tokens = [r["prompt_tokens"] for r in rows]
+    hits = [r["context_hit"] for r in rows if r["context_hit"] is not None]
+    coverage = [r["keyword_coverage"] for r in rows
+                if r["keyword_coverage"] is not None]
+    return {
+        "queries": len(rows),
+        "retrieval_p50_ms": round(statistics.median(retrieval), 3) if rows else None,
+        "retrieval_max_ms": max(retrieval) if rows else None,
+        "assembly_mean_ms": round(statistics.mean(
+            r["assembly_ms"] for r in rows), 3) if rows else None,
+        "prompt_tokens_mean": round(statistics.mean(tokens)) if rows else None,
+        "prompt_tokens_max": max(tokens) if rows else None,
+        "context_hit_rate": round(sum(hits) / len(hits), 3) if hits else None,
+        "scored_queries": len(hits),
+        "keyword_coverage_mean": round(statistics.mean(coverage), 3) if coverage else None,
+    }
+
+
+# ================================================================
+# RUNNER
+# ================================================================
+def run_backend(backend, queries, k=5, llm=None):
+    """Run every query against one prepared backend."""
+    llm = llm or StubLLM()
+    rows = []
+    for q in queries:
+        t0 = time.perf_counter()
+        items = backend.retrieve(q["query"], k)
+        t1 = time.perf_counter()
+        context = "\n\n".join(
+            f"[{i['sop_number'] or i['file']}{' | ' + i['heading'] if i['heading'] else ''}]\n{i['text']}"
+            for i in items)
+        prompt = PROMPT_TEMPLATE.format(context=context, query=q["query"])
+        t2 = time.perf_counter()
+        answer = llm.complete(prompt, q["query"])
+        t3 = time.perf_counter()
+
+        rows.append({
+            "id": q["id"],
+            "query": q["query"],
+            "retrieval_ms": _ms(t1 - t0),
+            "assembly_ms": _ms(t2 - t1),
+            "llm_ms": _ms(t3 - t2),
+            "context_items": len(items),
+            "prompt_chars": len(prompt),
+            "prompt_tokens": estimate_tokens(prompt),
+            "retrieved": [{"file": i["file"], "sop_number": i["sop_number"],
+                           "heading": i["heading"]} for i in items[:k]],
+            "context_hit": context_hit(q.get("expected", []), items),
+            "keyword_coverage": keyword_coverage(q.get("expected_keywords", []),
+                                                 context),
+            "answer": answer,
+        })
+    return rows
+
+
+def run_harness(corpus_dir, queries_path=DEFAULT_QUERIES, backends=None,
+                k=5, gate=""):
+    """
+    Prepare each backend on the corpus, run all queries, return the report.
+    """
+    with open(queries_path, "r", encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+
+    files = _corpus_files(corpus_dir)
+    corpus_tokens = sum(estimate_tokens(f.read_text(encoding="utf-8"))
+                        for f in files)
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "harness_version": VERSION,
+        "gate": gate,
+        "run_at": datetime.now().isoformat(),
+        "corpus": {"path": str(corpus_dir), "documents": len(files),
+                   "estimated_tokens": corpus_tokens},
+        "queries_file": str(queries_path),
+        "k": k,
+        "llm": StubLLM.name,
+        "backends": {},
+    }
+
+    for name in backends or list(BACKENDS):
+        backend = BACKENDS[name]()
+        t0 = time.perf_counter()
+        backend.prepare(corpus_dir)
+        prepare_ms = _ms(time.perf_counter() - t0)
+        rows = run_backend(backend, queries, k)
+        report["backends"][name] = {
+            "prepare_ms": prepare_ms,
+            "summary": _summary(rows),
+            "queries": rows,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Amaran Acceptance Test Harness v{VERSION}")
+    parser.add_argument("corpus", help="Folder of converted SOP Markdown")
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES),
+                        help="Query definitions JSON")
+    parser.add_argument("--backend", nargs="+", choices=sorted(BACKENDS),
+                        help="Backends to run (default: all)")
+    parser.add_argument("-k", type=int, default=5,
+                        help="Items retrieved per query (bm25/vector)")
+    parser.add_argument("--gate", default="", help="Phase gate label, e.g. 'Phase 0'")
+    parser.add_argument("--output", "-o", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if not Path(args.corpus).is_dir():
+        print(f"Error: Folder not found: {args.corpus}")
+        return 1
+
+    report = run_harness(args.corpus, args.queries, args.backend, args.k, args.gate)
+
+    print("=" * 78)
+    print(f"Acceptance Harness v{VERSION}  {args.gate}")
+    print(f"Corpus: {report['corpus']['documents']} docs, "
+          f"~{report['corpus']['estimated_tokens']:,} tokens")
+    print("=" * 78)
+    print(f"{'backend':<8} {'prep ms':>9} {'ret p50':>8} {'ret max':>8} "
+          f"{'tok mean':>9} {'tok max':>9} {'hit':>6} {'kw cov':>7}")
+    for name, b in report["backends"].items():
+        s = b["summary"]
+        print(f"{name:<8} {b['prepare_ms']:>9.1f} "
+              f"{_fmt(s['retrieval_p50_ms'], '.2f'):>8} "
+              f"{_fmt(s['retrieval_max_ms'], '.2f'):>8} "
+              f"{_fmt(s['prompt_tokens_mean'], ','):>9} "
+              f"{_fmt(s['prompt_tokens_max'], ','):>9} "
+              f"{_fmt(s['context_hit_rate'], '.2f'):>6} "
+              f"{_fmt(s['keyword_coverage_mean'], '.2f'):>7}")
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nReport: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,22 +11,39 @@ Workflow:
   3. Tool converts pages to images, applies black-fill redactions
   4. Output: folder of redacted PNGs ready for Gemini upload
 
+Digital mode (--mode digital, or "mode": "digital" per document type)
+applies the same zones as true PDF redactions and writes one searchable
+PDF instead; only pages without a text layer are rasterised.
+
+Term detection (--terms names.txt, or "terms" per document type) replaces
+the measured zones with boxes around matching sponsor/product names,
+found in the text layer or by OCR on scanned pages.
+
+Every run ends with a pixel check that each zone in the output is solid
+black; failures set "not_for_upload" in redaction_log.json.
+
 Dependencies:
-  pip install pdf2image Pillow
+  pip install pdf2image Pillow numpy
   + Poppler binaries (see README)
+  pip install pymupdf (digital mode / term detection)
+  pip install pytesseract + Tesseract (term detection on scanned pages)
 """
 
+import glob
 import json
+import math
+import re
 import sys
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
 try:
-    from pdf2image import convert_from_path
-    from PIL import Image, ImageDraw, ImageFont
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    from PIL import Image, ImageDraw, ImageFont, TiffImagePlugin
 except ImportError:
     print("Missing dependencies. Run:")
     print("  pip install pdf2image Pillow")
@@ -34,8 +51,39 @@ except ImportError:
 
 VERSION = "1.0.0"
 DEFAULT_DPI = 300
+# Resolution the pixel values in redaction_config.json are measured at.
+# Rendering at any other DPI scales every zone by dpi / CONFIG_DPI.
+CONFIG_DPI = 300
+# Pages rendered per Poppler call. Peak memory ~= window x one page bitmap
+# (~26 MB for A4 RGB at 300 DPI), independent of document length.
+DEFAULT_PAGE_WINDOW = 4
 CONFIG_FILE = "redaction_config.json"
 
+# Output encoding. Default reproduces v1.0 behaviour (RGB PNG, optimize=True).
+#   format:    png | jpeg | webp  -> one file per page
+#              tiff | pdf         -> single multipage bundle
+#   color:     rgb | gray | bw (1-bit, threshold at bw_threshold)
+#   png_level: zlib level 0-9; None = optimize=True (slowest, smallest)
+#   quality:   JPEG/WebP quality 1-100
+DEFAULT_OUTPUT = {
+    "format": "png",
+    "color": "rgb",
+    "png_level": None,
+    "quality": 85,
+    "bw_threshold": 160,
+}
+PAGE_FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+BUNDLE_FORMATS = {"tiff": ".tif", "pdf": ".pdf"}
+BUNDLE_PAGES_DIR = "_pages"
+
+POPPLER_HINT = (
+    "If Poppler is not installed:\n"
+    "  Windows: Download from github.com/osber/poppler/releases\n"
+    "           Extract, add bin/ folder to system PATH\n"
+    "  Mac: brew install poppler\n"
+    "  Linux: apt install poppler-utils"
+)
+
 
 def load_config():
     """Load redaction zone config from JSON file."""
@@ -56,35 +104,32 @@ def load_config():
     return {k: v for k, v in config.items() if not k.startswith("_")}
 
 
-def redact_page(img, zones, is_cover=False, header_cfg=None, footer_cfg=None):
-    """
-    Apply black rectangles to a single page image.
+def zone_scale(dpi):
+    """Factor converting config pixels (at CONFIG_DPI) to render pixels."""
+    return dpi / CONFIG_DPI
 
-    Args:
-        img: PIL Image
-        zones: list of cover page zones (applied only if is_cover=True)
-        is_cover: whether this is the cover page
-        header_cfg: {"enabled": bool, "height_px": int}
-        footer_cfg: {"enabled": bool, "height_px": int}
 
-    Returns:
-        Modified PIL Image
+def page_zones(zones, is_cover, header_cfg, footer_cfg, width, height,
+               scale=1.0, snap=True):
     """
-    draw = ImageDraw.Draw(img)
-    w, h = img.size
-    count = 0
+    Redaction boxes (x0, y0, x1, y1) for one page of the given size.
+
+    scale converts config pixels to the target unit: render DPI / CONFIG_DPI
+    for bitmaps, 72 / CONFIG_DPI for PDF points. With snap=True boxes are
+    rounded outwards to whole pixels so a lower DPI never shrinks them.
+    """
+    lo = math.floor if snap else float
+    hi = math.ceil if snap else float
+    boxes = []
 
     # Header redaction (every page)
     if header_cfg and header_cfg.get("enabled"):
-        hh = header_cfg.get("height_px", 150)
-        draw.rectangle([0, 0, w, hh], fill="black")
-        count += 1
+        boxes.append((0, 0, width, hi(header_cfg.get("height_px", 150) * scale)))
 
     # Footer redaction (every page)
     if footer_cfg and footer_cfg.get("enabled"):
-        fh = footer_cfg.get("height_px", 100)
-        draw.rectangle([0, h - fh, w, h], fill="black")
-        count += 1
+        fh = hi(footer_cfg.get("height_px", 100) * scale)
+        boxes.append((0, height - fh, width, height))
 
     # Cover page specific zones
     if is_cover and zones:
@@ -93,28 +138,63 @@ def redact_page(img, zones, is_cover=False, header_cfg=None, footer_cfg=None):
             y = zone.get("y", 0)
             zw = zone.get("w", 500)
             zh = zone.get("h", 100)
-            draw.rectangle([x, y, x + zw, y + zh], fill="black")
-            count += 1
+            boxes.append((lo(x * scale), lo(y * scale),
+                          hi((x + zw) * scale), hi((y + zh) * scale)))
+    return boxes
 
-    return img, count
 
+def redact_page(img, zones, is_cover=False, header_cfg=None, footer_cfg=None,
+                scale=1.0):
+    """
+    Apply black rectangles to a single page image.
 
-def add_redaction_stamp(img, page_num, doc_type):
-    """Add small stamp at bottom-right indicating redaction was applied."""
+    Args:
+        img: PIL Image
+        zones: list of cover page zones (applied only if is_cover=True)
+        is_cover: whether this is the cover page
+        header_cfg: {"enabled": bool, "height_px": int}
+        footer_cfg: {"enabled": bool, "height_px": int}
+        scale: render DPI / CONFIG_DPI. Boxes are rounded outwards so a
+               lower DPI never shrinks the redacted area.
+
+    Returns:
+        Modified PIL Image
+    """
     draw = ImageDraw.Draw(img)
     w, h = img.size
+    boxes = page_zones(zones, is_cover, header_cfg, footer_cfg, w, h, scale)
+    for box in boxes:
+        draw.rectangle(list(box), fill="black")
+    return img, len(boxes)
+
+
+def _stamp_layout(page_num, doc_type, scale=1.0):
+    """Text, font, text size and margin of the bitmap redaction stamp."""
     stamp = f"REDACTED | {doc_type} | p.{page_num} | {datetime.now().strftime('%Y-%m-%d')}"
 
     try:
-        font = ImageFont.truetype("arial.ttf", 18)
+        font = ImageFont.truetype("arial.ttf", max(8, round(18 * scale)))
     except (OSError, IOError):
         font = ImageFont.load_default()
 
+    bbox = font.getbbox(stamp)
+    margin = max(4, round(10 * scale))
+    return stamp, font, bbox[2] - bbox[0], bbox[3] - bbox[1], margin
+
+
+def stamp_box(width, height, page_num, doc_type, scale=1.0):
+    """Pixel box add_redaction_stamp() paints white on a page of this size."""
+    _, _, tw, th, margin = _stamp_layout(page_num, doc_type, scale)
+    return (width - tw - margin * 2, height - th - margin * 2, width, height)
+
+
+def add_redaction_stamp(img, page_num, doc_type, scale=1.0):
+    """Add small stamp at bottom-right indicating redaction was applied."""
+    draw = ImageDraw.Draw(img)
+    w, h = img.size
+    stamp, font, tw, th, margin = _stamp_layout(page_num, doc_type, scale)
+
     # Semi-transparent stamp area
-    bbox = draw.textbbox((0, 0), stamp, font=font)
-    tw = bbox[2] - bbox[0]
-    th = bbox[3] - bbox[1]
-    margin = 10
     draw.rectangle(
         [w - tw - margin * 2, h - th - margin * 2, w, h],
         fill="white"
@@ -126,9 +206,541 @@ def add_redaction_stamp(img, page_num, doc_type):
     return img
 
 
+def get_page_count(pdf_path):
+    """Read page count via pdfinfo without rendering anything."""
+    try:
+        info = pdfinfo_from_path(str(pdf_path))
+    except Exception as e:
+        raise RuntimeError(f"Cannot read PDF info: {e}\n\n{POPPLER_HINT}")
+    return int(info["Pages"])
+
+
+def page_windows(page_numbers, window=DEFAULT_PAGE_WINDOW):
+    """
+    Group page numbers into runs of consecutive pages, at most `window` long.
+
+    Example: [1, 2, 4, 5, 6], window=2 -> [[1, 2], [4, 5], [6]]
+    """
+    page_numbers = sorted(page_numbers)
+    window = max(1, window)
+    runs = []
+    for page_num in page_numbers:
+        if (runs and len(runs[-1]) < window
+                and runs[-1][-1] + 1 == page_num):
+            runs[-1].append(page_num)
+        else:
+            runs.append([page_num])
+    return runs
+
+
+def iter_page_images(pdf_path, page_numbers, dpi=DEFAULT_DPI,
+                     window=DEFAULT_PAGE_WINDOW, thread_count=1):
+    """
+    Render pages a small window at a time.
+
+    Each Poppler call covers one run from page_windows(), so only that
+    run's bitmaps are alive at once.
+
+    Yields:
+        (page_num, PIL Image) in ascending page order
+    """
+    for run in page_windows(page_numbers, window):
+        first, last = run[0], run[-1]
+        try:
+            images = convert_from_path(str(pdf_path), dpi=dpi, fmt="png",
+                                       first_page=first, last_page=last,
+                                       thread_count=thread_count)
+        except Exception as e:
+            raise RuntimeError(f"PDF conversion failed: {e}\n\n{POPPLER_HINT}")
+
+        for offset in range(len(images)):
+            # Hand over ownership so each bitmap is freed once the caller is done
+            img = images[offset]
+            images[offset] = None
+            yield first + offset, img
+
+
+def resolve_output_cfg(output_cfg=None):
+    """Merge user output options over DEFAULT_OUTPUT and validate them."""
+    cfg = dict(DEFAULT_OUTPUT)
+    cfg.update({k: v for k, v in (output_cfg or {}).items() if v is not None})
+    fmt = cfg["format"] = cfg["format"].lower().replace("jpg", "jpeg")
+    if fmt not in PAGE_FORMATS and fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    if cfg["color"] not in ("rgb", "gray", "bw"):
+        raise ValueError(f"Unknown color mode: {cfg['color']}")
+    return cfg
+
+
+def convert_color(img, output_cfg):
+    """Apply the configured color reduction (redaction fill stays black)."""
+    color = output_cfg["color"]
+    if color == "gray":
+        return img.convert("L")
+    if color == "bw":
+        threshold = output_cfg["bw_threshold"]
+        return img.convert("L").point(
+            lambda v: 255 if v >= threshold else 0, mode="1")
+    return img.convert("RGB") if img.mode != "RGB" else img
+
+
+def save_page(img, out_base, output_cfg):
+    """
+    Encode one page. Bundle formats write a fast lossless PNG intermediate
+    that assemble_bundle() later stitches into the multipage file.
+
+    Returns:
+        path of the written file
+    """
+    fmt = output_cfg["format"]
+
+    if fmt in BUNDLE_FORMATS:
+        out_path = out_base.with_suffix(".png")
+        img.save(str(out_path), "PNG", compress_level=1)
+    elif fmt == "png":
+        out_path = out_base.with_suffix(PAGE_FORMATS[fmt])
+        level = output_cfg["png_level"]
+        if level is None:
+            img.save(str(out_path), "PNG", optimize=True)
+        else:
+            img.save(str(out_path), "PNG", compress_level=int(level))
+    else:
+        out_path = out_base.with_suffix(PAGE_FORMATS[fmt])
+        if fmt == "jpeg" and img.mode == "1":
+            img = img.convert("L")
+        img.save(str(out_path), fmt.upper(),
+                 quality=int(output_cfg["quality"]))
+    return out_path
+
+
+def assemble_bundle(page_files, bundle_path, output_cfg, dpi):
+    """
+    Stitch per-page intermediates into one multipage TIFF or PDF.
+
+    Pages are opened and appended one at a time, so memory stays bounded
+    by a single page regardless of document length.
+    """
+    fmt = output_cfg["format"]
+    if fmt == "tiff":
+        with TiffImagePlugin.AppendingTiffWriter(str(bundle_path), True) as tf:
+            for page_file in page_files:
+                with Image.open(page_file) as im:
+                    compression = ("group4" if im.mode == "1"
+                                   else "tiff_deflate")
+                    im.save(tf, "TIFF", compression=compression,
+                            dpi=(dpi, dpi))
+                tf.newFrame()
+    else:
+        for i, page_file in enumerate(page_files):
+            with Image.open(page_file) as im:
+                im.save(str(bundle_path), "PDF", resolution=dpi,
+                        append=(i > 0))
+
+
+def redact_and_save(img, page_num, doc_type, doc_cfg, output_dir,
+                    add_stamp=True, output_cfg=None, dpi=DEFAULT_DPI,
+                    terms=None, word_boxes=None):
+    """
+    Redact one rendered page, encode it per output_cfg and release the bitmap.
+
+    terms/word_boxes switch to term detection (see _redact_bitmap).
+
+    Returns:
+        (output file path, number of zones applied, zone source,
+         detected pixel boxes)
+    """
+    output_cfg = output_cfg or DEFAULT_OUTPUT
+    img, zone_count, source, boxes = _redact_bitmap(img, page_num, doc_cfg,
+                                                    dpi, terms, word_boxes)
+
+    if add_stamp and zone_count > 0:
+        img = add_redaction_stamp(img, page_num, doc_type, zone_scale(dpi))
+
+    out_img = convert_color(img, output_cfg)
+    out_path = save_page(out_img, Path(output_dir) / f"p{page_num:03d}",
+                         output_cfg)
+    out_img.close()
+    img.close()
+    return str(out_path), zone_count, source, boxes
+
+
+def _redact_window(pdf_path, run, dpi, doc_type, doc_cfg, output_dir,
+                   add_stamp, output_cfg=None, terms=None, detected=None):
+    """Process-pool task: render one run of pages, redact and save each."""
+    results = []
+    for page_num, img in iter_page_images(pdf_path, run, dpi,
+                                          window=len(run)):
+        out_path, zone_count, source, boxes = redact_and_save(
+            img, page_num, doc_type, doc_cfg, output_dir, add_stamp,
+            output_cfg, dpi, terms, (detected or {}).get(page_num))
+        results.append((page_num, out_path, zone_count, source, boxes))
+    return results
+
+
+# ================================================================
+# TERM DETECTION (text-anchored zones instead of measured rectangles)
+# ================================================================
+# With a dictionary of sponsor/product names only the matching words are
+# blacked out. The text layer is searched once per document before any
+# page is rendered; pages without one get a fast Tesseract pass over the
+# rendered bitmap. A page where neither works falls back to the configured
+# zones, so a missing OCR install never lets a name through.
+
+# Outward margin around each detected word box
+DETECT_PADDING_PT = 1
+DETECT_OCR_LANG = "chi_tra+eng"
+
+
+def load_terms(path):
+    """Read a name dictionary: one term per line, '#' starts a comment."""
+    terms = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                terms.append(line)
+    return terms
+
+
+@lru_cache(maxsize=16)
+def compile_terms(terms):
+    """
+    One case-insensitive regex for a tuple of terms (longest first, any
+    whitespace between words). Cached, so each pool worker compiles a
+    dictionary once however many pages it handles.
+    """
+    parts = []
+    for term in sorted({t.strip() for t in terms if t.strip()},
+                       key=len, reverse=True):
+        pattern = r'\s+'.join(re.escape(w) for w in term.split())
+        # Whole words for Latin names; CJK names match inside longer runs
+        if term[0].isascii() and term[0].isalnum():
+            pattern = r'(?<!\w)' + pattern
+        if term[-1].isascii() and term[-1].isalnum():
+            pattern += r'(?!\w)'
+        parts.append(pattern)
+    return re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+
+def text_layer_hits(page, terms):
+    """
+    Rects (unrotated page points) of every term on a PyMuPDF page, or None
+    if the page has no usable text layer or a match cannot be located.
+    """
+    text = page.get_text("text")
+    if len(text.strip()) < MIN_TEXT_CHARS:
+        return None
+    pattern = compile_terms(terms)
+    rects = []
+    if pattern is None:
+        return rects
+    for hit in sorted({" ".join(m.group(0).split())
+                       for m in pattern.finditer(text)}):
+        found = page.search_for(hit)
+        if not found:
+            return None
+        rects.extend(found)
+    return rects
+
+
+def detect_document(pdf_path, page_numbers, terms):
+    """
+    Text-layer detection for a whole document in one pass.
+
+    Returns:
+        {page_num: [(x0, y0, x1, y1) in visible-page points] or None}
+    """
+    fitz = _import_fitz()
+    found = {}
+    with fitz.open(str(pdf_path)) as doc:
+        for page_num in page_numbers:
+            page = doc[page_num - 1]
+            rects = text_layer_hits(page, terms)
+            found[page_num] = None if rects is None else [
+                tuple(r * page.rotation_matrix) for r in rects]
+    return found
+
+
+@lru_cache(maxsize=1)
+def _import_tesseract():
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return None
+    return pytesseract
+
+
+def _match_words(words, pattern):
+    """Union boxes of OCR words covered by each match, one box per line."""
+    text, starts = "", []
+    for word, _, _ in words:
+        if text and (text[-1].isascii() or word[0].isascii()):
+            text += " "
+        starts.append(len(text))
+        text += word
+    boxes = {}
+    for m in pattern.finditer(text):
+        for i, start in enumerate(starts):
+            word, box, line = words[i]
+            if start < m.end() and start + len(word) > m.start():
+                key = (m.start(), line)
+                old = boxes.get(key, box)
+                boxes[key] = (min(old[0], box[0]), min(old[1], box[1]),
+                              max(old[2], box[2]), max(old[3], box[3]))
+    return list(boxes.values())
+
+
+def ocr_term_boxes(img, terms, lang=DETECT_OCR_LANG):
+    """
+    Fast OCR pass over a rendered page: pixel boxes of matching words, or
+    None if Tesseract (or the language pack) is unavailable.
+    """
+    tess = _import_tesseract()
+    pattern = compile_terms(terms)
+    if tess is None:
+        return None
+    if pattern is None:
+        return []
+    gray = img.convert("L")
+    try:
+        data = tess.image_to_data(gray, lang=lang,
+                                  output_type=tess.Output.DICT)
+    except tess.TesseractError:
+        return None
+    finally:
+        gray.close()
+    words = [(data["text"][i].strip(),
+              (data["left"][i], data["top"][i],
+               data["left"][i] + data["width"][i],
+               data["top"][i] + data["height"][i]),
+              (data["block_num"][i], data["par_num"][i], data["line_num"][i]))
+             for i in range(len(data["text"])) if data["text"][i].strip()]
+    return _match_words(words, pattern)
+
+
+def _redact_bitmap(img, page_num, doc_cfg, dpi, terms=None, word_boxes=None):
+    """
+    Black out a rendered page: detected term boxes when detection is on
+    and the page could be searched, otherwise the configured zones.
+
+    word_boxes are visible-page points from detect_document(); None means
+    no text layer, so the bitmap is OCRed.
+
+    Returns:
+        (img, boxes drawn, source, detected pixel boxes) with source
+        "text", "ocr" or "zones" (detected boxes are empty for zones)
+    """
+    if terms:
+        pad = DETECT_PADDING_PT * dpi / POINTS_PER_INCH
+        if word_boxes is None:
+            boxes, source = ocr_term_boxes(img, terms), "ocr"
+        else:
+            f = dpi / POINTS_PER_INCH
+            boxes = [tuple(v * f for v in box) for box in word_boxes]
+            source = "text"
+        if boxes is not None:
+            draw = ImageDraw.Draw(img)
+            w, h = img.size
+            boxes = [(max(math.floor(x0 - pad), 0), max(math.floor(y0 - pad), 0),
+                      min(math.ceil(x1 + pad), w), min(math.ceil(y1 + pad), h))
+                     for x0, y0, x1, y1 in boxes]
+            for box in boxes:
+                draw.rectangle(list(box), fill="black")
+            return img, len(boxes), source, boxes
+
+    img, zone_count = redact_page(
+        img,
+        zones=doc_cfg.get("cover_page_zones", []),
+        is_cover=(page_num == 1),
+        header_cfg=doc_cfg.get("header", {"enabled": False}),
+        footer_cfg=doc_cfg.get("footer", {"enabled": False}),
+        scale=zone_scale(dpi)
+    )
+    return img, zone_count, "zones", []
+
+
+def detection_summary(sources):
+    """{page_num: source} -> {source: [page_num, ...]} for the log."""
+    summary = {}
+    for page_num, source in sorted(sources.items()):
+        summary.setdefault(source, []).append(page_num)
+    return summary
+
+
+# ================================================================
+# DIGITAL MODE (true PDF redaction via PyMuPDF, text layer kept)
+# ================================================================
+# Born-digital PDFs keep their text: zones become real PDF redactions
+# (text, vector art and image pixels underneath are removed, not covered)
+# and the output is one small searchable PDF that needs no OCR downstream.
+# Pages with no text layer (scans inside a digital PDF) are rendered and
+# redacted like the raster path, then replace the original page.
+
+REDACTION_MODES = ("raster", "digital")
+# Fewer extractable characters than this => treat the page as scanned
+MIN_TEXT_CHARS = 25
+POINTS_PER_INCH = 72
+
+
+def _import_fitz():
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise RuntimeError("Digital mode and term detection need PyMuPDF:\n"
+                           "  pip install pymupdf")
+    return fitz
+
+
+VECTOR_STAMP_SIZE = 5
+VECTOR_STAMP_MARGIN = 3
+
+
+def vector_stamp_box(rect, page_num, doc_type, fitz):
+    """Visible-page box (points) _vector_stamp() paints white."""
+    stamp = f"REDACTED | {doc_type} | p.{page_num} | {datetime.now().strftime('%Y-%m-%d')}"
+    size, margin = VECTOR_STAMP_SIZE, VECTOR_STAMP_MARGIN
+    tw = fitz.get_text_length(stamp, fontsize=size)
+    return stamp, fitz.Rect(rect.x1 - tw - margin * 2,
+                            rect.y1 - size - margin * 2, rect.x1, rect.y1)
+
+
+def _vector_stamp(page, page_num, doc_type, fitz):
+    """Digital-mode equivalent of add_redaction_stamp() (real PDF text)."""
+    size, margin = VECTOR_STAMP_SIZE, VECTOR_STAMP_MARGIN
+    rect = page.rect
+    stamp, box = vector_stamp_box(rect, page_num, doc_type, fitz)
+    page.draw_rect(box * page.derotation_matrix, color=None, fill=(1, 1, 1))
+    origin = fitz.Point(box.x0 + margin, rect.y1 - margin - 1)
+    page.insert_text(origin * page.derotation_matrix, stamp, fontsize=size,
+                     color=(0.5, 0.5, 0.5), rotate=page.rotation)
+
+
+def _rasterise_page(doc, index, page_num, doc_type, doc_cfg, dpi, add_stamp,
+                    output_cfg, fitz, terms=None):
+    """
+    Replace a scanned page with a rendered, redacted bitmap of itself.
+
+    Returns:
+        (number of zones applied, zone source, detected boxes in points)
+    """
+    import io
+
+    page = doc[index]
+    pix = page.get_pixmap(dpi=dpi)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    width, height = page.rect.width, page.rect.height
+    img, zone_count, source, boxes = _redact_bitmap(img, page_num, doc_cfg,
+                                                    dpi, terms)
+    if add_stamp and zone_count > 0:
+        img = add_redaction_stamp(img, page_num, doc_type, zone_scale(dpi))
+
+    buf = io.BytesIO()
+    out_img = convert_color(img, output_cfg)
+    out_img.save(buf, "PNG", optimize=True)
+    out_img.close()
+    img.close()
+
+    # New page at the visible (rotated) size, original page dropped entirely
+    new_page = doc.new_page(index, width=width, height=height)
+    new_page.insert_image(new_page.rect, stream=buf.getvalue())
+    doc.delete_page(index + 1)
+    f = POINTS_PER_INCH / dpi
+    return zone_count, source, [tuple(v * f for v in box) for box in boxes]
+
+
+def _process_pdf_digital(pdf_path, doc_type, doc_cfg, output_dir, pages,
+                         skip_pages, dpi, add_stamp, progress_callback,
+                         output_cfg, terms=None):
+    """
+    Digital mode body of process_pdf(). With terms, text pages get
+    redactions on the matching words only (detection runs on the same
+    open document, so no second pass over the file).
+
+    Returns:
+        stats dict (output_files holds the single redacted PDF)
+    """
+    fitz = _import_fitz()
+    point_scale = POINTS_PER_INCH / CONFIG_DPI
+    render_pages = [p for p in pages if p not in skip_pages]
+    stats = {
+        "total_pages": len(pages),
+        "redacted_pages": 0,
+        "skipped_pages": len(pages) - len(render_pages),
+        "total_zones_applied": 0,
+        "vector_pages": [],
+        "raster_pages": [],
+        "output_files": []
+    }
+    sources = {}
+    detected = {}
+
+    out_path = Path(output_dir) / f"{pdf_path.stem}_redacted.pdf"
+    with fitz.open(str(pdf_path)) as doc:
+        # Keep only the requested, non-skipped pages (page numbers stay original)
+        doc.select([p - 1 for p in render_pages])
+        for index, page_num in enumerate(render_pages):
+            page = doc[index]
+            if len(page.get_text("text").strip()) < MIN_TEXT_CHARS:
+                zone_count, sources[page_num], detected[page_num] = \
+                    _rasterise_page(doc, index, page_num, doc_type, doc_cfg,
+                                    dpi, add_stamp, output_cfg, fitz, terms)
+                stats["raster_pages"].append(page_num)
+            else:
+                hits = text_layer_hits(page, terms) if terms else None
+                if hits is not None:
+                    pad = DETECT_PADDING_PT
+                    rects = [fitz.Rect(r) + (-pad, -pad, pad, pad)
+                             for r in hits]
+                    sources[page_num] = "text"
+                    detected[page_num] = [tuple(r * page.rotation_matrix)
+                                          for r in rects]
+                else:
+                    rects = [fitz.Rect(box) * page.derotation_matrix
+                             for box in page_zones(
+                                 doc_cfg.get("cover_page_zones", []),
+                                 page_num == 1,
+                                 doc_cfg.get("header", {"enabled": False}),
+                                 doc_cfg.get("footer", {"enabled": False}),
+                                 page.rect.width, page.rect.height,
+                                 point_scale, snap=False)]
+                    sources[page_num] = "zones"
+                for rect in rects:
+                    page.add_redact_annot(rect, fill=(0, 0, 0))
+                if rects:
+                    page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_PIXELS)
+                    if add_stamp:
+                        _vector_stamp(page, page_num, doc_type, fitz)
+                zone_count = len(rects)
+                stats["vector_pages"].append(page_num)
+
+            stats["redacted_pages"] += 1
+            stats["total_zones_applied"] += zone_count
+            if progress_callback:
+                progress_callback(index + 1, len(render_pages),
+                                  f"Processing page {page_num}...")
+
+        # Title/author/bookmarks often carry the product name
+        doc.set_metadata({})
+        doc.del_xml_metadata()
+        doc.set_toc([])
+        doc.save(str(out_path), garbage=4, deflate=True, clean=True)
+
+    stats["output_files"].append(str(out_path))
+    stats["page_numbers"] = render_pages
+    if terms:
+        stats["detection"] = detection_summary(sources)
+        stats["detected_boxes"] = {p: [[round(v, 2) for v in box]
+                                       for box in boxes]
+                                   for p, boxes in detected.items() if boxes}
+    return stats
+
+
 def process_pdf(pdf_path, doc_type, config, output_dir=None,
-                page_range=None, dpi=DEFAULT_DPI, add_stamp=True,
-                progress_callback=None):
+                page_range=None, dpi=None, add_stamp=True,
+                progress_callback=None, page_window=DEFAULT_PAGE_WINDOW,
+                workers=1, pool=None, output_cfg=None, mode=None,
+                terms=None, verify=True):
     """
     Main processing function.
 
@@ -138,19 +750,39 @@ def process_pdf(pdf_path, doc_type, config, output_dir=None,
         config: Loaded config dict
         output_dir: Output directory (default: same folder as PDF)
         page_range: Tuple (start, end) 1-indexed, or None for all
-        dpi: Resolution for conversion
+        dpi: Resolution for conversion (default: doc type "dpi" or DEFAULT_DPI).
+             Zones are scaled from CONFIG_DPI, so e.g. 200 DPI renders
+             ~2.25x fewer pixels with boxes in the same place.
         add_stamp: Whether to add redaction stamp
         progress_callback: Function(current, total, message) for GUI updates
+        page_window: Pages rendered per Poppler call (bounds peak memory)
+        workers: Processes for render + redact + PNG encode (1 = serial)
+        pool: Existing ProcessPoolExecutor to reuse (batch mode); overrides workers
+        output_cfg: Output encoding options (see DEFAULT_OUTPUT)
+        mode: "raster" or "digital" (default: doc type "mode" or raster).
+              Digital writes one searchable <stem>_redacted.pdf with true
+              PDF redactions; scanned pages in it are still rasterised.
+        terms: Sponsor/product names (default: doc type "terms"). When set,
+               only matching word boxes are redacted, found in the text
+               layer or by OCR on scanned pages; pages where neither works
+               get the configured zones.
+        verify: Run verify_output() on the result; failures set
+                "not_for_upload" in redaction_log.json and in stats.
 
     Returns:
         (output_path, stats_dict)
     """
     pdf_path = Path(pdf_path)
     doc_cfg = config.get(doc_type, {})
+    output_cfg = resolve_output_cfg(output_cfg)
+    dpi = dpi or doc_cfg.get("dpi", DEFAULT_DPI)
+    mode = mode or doc_cfg.get("mode", "raster")
+    if mode not in REDACTION_MODES:
+        raise ValueError(f"Unknown redaction mode: {mode}")
+    terms = tuple(sorted(set(terms if terms is not None
+                             else doc_cfg.get("terms", []))))
+    bundle = mode == "raster" and output_cfg["format"] in BUNDLE_FORMATS
 
-    header_cfg = doc_cfg.get("header", {"enabled": False})
-    footer_cfg = doc_cfg.get("footer", {"enabled": False})
-    cover_zones = doc_cfg.get("cover_page_zones", [])
     skip_pages = set(doc_cfg.get("skip_pages", []))
 
     # Create output directory
@@ -159,30 +791,33 @@ def process_pdf(pdf_path, doc_type, config, output_dir=None,
     else:
         output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    page_dir = output_dir / BUNDLE_PAGES_DIR if bundle else output_dir
+    page_dir.mkdir(exist_ok=True)
 
-    # Convert PDF to images
+    # Resolve page range without rendering (pages are streamed below)
     if progress_callback:
-        progress_callback(0, 1, "Converting PDF to images...")
-
-    convert_kwargs = {"dpi": dpi, "fmt": "png"}
-    if page_range:
-        convert_kwargs["first_page"] = page_range[0]
-        convert_kwargs["last_page"] = page_range[1]
-
-    try:
-        images = convert_from_path(str(pdf_path), **convert_kwargs)
-    except Exception as e:
-        raise RuntimeError(
-            f"PDF conversion failed: {e}\n\n"
-            f"If Poppler is not installed:\n"
-            f"  Windows: Download from github.com/osber/poppler/releases\n"
-            f"           Extract, add bin/ folder to system PATH\n"
-            f"  Mac: brew install poppler\n"
-            f"  Linux: apt install poppler-utils"
-        )
+        progress_callback(0, 1, "Reading PDF info...")
 
-    total_pages = len(images)
+    if mode == "digital":
+        with _import_fitz().open(str(pdf_path)) as doc:
+            page_count = doc.page_count
+    else:
+        page_count = get_page_count(pdf_path)
     start_page = page_range[0] if page_range else 1
+    end_page = min(page_range[1], page_count) if page_range else page_count
+    pages = list(range(start_page, end_page + 1))
+    total_pages = len(pages)
+
+    if mode == "digital":
+        stats = _process_pdf_digital(pdf_path, doc_type, doc_cfg, output_dir,
+                                     pages, skip_pages, dpi, add_stamp,
+                                     progress_callback, output_cfg, terms)
+        _write_log(output_dir, pdf_path, doc_type, dpi, "digital", 1,
+                   {"format": "pdf", "searchable": True,
+                    "raster_color": output_cfg["color"]},
+                   doc_cfg, stats, terms, completed=not verify)
+        _verify_into(output_dir, stats, verify, progress_callback)
+        return output_dir, stats
 
     stats = {
         "total_pages": total_pages,
@@ -192,54 +827,543 @@ def process_pdf(pdf_path, doc_type, config, output_dir=None,
         "output_files": []
     }
 
-    for i, img in enumerate(images):
-        page_num = start_page + i
+    # Skip excluded pages (e.g., signature log) before rendering them
+    render_pages = [p for p in pages if p not in skip_pages]
+    stats["skipped_pages"] = total_pages - len(render_pages)
 
+    # Term detection reads the whole text layer once, before any rendering
+    detected = {}
+    if terms:
         if progress_callback:
-            progress_callback(i + 1, total_pages,
-                            f"Processing page {page_num}...")
-
-        # Skip excluded pages (e.g., signature log)
-        if page_num in skip_pages:
-            stats["skipped_pages"] += 1
-            continue
-
-        # Apply redactions
-        is_cover = (page_num == 1)
-        img, zone_count = redact_page(
-            img,
-            zones=cover_zones,
-            is_cover=is_cover,
-            header_cfg=header_cfg,
-            footer_cfg=footer_cfg
-        )
-
-        if add_stamp and zone_count > 0:
-            img = add_redaction_stamp(img, page_num, doc_type)
-
-        # Save
-        filename = f"p{page_num:03d}.png"
-        out_path = output_dir / filename
-        img.save(str(out_path), "PNG", optimize=True)
+            progress_callback(0, 1, "Detecting terms in text layer...")
+        detected = detect_document(pdf_path, render_pages, terms)
+
+    # Results arrive per page (possibly out of order when parallel);
+    # stats are tallied afterwards in page order so the log is deterministic.
+    results = []
+    done = 0
+
+    if pool is None and workers <= 1:
+        for page_num, img in iter_page_images(pdf_path, render_pages, dpi,
+                                              page_window):
+            out_path, zone_count, source, boxes = redact_and_save(
+                img, page_num, doc_type, doc_cfg, page_dir, add_stamp,
+                output_cfg, dpi, terms, detected.get(page_num))
+            results.append((page_num, out_path, zone_count, source, boxes))
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(render_pages),
+                                f"Processing page {page_num}...")
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
 
+        own_pool = pool is None
+        if own_pool:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                pool.submit(_redact_window, str(pdf_path), run, dpi,
+                            doc_type, doc_cfg, str(page_dir), add_stamp,
+                            output_cfg, terms,
+                            {p: detected.get(p) for p in run})
+                for run in page_windows(render_pages, page_window)
+            ]
+            for future in as_completed(futures):
+                run_results = future.result()
+                results.extend(run_results)
+                done += len(run_results)
+                if progress_callback and run_results:
+                    progress_callback(done, len(render_pages),
+                                    f"Processed page {run_results[-1][0]}...")
+        finally:
+            if own_pool:
+                pool.shutdown()
+
+    results.sort(key=lambda r: r[0])
+    for page_num, out_path, zone_count, _, _ in results:
         stats["redacted_pages"] += 1
         stats["total_zones_applied"] += zone_count
-        stats["output_files"].append(str(out_path))
+        stats["output_files"].append(out_path)
+    stats["page_numbers"] = [r[0] for r in results]
+    if terms:
+        stats["detection"] = detection_summary(
+            {r[0]: r[3] for r in results})
+        stats["detected_boxes"] = {r[0]: r[4] for r in results if r[4]}
+
+    if bundle:
+        # Replace per-page intermediates with the single multipage file
+        if progress_callback:
+            progress_callback(done, len(render_pages),
+                            f"Writing {output_cfg['format'].upper()} bundle...")
+        page_files = stats["output_files"]
+        bundle_path = output_dir / (
+            f"{pdf_path.stem}_redacted{BUNDLE_FORMATS[output_cfg['format']]}")
+        if page_files:
+            assemble_bundle(page_files, bundle_path, output_cfg, dpi)
+            stats["output_files"] = [str(bundle_path)]
+        for page_file in page_files:
+            Path(page_file).unlink()
+        page_dir.rmdir()
+
+    _write_log(output_dir, pdf_path, doc_type, dpi, "raster", workers,
+               output_cfg, doc_cfg, stats, terms, completed=not verify)
+    _verify_into(output_dir, stats, verify, progress_callback, workers)
+    return output_dir, stats
+
+
+def _verify_into(output_dir, stats, verify, progress_callback=None,
+                 workers=1):
+    """Run the verification pass (if enabled) and copy its verdict to stats."""
+    if not verify:
+        return
+    if progress_callback:
+        progress_callback(1, 1, "Verifying redactions...")
+    stats["verification"] = verify_output(output_dir, workers=workers)
+    stats["not_for_upload"] = not stats["verification"]["passed"]
+
+
+def _write_log(output_dir, pdf_path, doc_type, dpi, mode, workers, output_cfg,
+               doc_cfg, stats, terms=(), completed=True):
+    """
+    Save processing log (its "completed" flag drives batch resume).
 
-    # Save processing log
+    With verification on, completed=False here and verify_output() sets it
+    once its result is recorded, so an interrupted check is redone on resume.
+    """
+    # The log travels with the output: record how many terms, never which
+    if "terms" in doc_cfg:
+        doc_cfg = dict(doc_cfg, terms=len(doc_cfg["terms"]))
     log = {
         "source_file": str(pdf_path),
         "document_type": doc_type,
         "processed_at": datetime.now().isoformat(),
+        "mode": mode,
         "dpi": dpi,
+        "zone_scale": zone_scale(dpi),
+        "workers": workers,
+        "detection_terms": len(terms),
+        "output_format": output_cfg,
         "config_used": doc_cfg,
-        "stats": stats
+        "stats": stats,
+        "completed": completed
     }
-    log_path = output_dir / "redaction_log.json"
+    log_path = Path(output_dir) / "redaction_log.json"
     with open(log_path, "w", encoding="utf-8") as f:
         json.dump(log, f, indent=2, ensure_ascii=False)
 
-    return output_dir, stats
+
+# ================================================================
+# VERIFICATION (prove the output pages are black where they should be)
+# ================================================================
+# Re-reads what process_pdf() wrote, recomputes every configured zone from
+# config_used (detected word boxes from the log) and counts pixels inside
+# them brighter than VERIFY_BLACK_MAX. Any residue marks the document
+# not_for_upload in redaction_log.json. A verification that cannot run
+# fails closed.
+
+# Brightest value (0-255, any channel) still counted as black; leaves
+# room for JPEG/WebP noise inside a filled box
+VERIFY_BLACK_MAX = 48
+# Pixels ignored along each box edge: anti-aliased PDF redaction edges,
+# and one 8x8 block of ringing for lossy codecs
+VERIFY_EDGE_PX = 2
+VERIFY_LOSSY_EDGE_PX = 8
+# Failing zones listed per document in the log (counts are always complete)
+VERIFY_MAX_REPORTED = 50
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Verification needs NumPy:\n  pip install numpy")
+    return numpy
+
+
+def _image_array(np, img):
+    """uint8 array (H x W, or H x W x channels) without copying channels."""
+    if img.mode not in ("L", "RGB"):
+        img = img.convert("RGB" if img.mode not in ("1", "LA") else "L")
+    return np.asarray(img)
+
+
+def _pixmap_array(np, pix):
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+        pix.height, pix.width, pix.n)
+
+
+def _load_image_arrays(np, paths, workers=1):
+    """
+    Decode page files in order. Pillow releases the GIL while decoding,
+    so threads overlap; at most 2 x workers bitmaps are held at once.
+    """
+    def load(path):
+        with Image.open(path) as im:
+            return _image_array(np, im)
+
+    if workers <= 1:
+        for path in paths:
+            yield load(path)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    step = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for i in range(0, len(paths), step):
+            yield from ex.map(load, paths[i:i + step])
+
+
+def iter_output_arrays(log, output_dir, workers=1):
+    """
+    Yield (page_num, array, scale, stamp) for every page process_pdf()
+    wrote. scale converts config pixels to array pixels; stamp is the
+    pixel box the redaction stamp may have painted white (or None).
+    """
+    np = _import_numpy()
+    stats = log["stats"]
+    dpi = log["dpi"]
+    doc_type = log["document_type"]
+    page_numbers = stats.get("page_numbers", [])
+    # Outputs always sit directly in output_dir; logged paths may be
+    # relative to wherever the run was started
+    files = [str(Path(output_dir) / Path(f).name)
+             for f in stats["output_files"]]
+    fmt = log["output_format"].get("format", "png")
+    scale = zone_scale(dpi)
+
+    if log["mode"] == "digital" or fmt == "pdf":
+        fitz = _import_fitz()
+        with fitz.open(files[0]) as doc:
+            if doc.page_count != len(page_numbers):
+                raise RuntimeError(f"{files[0]} has {doc.page_count} pages, "
+                                   f"log lists {len(page_numbers)}")
+            for page, page_num in zip(doc, page_numbers):
+                pix = page.get_pixmap(dpi=dpi)
+                if (log["mode"] == "digital"
+                        and page_num not in stats.get("raster_pages", [])):
+                    px = dpi / POINTS_PER_INCH
+                    _, box = vector_stamp_box(page.rect, page_num, doc_type,
+                                              fitz)
+                    stamp = tuple(v * px for v in box)
+                else:
+                    stamp = stamp_box(pix.width, pix.height, page_num,
+                                      doc_type, scale)
+                yield page_num, _pixmap_array(np, pix), scale, stamp
+        return
+
+    if fmt == "tiff":
+        from PIL import ImageSequence
+        with Image.open(files[0]) as im:
+            if getattr(im, "n_frames", 1) != len(page_numbers):
+                raise RuntimeError(f"{files[0]} has {getattr(im, 'n_frames', 1)} "
+                                   f"frames, log lists {len(page_numbers)}")
+            for page_num, frame in zip(page_numbers,
+                                       ImageSequence.Iterator(im)):
+                a = _image_array(np, frame)
+                yield page_num, a, scale, stamp_box(
+                    a.shape[1], a.shape[0], page_num, doc_type, scale)
+        return
+
+    if len(files) != len(page_numbers):
+        raise RuntimeError(f"{len(files)} output files, "
+                           f"log lists {len(page_numbers)} pages")
+    for page_num, a in zip(page_numbers,
+                           _load_image_arrays(np, files, workers)):
+        yield page_num, a, scale, stamp_box(a.shape[1], a.shape[0],
+                                            page_num, doc_type, scale)
+
+
+def zone_residuals(np, a, boxes, stamp=None, edge=VERIFY_EDGE_PX,
+                   black_max=VERIFY_BLACK_MAX):
+    """
+    Non-black pixel count inside each box (stamp area excluded). A pixel
+    is non-black if any channel exceeds black_max; only the box slices
+    are compared, never the whole page.
+    """
+    h, w = a.shape[:2]
+    sx0 = sy0 = None
+    if stamp:
+        sx0, sy0 = max(math.floor(stamp[0]), 0), max(math.floor(stamp[1]), 0)
+    counts = []
+    for x0, y0, x1, y1 in boxes:
+        x0 = min(max(math.ceil(x0) + edge, 0), w)
+        y0 = min(max(math.ceil(y0) + edge, 0), h)
+        x1 = max(min(math.floor(x1) - edge, w), x0)
+        y1 = max(min(math.floor(y1) - edge, h), y0)
+        region = a[y0:y1, x0:x1]
+        if region.ndim == 3:
+            bad = region[..., 0] > black_max
+            for c in range(1, min(region.shape[2], 3)):
+                bad |= region[..., c] > black_max
+        else:
+            bad = region > black_max
+        if sx0 is not None and x1 > sx0 and y1 > sy0:
+            bad[max(sy0 - y0, 0):, max(sx0 - x0, 0):] = False
+        counts.append(int(np.count_nonzero(bad)))
+    return counts
+
+
+def verify_output(output_dir, black_max=VERIFY_BLACK_MAX, workers=1):
+    """
+    Check every zone of a finished document is solid black and record the
+    result in its redaction_log.json ("verification", "not_for_upload").
+
+    Configured zones are checked on pages redacted from the config;
+    pages redacted by term detection are checked against their logged
+    word boxes. Skipped pages are not in the output and need no check.
+    workers threads decode per-page image files.
+
+    Returns:
+        verification dict
+    """
+    import time
+
+    log_path = Path(output_dir) / "redaction_log.json"
+    with open(log_path, "r", encoding="utf-8") as f:
+        log = json.load(f)
+
+    cfg = log["config_used"]
+    stats = log["stats"]
+    sources = {p: source
+               for source, pages in stats.get("detection", {}).items()
+               for p in pages}
+    detected = stats.get("detected_boxes", {})
+    px_per_pt = log["dpi"] / POINTS_PER_INCH
+    edge = (VERIFY_LOSSY_EDGE_PX
+            if log["output_format"].get("format") in ("jpeg", "webp")
+            else VERIFY_EDGE_PX)
+    t0 = time.perf_counter()
+    result = {
+        "verified_at": datetime.now().isoformat(),
+        "black_max": black_max,
+        "edge_px": edge,
+        "pages_checked": 0,
+        "zones_checked": 0,
+        "failed_zones": 0,
+        "residual_pixels": 0,
+        "failures": [],
+    }
+
+    try:
+        np = _import_numpy()
+        for page_num, a, scale, stamp in iter_output_arrays(log, output_dir,
+                                                            workers):
+            if sources.get(page_num, "zones") == "zones":
+                boxes = page_zones(cfg.get("cover_page_zones", []),
+                                   page_num == 1,
+                                   cfg.get("header", {"enabled": False}),
+                                   cfg.get("footer", {"enabled": False}),
+                                   a.shape[1], a.shape[0], scale)
+            else:
+                boxes = detected.get(str(page_num), [])
+                if log["mode"] == "digital":
+                    boxes = [[v * px_per_pt for v in box] for box in boxes]
+            counts = zone_residuals(np, a, boxes, stamp, edge, black_max)
+            result["pages_checked"] += 1
+            result["zones_checked"] += len(boxes)
+            for box, count in zip(boxes, counts):
+                if not count:
+                    continue
+                result["failed_zones"] += 1
+                result["residual_pixels"] += count
+                if len(result["failures"]) < VERIFY_MAX_REPORTED:
+                    result["failures"].append({
+                        "page": page_num,
+                        "box": [round(v) for v in box],
+                        "residual_pixels": count})
+    except (OSError, RuntimeError, ValueError) as e:
+        result["error"] = str(e)
+
+    result["passed"] = not result["failed_zones"] and "error" not in result
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    log["verification"] = result
+    log["not_for_upload"] = not result["passed"]
+    log["completed"] = True
+    with open(log_path, "w", encoding="utf-8") as f:
+        json.dump(log, f, indent=2, ensure_ascii=False)
+    return result
+
+
+# ================================================================
+# BATCH MODE (many PDFs, one process, shared worker pool)
+# ================================================================
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+
+
+def resolve_inputs(inputs):
+    """
+    Expand CLI inputs (PDF files, folders, glob patterns) into a sorted,
+    de-duplicated list of PDF paths.
+    """
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            found.update(p for p in path.iterdir()
+                         if p.suffix.lower() == ".pdf")
+        elif path.is_file():
+            found.add(path)
+        else:
+            # Windows shells do not expand wildcards, so expand here
+            found.update(Path(p) for p in glob.glob(item, recursive=True)
+                         if p.lower().endswith(".pdf"))
+    return sorted(p.resolve() for p in found)
+
+
+def read_log(output_dir):
+    """output_dir's redaction_log.json as a dict, or None if missing/unreadable."""
+    log_path = Path(output_dir) / "redaction_log.json"
+    if not log_path.exists():
+        return None
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def batch_output_dirs(pdf_paths, output_root=None):
+    """
+    The <stem>_redacted/ folder for each PDF, in input order.
+
+    Beside each PDF by default. Under output_root, each PDF's folder
+    relative to the inputs' common parent is kept, so a/x.pdf and b/x.pdf
+    do not share x_redacted/.
+
+    Raises:
+        ValueError: two PDFs would still share a folder (e.g. x.pdf and
+            x.PDF side by side)
+    """
+    pdf_paths = [Path(p).resolve() for p in pdf_paths]
+    if output_root and pdf_paths:
+        common = Path(os.path.commonpath([str(p.parent) for p in pdf_paths]))
+        dirs = [Path(output_root) / p.parent.relative_to(common)
+                / f"{p.stem}_redacted" for p in pdf_paths]
+    else:
+        dirs = [p.parent / f"{p.stem}_redacted" for p in pdf_paths]
+
+    owners = {}
+    clashes = []
+    for pdf_path, output_dir in zip(pdf_paths, dirs):
+        key = str(output_dir).lower()   # Windows paths are case-insensitive
+        if key in owners:
+            clashes.append(f"{owners[key].name} and {pdf_path.name} -> {output_dir}")
+        else:
+            owners[key] = pdf_path
+    if clashes:
+        raise ValueError("PDFs would share an output folder: "
+                         + "; ".join(clashes))
+    return dirs
+
+
+def _same_source(log, pdf_path):
+    """True if a redaction_log.json was written for pdf_path."""
+    source = log.get("source_file")
+    return bool(source) and Path(source).resolve() == Path(pdf_path).resolve()
+
+
+def process_batch(pdf_paths, doc_type, config, output_root=None,
+                  page_range=None, dpi=None, add_stamp=True,
+                  page_window=DEFAULT_PAGE_WINDOW, workers=1, resume=True,
+                  progress_callback=None, output_cfg=None, mode=None,
+                  terms=None, verify=True):
+    """
+    Redact many PDFs in one process.
+
+    Each document gets its own <stem>_redacted/ folder and redaction_log.json
+    (see batch_output_dirs()). Documents whose log already records
+    completion for the same source PDF are skipped when resume=True, so a
+    crashed run can simply be restarted. One worker pool is shared by all
+    documents.
+
+    Raises:
+        ValueError: two PDFs map to the same output folder (nothing is
+            processed)
+
+    Returns:
+        summary dict (also written to batch_summary.json)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    pdf_paths = [Path(p) for p in pdf_paths]
+    output_dirs = batch_output_dirs(pdf_paths, output_root)
+    summary_dir = Path(output_root) if output_root else (
+        pdf_paths[0].parent if pdf_paths else Path.cwd())
+    summary_dir.mkdir(parents=True, exist_ok=True)
+
+    summary = {
+        "document_type": doc_type,
+        "started_at": datetime.now().isoformat(),
+        "dpi": dpi or config.get(doc_type, {}).get("dpi", DEFAULT_DPI),
+        "mode": mode or config.get(doc_type, {}).get("mode", "raster"),
+        "workers": workers,
+        "documents": [],
+        "totals": {"completed": 0, "resumed": 0, "failed": 0,
+                   "pages": 0, "zones": 0, "not_for_upload": 0},
+    }
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for n, (pdf_path, output_dir) in enumerate(zip(pdf_paths, output_dirs), 1):
+            entry = {"source_file": str(pdf_path),
+                     "output_dir": str(output_dir)}
+
+            if progress_callback:
+                progress_callback(n, len(pdf_paths), f"{pdf_path.name}")
+
+            log = read_log(output_dir) if resume else None
+            if log and log.get("completed") and _same_source(log, pdf_path):
+                entry["status"] = "skipped (already completed)"
+                summary["totals"]["resumed"] += 1
+                # A stored verification failure still blocks upload
+                if log.get("not_for_upload"):
+                    entry["not_for_upload"] = True
+                    summary["totals"]["not_for_upload"] += 1
+                summary["documents"].append(entry)
+                continue
+
+            try:
+                _, stats = process_pdf(
+                    pdf_path=pdf_path,
+                    doc_type=doc_type,
+                    config=config,
+                    output_dir=output_dir,
+                    page_range=page_range,
+                    dpi=dpi,
+                    add_stamp=add_stamp,
+                    page_window=page_window,
+                    workers=workers,
+                    pool=pool,
+                    output_cfg=output_cfg,
+                    mode=mode,
+                    terms=terms,
+                    verify=verify
+                )
+            except Exception as e:
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+                summary["totals"]["failed"] += 1
+            else:
+                entry["status"] = "completed"
+                entry["redacted_pages"] = stats["redacted_pages"]
+                entry["skipped_pages"] = stats["skipped_pages"]
+                entry["total_zones_applied"] = stats["total_zones_applied"]
+                summary["totals"]["completed"] += 1
+                summary["totals"]["pages"] += stats["redacted_pages"]
+                summary["totals"]["zones"] += stats["total_zones_applied"]
+                if "not_for_upload" in stats:
+                    entry["not_for_upload"] = stats["not_for_upload"]
+                    summary["totals"]["not_for_upload"] += stats["not_for_upload"]
+            summary["documents"].append(entry)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary["finished_at"] = datetime.now().isoformat()
+    with open(summary_dir / BATCH_SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    return summary
 
 
 # ================================================================
@@ -355,6 +1479,14 @@ class RedactionApp:
         if skip:
             lines.append(f"  Skip pages: {skip} (excluded from output)")
 
+        if cfg.get("mode") == "digital":
+            lines.append("  Digital PDF: true redactions, searchable PDF output "
+                         "(scanned pages rasterised)")
+
+        dpi = cfg.get("dpi", DEFAULT_DPI)
+        if dpi != CONFIG_DPI:
+            lines.append(f"  Render at {dpi} DPI (zones scaled x{zone_scale(dpi):.2f})")
+
         if not lines:
             lines.append("  No redaction rules defined for this type.")
 
@@ -416,6 +1548,16 @@ class RedactionApp:
             self.progress_var.set(100)
             self.progress_label.config(text="Complete!")
 
+            if stats.get("not_for_upload"):
+                self.progress_label.config(text="Verification FAILED")
+                messagebox.showerror(
+                    "Not For Upload",
+                    f"Verification found non-black pixels in "
+                    f"{stats['verification']['failed_zones']} zones.\n"
+                    f"{stats['verification'].get('error', '')}\n"
+                    f"Do NOT upload: see redaction_log.json in\n{output_dir}")
+                return
+
             msg = (
                 f"Redaction complete!\n\n"
                 f"Pages processed: {stats['redacted_pages']}\n"
@@ -443,13 +1585,46 @@ def cli_mode():
     import argparse
     parser = argparse.ArgumentParser(
         description=f"Amaran PDF Redaction Tool v{VERSION}")
-    parser.add_argument("pdf", help="Input PDF file")
+    parser.add_argument("pdf", nargs="+",
+                       help="Input PDF file(s), folder(s) or glob pattern(s)")
     parser.add_argument("--type", "-t", required=True,
                        help="Document type (BPR, Campaign_Report, etc.)")
-    parser.add_argument("--output", "-o", help="Output directory")
+    parser.add_argument("--output", "-o",
+                       help="Output directory (batch mode: parent of per-PDF folders)")
     parser.add_argument("--pages", "-p", help="Page range, e.g. 1-10")
-    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--dpi", type=int,
+                       help=f"Render DPI (default: doc type 'dpi' or {DEFAULT_DPI}); "
+                            f"zones are scaled from {CONFIG_DPI} DPI")
     parser.add_argument("--no-stamp", action="store_true")
+    parser.add_argument("--window", type=int, default=DEFAULT_PAGE_WINDOW,
+                       help="Pages rendered per batch (lower = less RAM)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                       help="Parallel page processes (default: 1)")
+    parser.add_argument("--no-resume", action="store_true",
+                       help="Batch mode: reprocess PDFs already completed")
+    parser.add_argument("--format", "-f", default=DEFAULT_OUTPUT["format"],
+                       choices=sorted(list(PAGE_FORMATS) + list(BUNDLE_FORMATS)),
+                       help="Per-page png/jpeg/webp, or one multipage tiff/pdf")
+    parser.add_argument("--color", default=DEFAULT_OUTPUT["color"],
+                       choices=["rgb", "gray", "bw"],
+                       help="Color reduction (bw = 1-bit)")
+    parser.add_argument("--png-level", type=int, choices=range(10),
+                       metavar="0-9",
+                       help="PNG zlib level (default: optimize, slowest)")
+    parser.add_argument("--quality", type=int,
+                       default=DEFAULT_OUTPUT["quality"],
+                       help="JPEG/WebP quality 1-100")
+    parser.add_argument("--mode", choices=REDACTION_MODES,
+                       help="raster = redacted page images; digital = searchable "
+                            "PDF with true redactions (default: doc type 'mode' "
+                            "or raster)")
+    parser.add_argument("--terms", metavar="FILE",
+                       help="Name dictionary (one term per line): redact only "
+                            "matching words instead of the configured zones "
+                            "(default: doc type 'terms')")
+    parser.add_argument("--no-verify", action="store_true",
+                       help="Skip the pixel check that every zone is solid "
+                            "black (failures mark not_for_upload)")
     args = parser.parse_args()
 
     config = {}
@@ -472,20 +1647,83 @@ def cli_mode():
     def progress(cur, total, msg):
         print(f"  [{cur}/{total}] {msg}")
 
+    output_cfg = {
+        "format": args.format,
+        "color": args.color,
+        "png_level": args.png_level,
+        "quality": args.quality,
+    }
+
+    terms = load_terms(args.terms) if args.terms else None
+
+    pdf_files = resolve_inputs(args.pdf)
+    if not pdf_files:
+        print(f"Error: No PDF files found in {', '.join(args.pdf)}")
+        sys.exit(1)
+
+    batch = len(args.pdf) > 1 or not Path(args.pdf[0]).is_file()
+
     print(f"Amaran PDF Redaction Tool v{VERSION}")
-    print(f"Input:  {args.pdf}")
+    print(f"Input:  {args.pdf[0] if not batch else f'{len(pdf_files)} PDFs'}")
     print(f"Type:   {args.type}")
     print()
 
+    if batch:
+        def doc_progress(cur, total, msg):
+            print(f"[{cur}/{total}] {msg}")
+
+        try:
+            summary = process_batch(
+                pdf_files,
+                doc_type=args.type,
+                config=config,
+                output_root=args.output,
+                page_range=page_range,
+                dpi=args.dpi,
+                add_stamp=not args.no_stamp,
+                page_window=args.window,
+                workers=args.workers,
+                resume=not args.no_resume,
+                progress_callback=doc_progress,
+                output_cfg=output_cfg,
+                mode=args.mode,
+                terms=terms,
+                verify=not args.no_verify
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        totals = summary["totals"]
+        print()
+        print(f"Batch done! {totals['completed']} completed, "
+              f"{totals['resumed']} already done, {totals['failed']} failed")
+        print(f"  Pages processed: {totals['pages']}")
+        print(f"  Zones applied:   {totals['zones']}")
+        for doc in summary["documents"]:
+            if doc["status"] == "failed":
+                print(f"  FAILED: {doc['source_file']}: {doc['error']}")
+            elif doc.get("not_for_upload"):
+                print(f"  NOT FOR UPLOAD (verification failed): "
+                      f"{doc['source_file']}")
+        if totals["failed"] or totals["not_for_upload"]:
+            sys.exit(1)
+        return
+
     output_dir, stats = process_pdf(
-        pdf_path=args.pdf,
+        pdf_path=pdf_files[0],
         doc_type=args.type,
         config=config,
         output_dir=args.output,
         page_range=page_range,
         dpi=args.dpi,
         add_stamp=not args.no_stamp,
-        progress_callback=progress
+        progress_callback=progress,
+        page_window=args.window,
+        workers=args.workers,
+        output_cfg=output_cfg,
+        mode=args.mode,
+        terms=terms,
+        verify=not args.no_verify
     )
 
     print()
@@ -493,6 +1731,26 @@ def cli_mode():
     print(f"  Pages processed: {stats['redacted_pages']}")
     print(f"  Pages skipped:   {stats['skipped_pages']}")
     print(f"  Zones applied:   {stats['total_zones_applied']}")
+    if "vector_pages" in stats:
+        print(f"  Text-layer pages: {len(stats['vector_pages'])}, "
+              f"rasterised (scanned) pages: {len(stats['raster_pages'])}")
+    if "detection" in stats:
+        for source, page_nums in stats["detection"].items():
+            print(f"  Detection via {source}: {len(page_nums)} pages")
+        if "zones" in stats["detection"]:
+            print("  WARNING: configured zones used where terms could not "
+                  "be searched (no text layer / OCR unavailable)")
+    if "verification" in stats:
+        v = stats["verification"]
+        if v["passed"]:
+            print(f"  Verified: {v['zones_checked']} zones on "
+                  f"{v['pages_checked']} pages solid black ({v['seconds']}s)")
+        else:
+            print(f"  NOT FOR UPLOAD: {v.get('error') or ''}"
+                  f"{v['failed_zones']} zones with "
+                  f"{v['residual_pixels']} non-black pixels "
+                  f"(see redaction_log.json)")
+            sys.exit(1)
 
 
 # ================================================================
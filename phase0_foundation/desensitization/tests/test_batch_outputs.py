@@ -0,0 +1,73 @@
+"""
+Tests for the batch output folders and resume check in amaran_redact.py.
+
+Run: python -m pytest phase0_foundation/desensitization/tests -q
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import amaran_redact as redact  # noqa: E402
+
+with open(Path(redact.__file__).parent / redact.CONFIG_FILE, encoding="utf-8") as _f:
+    CONFIG = {k: v for k, v in json.load(_f).items() if not k.startswith("_")}
+
+
+def _touch(path, data=b""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path.resolve()
+
+
+def _write_log(output_dir, source_file):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "redaction_log.json", "w", encoding="utf-8") as f:
+        json.dump({"source_file": str(source_file), "completed": True}, f)
+
+
+def test_same_stem_in_different_folders(tmp_path):
+    a = _touch(tmp_path / "in" / "a" / "x.pdf")
+    b = _touch(tmp_path / "in" / "b" / "x.pdf")
+    out = tmp_path / "out"
+    assert redact.batch_output_dirs([a, b], out) == [
+        out / "a" / "x_redacted", out / "b" / "x_redacted"]
+
+
+def test_flat_folder_keeps_plain_names(tmp_path):
+    a = _touch(tmp_path / "in" / "x.pdf")
+    b = _touch(tmp_path / "in" / "y.pdf")
+    out = tmp_path / "out"
+    assert redact.batch_output_dirs([a, b], out) == [
+        out / "x_redacted", out / "y_redacted"]
+    assert redact.batch_output_dirs([a, b]) == [
+        a.parent / "x_redacted", b.parent / "y_redacted"]
+
+
+def test_clashing_names_rejected_before_processing(tmp_path):
+    a = _touch(tmp_path / "in" / "x.pdf")
+    b = _touch(tmp_path / "in" / "X.PDF")
+    with pytest.raises(ValueError, match="share an output folder"):
+        redact.process_batch([a, b], "Campaign_Report", CONFIG,
+                             output_root=tmp_path / "out")
+    assert not (tmp_path / "out" / redact.BATCH_SUMMARY_FILE).exists()
+
+
+def test_resume_skips_only_matching_source(tmp_path):
+    # Not a real PDF: anything not skipped fails inside process_pdf
+    a = _touch(tmp_path / "in" / "a" / "x.pdf", b"not a pdf")
+    b = _touch(tmp_path / "in" / "b" / "x.pdf", b"not a pdf")
+    out = tmp_path / "out"
+    dir_a, dir_b = redact.batch_output_dirs([a, b], out)
+    _write_log(dir_a, a)
+    _write_log(dir_b, a)    # left by another PDF with the same stem
+
+    summary = redact.process_batch([a, b], "Campaign_Report", CONFIG,
+                                   output_root=out, verify=False)
+    first, second = summary["documents"]
+    assert first["status"] == "skipped (already completed)"
+    assert second["status"] == "failed" and second["output_dir"] == str(dir_b)
@@ -0,0 +1,219 @@
+"""
+SOP Chunker
+===========
+把 clean_markdown() 之後的 SOP Markdown 依標題層級與分頁線 (---) 切成
+chunk，輸出 JSONL 供任何 embedding store 串流匯入。
+
+使用方式：
+  python sop_chunker.py ../../sops_markdown/ ./chunks.jsonl
+
+安裝依賴：
+  pip install pyyaml
+
+備註：
+  - 每個 chunk 帶 front matter 的 sop_number / title 與標題路徑
+  - chunk_id = 來源檔名 + (標題路徑 + 內文) 的 SHA-1，
+    修改 SOP 後重新切分，只有內容有變的 chunk 會換 ID
+  - 過長的章節在段落 (空行) 處再切，單段不超過 max_chars
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from sop_context_packer import split_front_matter
+
+VERSION = "1.0.0"
+DEFAULT_MAX_CHARS = 4000
+
+# clean_markdown() 會在 #~#### 標題前後補空行；pdf_to_md_pymupdf 以 --- 分頁
+_HEADING = re.compile(r'^(#{1,4})\s+(.+?)\s*#*\s*$')
+_PAGE_BREAK = re.compile(r'^---\s*$')
+
+
+# ============================================================
+# 切分
+# ============================================================
+def _split_long(text: str, max_chars: int) -> list:
+    """在段落邊界把過長的文字切成不超過 max_chars 的片段 (單段過長則硬切)"""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for para in re.split(r'\n\s*\n', text):
+        while len(para) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and len(current) + 2 + len(para) > max_chars:
+            pieces.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_id(doc_key: str, heading_path: list, text: str) -> str:
+    """由文件代號、標題路徑與內文算出穩定的 chunk ID"""
+    h = hashlib.sha1()
+    h.update("\x1f".join(heading_path).encode("utf-8"))
+    h.update(b"\x1e")
+    h.update(text.encode("utf-8"))
+    return f"{doc_key}:{h.hexdigest()[:16]}"
+
+
+def chunk_markdown(content: str, source_file: str,
+                   max_chars: int = DEFAULT_MAX_CHARS) -> list:
+    """
+    將一份 SOP Markdown 切成 chunk
+
+    Args:
+        content: 含 (或不含) YAML front matter 的 Markdown
+        source_file: .md 檔名，作為 chunk ID 前綴
+        max_chars: 單一 chunk 的最大字元數
+
+    Returns:
+        [{"chunk_id", "sop_number", "title", "source_file", "heading_path",
+          "page", "seq", "text"}]；page 為 --- 分隔的段落序號 (1-based)
+    """
+    meta, body = split_front_matter(content)
+    doc_key = Path(source_file).stem
+    sop_number = str(meta.get("sop_number", ""))
+    title = str(meta.get("title", "") or doc_key)
+
+    headings = []           # [(level, heading)]
+    page = 1
+    blocks = []             # [(heading_path, page, text)]
+    lines = []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            blocks.append(([h for _, h in headings], page, text))
+        lines.clear()
+
+    for line in body.split("\n"):
+        if _PAGE_BREAK.match(line):
+            flush()
+            page += 1
+            continue
+        m = _HEADING.match(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, m.group(2)))
+            continue
+        lines.append(line)
+    flush()
+
+    chunks = []
+    seen = {}
+    for heading_path, block_page, text in blocks:
+        for piece in _split_long(text, max_chars):
+            cid = chunk_id(doc_key, heading_path, piece)
+            # 同一文件內重複的段落 (例如每頁相同的注意事項) 以出現次數區分
+            n = seen.get(cid, 0)
+            seen[cid] = n + 1
+            if n:
+                cid = f"{cid}-{n}"
+            chunks.append({
+                "chunk_id": cid,
+                "sop_number": sop_number,
+                "title": title,
+                "source_file": source_file,
+                "heading_path": heading_path,
+                "page": block_page,
+                "seq": len(chunks),
+                "text": piece,
+            })
+    return chunks
+
+
+# ============================================================
+# JSONL 輸出
+# ============================================================
+def read_chunk_ids(jsonl_path: Path) -> set:
+    """讀出既有 JSONL 的所有 chunk_id；檔案不存在時回傳空 set"""
+    if not jsonl_path.exists():
+        return set()
+    ids = set()
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    ids.add(json.loads(line)["chunk_id"])
+                except (ValueError, KeyError):
+                    continue
+    return ids
+
+
+def write_chunks_jsonl(chunks, jsonl_path: Path) -> dict:
+    """
+    寫出 JSONL (先寫暫存檔再取代) 並與舊檔比較
+
+    Returns:
+        {"chunks", "added", "removed", "unchanged"} — added / removed 為
+        需要在 embedding store 新增 / 刪除的 chunk 數
+    """
+    jsonl_path = Path(jsonl_path)
+    old_ids = read_chunk_ids(jsonl_path)
+    new_ids = set()
+    tmp_path = jsonl_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            new_ids.add(chunk["chunk_id"])
+            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, jsonl_path)
+    return {
+        "chunks": len(new_ids),
+        "added": len(new_ids - old_ids),
+        "removed": len(old_ids - new_ids),
+        "unchanged": len(new_ids & old_ids),
+    }
+
+
+def iter_corpus_chunks(corpus_dir: str, max_chars: int = DEFAULT_MAX_CHARS):
+    """依檔名順序逐檔產出整個資料夾的 chunk (不一次載入全部)"""
+    for f in sorted(Path(corpus_dir).glob("*.md")):
+        if f.name.upper() == "README.MD":
+            continue
+        yield from chunk_markdown(f.read_text(encoding="utf-8"), f.name, max_chars)
+
+
+# ============================================================
+# CLI Entry Point
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"SOP Chunker v{VERSION} - section-aware JSONL chunks")
+    parser.add_argument("corpus", help="Folder of converted SOP Markdown")
+    parser.add_argument("output", help="Output .jsonl file")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS,
+                        help=f"Maximum characters per chunk (default: {DEFAULT_MAX_CHARS})")
+    args = parser.parse_args()
+
+    if not Path(args.corpus).is_dir():
+        print(f"Error: Folder not found: {args.corpus}")
+        return 1
+
+    stats = write_chunks_jsonl(iter_corpus_chunks(args.corpus, args.max_chars),
+                               Path(args.output))
+    print(f"Chunks: {stats['chunks']} "
+          f"(added {stats['added']}, removed {stats['removed']}, "
+          f"unchanged {stats['unchanged']})")
+    print(f"Output: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
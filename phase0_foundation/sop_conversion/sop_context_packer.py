@@ -0,0 +1,422 @@
+"""
+SOP Context Packer
+==================
+將 sops_markdown/ 的 Markdown 依 YAML Front Matter 篩選、估算 token，
+打包成符合 context window 預算的上傳檔 (含目錄)。
+
+使用方式：
+  python sop_context_packer.py ../../sops_markdown/ ./bundles/ --budget 900000
+
+安裝依賴：
+  pip install pyyaml
+
+備註：
+  - Token 數為估算值：CJK 字元約 1 token，其餘約 4 字元 1 token
+  - 每檔 token 數與 front matter 快取在 <corpus>/.token_cache.json，
+    重新打包時未變動的檔案不需重新讀取
+  - 同樣輸入 + 同樣參數 => 位元組完全相同的 bundle (無時間戳)
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import argparse
+import yaml
+from pathlib import Path
+from datetime import datetime
+
+from sop_to_markdown import file_sha256
+
+VERSION = "1.0.0"
+TOKEN_CACHE_FILE = ".token_cache.json"
+PACK_MANIFEST_FILE = "pack_manifest.json"
+DEFAULT_BUDGET = 1_000_000
+DEFAULT_RESERVE = 50_000          # 留給 system prompt / 問題 / 回答
+DEFAULT_CHARS_PER_TOKEN = 4.0
+# 估算方法改變時遞增，讓舊快取失效
+ESTIMATOR_VERSION = 1
+
+
+# ============================================================
+# Token 估算
+# ============================================================
+_CJK_CHAR = re.compile(
+    r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]'
+)
+
+
+def estimate_tokens(text: str,
+                    chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """估算 token 數：CJK 每字 1 token，其餘依 chars_per_token 換算"""
+    cjk = len(text) - len(_CJK_CHAR.sub("", text))
+    return cjk + math.ceil((len(text) - cjk) / chars_per_token)
+
+
+# ============================================================
+# Front Matter 解析
+# ============================================================
+_FRONT_MATTER = re.compile(r'\A---\n(.*?)\n---\n', re.DOTALL)
+
+
+def split_front_matter(content: str):
+    """
+    拆開 generate_front_matter() 寫入的 YAML 與正文
+
+    Returns:
+        (metadata dict, 正文)；沒有或格式錯誤時 metadata 為空 dict
+    """
+    m = _FRONT_MATTER.match(content)
+    if not m:
+        return {}, content
+    try:
+        data = yaml.safe_load(m.group(1))
+    except yaml.YAMLError:
+        data = None
+    return (data if isinstance(data, dict) else {}), content[m.end():]
+
+
+def parse_front_matter(content: str) -> dict:
+    """讀取 generate_front_matter() 寫入的 YAML；沒有或格式錯誤時回傳空 dict"""
+    return split_front_matter(content)[0]
+
+
+def _cacheable(value):
+    """
+    front matter 轉成 JSON 原生型別 (日期等 -> str)，
+    讓新掃描與讀快取回傳相同型別
+    """
+    if isinstance(value, dict):
+        return {str(k): _cacheable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_cacheable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+# ============================================================
+# Token 快取
+# ============================================================
+def load_token_cache(corpus_path: Path, chars_per_token: float) -> dict:
+    """讀取快取；估算參數不同或損毀時回傳空 dict"""
+    cache_path = corpus_path / TOKEN_CACHE_FILE
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"  WARNING: Unreadable token cache, rebuilding: {cache_path}")
+        return {}
+    if (data.get("estimator_version") != ESTIMATOR_VERSION
+            or data.get("chars_per_token") != chars_per_token):
+        return {}
+    return data.get("files", {})
+
+
+def save_token_cache(corpus_path: Path, entries: dict, chars_per_token: float):
+    """寫回快取 (先寫暫存檔再取代)"""
+    cache_path = corpus_path / TOKEN_CACHE_FILE
+    tmp_path = cache_path.with_suffix(".tmp")
+    data = {
+        "estimator_version": ESTIMATOR_VERSION,
+        "chars_per_token": chars_per_token,
+        "files": dict(sorted(entries.items())),
+    }
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def scan_corpus(corpus_dir: str,
+                chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+                save_cache: bool = True) -> list:
+    """
+    掃描資料夾內所有 .md，回傳文件清單 (依 sop_number, 檔名排序)
+
+    每筆: {"file", "tokens", "metadata"}。size/mtime 未變時直接用快取，
+    變了才比對 SHA-256，內容真的改變才重新讀檔估算。
+    save_cache=False 時不寫回快取 (dry run 不寫任何檔案)。
+    """
+    corpus_path = Path(corpus_dir)
+    old_cache = load_token_cache(corpus_path, chars_per_token)
+    cache = {}
+    docs = []
+
+    for f in sorted(corpus_path.glob("*.md")):
+        if f.name.upper() == "README.MD":
+            continue
+        st = f.stat()
+        entry = old_cache.get(f.name)
+        if entry and not (entry.get("size") == st.st_size
+                          and entry.get("mtime") == st.st_mtime):
+            digest = file_sha256(str(f))
+            entry = dict(entry, size=st.st_size, mtime=st.st_mtime) \
+                if digest == entry.get("sha256") else None
+        if not entry:
+            content = f.read_text(encoding="utf-8")
+            entry = {
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "sha256": file_sha256(str(f)),
+                "tokens": estimate_tokens(content, chars_per_token),
+                "metadata": _cacheable(parse_front_matter(content)),
+            }
+        cache[f.name] = entry
+        docs.append({"file": f.name, "tokens": entry["tokens"],
+                     "metadata": entry["metadata"]})
+
+    if save_cache:
+        save_token_cache(corpus_path, cache, chars_per_token)
+    docs.sort(key=lambda d: (str(d["metadata"].get("sop_number", "")),
+                             d["file"]))
+    return docs
+
+
+# ============================================================
+# 篩選
+# ============================================================
+def _norm(values) -> set:
+    if values is None:
+        return set()
+    if isinstance(values, (list, tuple, set)):
+        return {str(v).strip().lower() for v in values}
+    return {str(values).strip().lower()}
+
+
+def select_documents(docs: list, departments=(), doc_types=(), tags=()) -> list:
+    """
+    依 front matter 篩選；同一欄位內任一值符合即可 (OR)，欄位之間為 AND。
+    比對不分大小寫；空的條件代表不篩選。
+    """
+    departments, doc_types, tags = _norm(departments), _norm(doc_types), _norm(tags)
+    selected = []
+    for d in docs:
+        meta = d["metadata"]
+        if departments and not departments & _norm(meta.get("department")):
+            continue
+        if doc_types and not doc_types & _norm(meta.get("doc_type")):
+            continue
+        if tags and not tags & _norm(meta.get("tags")):
+            continue
+        selected.append(d)
+    return selected
+
+
+# ============================================================
+# 打包
+# ============================================================
+BUNDLE_HEADER = "# SOP Context Bundle {index}/{total}\n\n## Table of Contents\n\n"
+DOC_BEGIN = "\n\n<!-- BEGIN DOC: {file} -->\n\n"
+DOC_END = "\n\n<!-- END DOC: {file} -->\n"
+
+
+def toc_line(n: int, doc: dict) -> str:
+    """目錄中的一行：編號、SOP 編號、標題、部門、估算 token"""
+    meta = doc["metadata"]
+    return (f"{n}. {meta.get('sop_number', 'TBD')} | "
+            f"{meta.get('title', doc['file'])} | "
+            f"{meta.get('department', 'TBD')} | "
+            f"~{doc['tokens']:,} tokens | `{doc['file']}`\n")
+
+
+def doc_overhead(n: int, doc: dict, chars_per_token: float) -> int:
+    """文件本身以外的成本：目錄行 + 前後分隔標記"""
+    wrapper = (toc_line(n, doc) + DOC_BEGIN.format(file=doc["file"])
+               + DOC_END.format(file=doc["file"]))
+    return estimate_tokens(wrapper, chars_per_token)
+
+
+def plan_bundles(docs: list, budget: int,
+                 chars_per_token: float = DEFAULT_CHARS_PER_TOKEN):
+    """
+    依排序順序貪婪地分配文件到 bundle，每個 bundle 不超過 budget
+
+    Returns:
+        (bundles, oversized) — bundles 為文件清單的清單；
+        單獨一份就超過 budget 的文件放入 oversized
+    """
+    # 頁首以最大可能的 index/total 估算，保證實際輸出不會超出
+    header_cost = estimate_tokens(
+        BUNDLE_HEADER.format(index=len(docs), total=len(docs)), chars_per_token)
+    bundles, oversized = [], []
+    current, used = [], header_cost
+
+    for doc in docs:
+        cost = doc["tokens"] + doc_overhead(len(current) + 1, doc, chars_per_token)
+        if header_cost + doc_overhead(1, doc, chars_per_token) + doc["tokens"] > budget:
+            oversized.append(doc)
+            continue
+        if current and used + cost > budget:
+            bundles.append(current)
+            current, used = [], header_cost
+            cost = doc["tokens"] + doc_overhead(1, doc, chars_per_token)
+        current.append(doc)
+        used += cost
+
+    if current:
+        bundles.append(current)
+    return bundles, oversized
+
+
+def render_bundle(corpus_path: Path, docs: list, index: int, total: int) -> str:
+    """組出一個 bundle 的 Markdown (目錄 + 各文件原文)"""
+    parts = [BUNDLE_HEADER.format(index=index, total=total)]
+    parts.extend(toc_line(n, d) for n, d in enumerate(docs, 1))
+    for d in docs:
+        parts.append(DOC_BEGIN.format(file=d["file"]))
+        parts.append((corpus_path / d["file"]).read_text(encoding="utf-8").strip())
+        parts.append(DOC_END.format(file=d["file"]))
+    return "".join(parts)
+
+
+def pack_corpus(
+    corpus_dir: str,
+    output_dir: str,
+    budget: int = DEFAULT_BUDGET,
+    reserve: int = DEFAULT_RESERVE,
+    departments=(),
+    doc_types=(),
+    tags=(),
+    max_bundles: int = 0,
+    chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+    dry_run: bool = False,
+) -> dict:
+    """
+    篩選並打包語料，寫出 bundle_NNN.md 與 pack_manifest.json
+
+    Args:
+        budget: 模型 context window (tokens)
+        reserve: 保留給 prompt / 回答的 tokens；每個 bundle 上限 = budget - reserve
+        max_bundles: 最多輸出幾個 bundle (0 = 不限)，其餘文件列為 excluded
+        dry_run: 只計算與列出結果，不寫檔
+
+    Returns:
+        manifest dict
+    """
+    corpus_path = Path(corpus_dir)
+    output_path = Path(output_dir)
+    limit = budget - reserve
+    if limit <= 0:
+        raise ValueError(f"reserve ({reserve}) must be smaller than budget ({budget})")
+
+    docs = scan_corpus(corpus_dir, chars_per_token, save_cache=not dry_run)
+    selected = select_documents(docs, departments, doc_types, tags)
+    bundles, oversized = plan_bundles(selected, limit, chars_per_token)
+
+    excluded = []
+    if max_bundles and len(bundles) > max_bundles:
+        excluded = [d for b in bundles[max_bundles:] for d in b]
+        bundles = bundles[:max_bundles]
+
+    manifest = {
+        "packer_version": VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "corpus": str(corpus_path),
+        "budget": budget,
+        "reserve": reserve,
+        "chars_per_token": chars_per_token,
+        "filters": {
+            "department": sorted(_norm(departments)),
+            "doc_type": sorted(_norm(doc_types)),
+            "tags": sorted(_norm(tags)),
+        },
+        "corpus_documents": len(docs),
+        "corpus_tokens": sum(d["tokens"] for d in docs),
+        "bundles": [],
+        "oversized": [d["file"] for d in oversized],
+        "excluded": [d["file"] for d in excluded],
+    }
+
+    if not dry_run:
+        output_path.mkdir(parents=True, exist_ok=True)
+        # 清掉上次較多的 bundle，避免殘留舊檔
+        for old in output_path.glob("bundle_*.md"):
+            old.unlink()
+
+    for i, bundle in enumerate(bundles, 1):
+        name = f"bundle_{i:03d}.md"
+        entry = {"file": name, "documents": [d["file"] for d in bundle]}
+        if dry_run:
+            entry["tokens"] = sum(d["tokens"] for d in bundle)
+        else:
+            text = render_bundle(corpus_path, bundle, i, len(bundles))
+            (output_path / name).write_text(text, encoding="utf-8")
+            entry["tokens"] = estimate_tokens(text, chars_per_token)
+        manifest["bundles"].append(entry)
+
+    if not dry_run:
+        with open(output_path / PACK_MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
+
+
+# ============================================================
+# CLI Entry Point
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"SOP Context Packer v{VERSION} - pack sops_markdown/ into "
+                    "token-budgeted upload bundles")
+    parser.add_argument("corpus", help="Folder of converted SOP Markdown")
+    parser.add_argument("output", help="Output folder for bundle_NNN.md")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Context window in tokens (default: {DEFAULT_BUDGET})")
+    parser.add_argument("--reserve", type=int, default=DEFAULT_RESERVE,
+                        help=f"Tokens kept free for prompt/answer (default: {DEFAULT_RESERVE})")
+    parser.add_argument("--department", action="append", default=[],
+                        help="Only include this department (repeatable)")
+    parser.add_argument("--doc-type", action="append", default=[],
+                        help="Only include this doc_type (repeatable)")
+    parser.add_argument("--tag", action="append", default=[],
+                        help="Only include documents with this tag (repeatable)")
+    parser.add_argument("--max-bundles", type=int, default=0,
+                        help="Emit at most N bundles (0 = as many as needed)")
+    parser.add_argument("--chars-per-token", type=float,
+                        default=DEFAULT_CHARS_PER_TOKEN,
+                        help="Non-CJK characters per token for estimation")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report the packing plan without writing files")
+    args = parser.parse_args()
+
+    if not Path(args.corpus).is_dir():
+        print(f"Error: Folder not found: {args.corpus}")
+        return 1
+
+    try:
+        manifest = pack_corpus(
+            args.corpus, args.output,
+            budget=args.budget,
+            reserve=args.reserve,
+            departments=args.department,
+            doc_types=args.doc_type,
+            tags=args.tag,
+            max_bundles=args.max_bundles,
+            chars_per_token=args.chars_per_token,
+            dry_run=args.dry_run,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"\n{'='*50}")
+    print("SOP Context Packer")
+    print(f"{'='*50}")
+    print(f"Corpus: {manifest['corpus_documents']} docs, "
+          f"~{manifest['corpus_tokens']:,} tokens")
+    print(f"Budget: {args.budget:,} - {args.reserve:,} reserve")
+    for b in manifest["bundles"]:
+        print(f"  {b['file']}: {len(b['documents'])} docs, ~{b['tokens']:,} tokens")
+    if manifest["oversized"]:
+        print(f"  Oversized (larger than budget alone): {', '.join(manifest['oversized'])}")
+    if manifest["excluded"]:
+        print(f"  Excluded by --max-bundles: {len(manifest['excluded'])} docs")
+    print(f"{'='*50}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""
+SOP Search Index
+================
+對 batch_convert() 輸出的 Markdown 建立本地倒排索引 (以章節為單位)，
+用 BM25 排序，先篩出相關章節再送進模型，縮小 context。
+
+使用方式：
+  python sop_search_index.py build ../../sops_markdown/
+  python sop_search_index.py query ../../sops_markdown/ "filter integrity test 過濾"
+
+安裝依賴：
+  pip install pyyaml
+
+備註：
+  - 斷詞：英數字以單字為單位 (QA-0012 同時索引整體與各段)，
+    CJK 連續字串切成雙字 (bigram)，單一 CJK 字保留為 unigram
+  - 章節：以 #/##/### 標題切分 (pdf_to_md_pymupdf 產生 ##/###)
+  - 索引存在 <corpus>/.search_index.json；query 前自動增量更新，
+    只重新解析 size/mtime/SHA-256 有變動的 .md
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import heapq
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+
+from sop_to_markdown import file_sha256
+from sop_context_packer import split_front_matter
+
+VERSION = "1.0.0"
+INDEX_FILE = ".search_index.json"
+# 斷詞或章節規則改變時遞增，讓舊索引整份重建
+INDEX_FORMAT = 1
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+# ============================================================
+# 斷詞 (英文 + CJK)
+# ============================================================
+_TOKEN = re.compile(
+    r'(?P<cjk>[\u4e00-\u9fff\u3400-\u4dbf]+)'
+    r'|(?P<word>[a-z0-9]+(?:[-._][a-z0-9]+)*)'
+)
+_WORD_PARTS = re.compile(r'[-._]')
+
+
+def tokenize(text: str) -> list:
+    """
+    將中英混合文字切成索引詞
+
+    英數字轉小寫；含 - . _ 的複合詞 (如 qa-0012.v08) 同時保留整體與各段。
+    CJK 連續字串切成重疊雙字，例如 過濾測試 -> 過濾 濾測 測試。
+    """
+    tokens = []
+    for m in _TOKEN.finditer(text.lower()):
+        run = m.group("cjk")
+        if run:
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            continue
+        word = m.group("word")
+        tokens.append(word)
+        if _WORD_PARTS.search(word):
+            tokens.extend(p for p in _WORD_PARTS.split(word) if p)
+    return tokens
+
+
+# ============================================================
+# 章節切分
+# ============================================================
+_HEADING = re.compile(r'^(#{1,3})\s+(.+?)\s*#*\s*$')
+
+
+def split_sections(body: str, first_line: int = 1, title: str = "") -> list:
+    """
+    依 #/##/### 標題切分正文
+
+    Returns:
+        [{"heading", "level", "line", "text"}]；第一個標題前的內容
+        以文件標題 (level 0) 作為一節。line 為標題在原檔的行號 (1-based)。
+    """
+    sections = []
+    current = {"heading": title, "level": 0, "line": first_line, "lines": []}
+    for n, line in enumerate(body.split("\n"), first_line):
+        m = _HEADING.match(line)
+        if m:
+            sections.append(current)
+            current = {"heading": m.group(2), "level": len(m.group(1)),
+                       "line": n, "lines": []}
+        else:
+            current["lines"].append(line)
+    sections.append(current)
+
+    result = []
+    for s in sections:
+        text = "\n".join(s.pop("lines")).strip()
+        if text or s["level"]:
+            s["text"] = text
+            result.append(s)
+    return result
+
+
+def index_file(filepath: Path) -> dict:
+    """解析單一 .md，回傳可存入索引的紀錄 (不含原文)"""
+    content = filepath.read_text(encoding="utf-8")
+    meta, body = split_front_matter(content)
+    first_line = content.count("\n", 0, len(content) - len(body)) + 1
+    title = str(meta.get("title", "") or filepath.stem)
+
+    sections = []
+    for s in split_sections(body, first_line, title):
+        # 標題本身也計入該節，讓「章節名稱」查詢命中
+        terms = tokenize(s["heading"] + "\n" + s["text"])
+        sections.append({
+            "heading": s["heading"],
+            "level": s["level"],
+            "line": s["line"],
+            "length": len(terms),
+            "tf": dict(Counter(terms)),
+        })
+
+    return {
+        "sop_number": str(meta.get("sop_number", "")),
+        "title": title,
+        "sections": sections,
+    }
+
+
+# ============================================================
+# 索引
+# ============================================================
+class SearchIndex:
+    """
+    以章節為文件單位的 BM25 倒排索引
+
+    files 為可序列化的 {檔名: 紀錄}；postings 在載入時由各節的 tf 組出，
+    只存在記憶體中。
+    """
+
+    def __init__(self, files: dict):
+        self.files = files
+        self.sections = []          # [(檔名, section dict)]
+        self.postings = {}          # term -> [(section idx, tf)]
+        for name in sorted(files):
+            for sec in files[name]["sections"]:
+                idx = len(self.sections)
+                self.sections.append((name, sec))
+                for term, tf in sec["tf"].items():
+                    self.postings.setdefault(term, []).append((idx, tf))
+        total = sum(sec["length"] for _, sec in self.sections)
+        self.avg_length = total / len(self.sections) if self.sections else 0.0
+
+    def search(self, query: str, k: int = 10) -> list:
+        """
+        BM25 查詢
+
+        Returns:
+            依分數排序的 [{"score", "file", "sop_number", "title",
+            "heading", "level", "line"}]，最多 k 筆
+        """
+        n = len(self.sections)
+        if not n:
+            return []
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for idx, tf in postings:
+                length = self.sections[idx][1]["length"]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.avg_length)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        results = []
+        for idx, score in heapq.nlargest(k, scores.items(), key=lambda x: x[1]):
+            name, sec = self.sections[idx]
+            doc = self.files[name]
+            results.append({
+                "score": round(score, 4),
+                "file": name,
+                "sop_number": doc["sop_number"],
+                "title": doc["title"],
+                "heading": sec["heading"],
+                "level": sec["level"],
+                "line": sec["line"],
+            })
+        return results
+
+
+def load_index_files(corpus_path: Path) -> dict:
+    """讀取索引檔；格式版本不同或損毀時回傳空 dict (整份重建)"""
+    index_path = corpus_path / INDEX_FILE
+    if not index_path.exists():
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"  WARNING: Unreadable search index, rebuilding: {index_path}")
+        return {}
+    if data.get("index_format") != INDEX_FORMAT:
+        return {}
+    return data.get("files", {})
+
+
+def save_index_files(corpus_path: Path, files: dict):
+    """寫回索引檔 (先寫暫存檔再取代)"""
+    index_path = corpus_path / INDEX_FILE
+    tmp_path = index_path.with_suffix(".tmp")
+    data = {
+        "index_format": INDEX_FORMAT,
+        "script_version": VERSION,
+        "updated_at": datetime.now().isoformat(),
+        "files": dict(sorted(files.items())),
+    }
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+
+def update_index(corpus_dir: str, force: bool = False):
+    """
+    增量更新索引：只重新解析新增或內容有變動的 .md，移除已刪除的檔案
+
+    Returns:
+        (SearchIndex, {"indexed", "unchanged", "removed"})
+    """
+    corpus_path = Path(corpus_dir)
+    old_files = {} if force else load_index_files(corpus_path)
+    files = {}
+    stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+    dirty = force
+
+    for f in sorted(corpus_path.glob("*.md")):
+        if f.name.upper() == "README.MD":
+            continue
+        st = f.stat()
+        entry = old_files.get(f.name)
+        digest = None
+        if entry and not (entry.get("size") == st.st_size
+                          and entry.get("mtime") == st.st_mtime):
+            # mtime 改變但內容相同 (例如重新複製) 仍沿用
+            digest = file_sha256(str(f))
+            if digest != entry.get("sha256"):
+                entry = None
+        if entry:
+            stats["unchanged"] += 1
+            dirty = dirty or digest is not None
+        else:
+            entry = index_file(f)
+            stats["indexed"] += 1
+        entry.update(size=st.st_size, mtime=st.st_mtime,
+                     sha256=digest or entry.get("sha256") or file_sha256(str(f)))
+        files[f.name] = entry
+
+    stats["removed"] = len(set(old_files) - set(files))
+    if dirty or stats["indexed"] or stats["removed"] \
+            or not (corpus_path / INDEX_FILE).exists():
+        save_index_files(corpus_path, files)
+    return SearchIndex(files), stats
+
+
+def read_section(corpus_dir: str, result: dict, max_chars: int = 300) -> str:
+    """讀出查詢結果所在章節的開頭文字 (供預覽)"""
+    # 有標題的節從標題下一行開始；文件開頭那節 (level 0) 從 line 本身開始
+    start = result["line"] if result["level"] else result["line"] - 1
+    lines = (Path(corpus_dir) / result["file"]).read_text(
+        encoding="utf-8").split("\n")[start:]
+    text = []
+    for line in lines:
+        if _HEADING.match(line):
+            break
+        text.append(line)
+    snippet = " ".join(" ".join(text).split())
+    return snippet[:max_chars] + ("..." if len(snippet) > max_chars else "")
+
+
+# ============================================================
+# CLI Entry Point
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"SOP Search Index v{VERSION} - BM25 over converted SOP Markdown")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Build or incrementally update the index")
+    p_build.add_argument("corpus", help="Folder of converted SOP Markdown")
+    p_build.add_argument("--force", action="store_true",
+                         help="Ignore the existing index and rebuild everything")
+
+    p_query = sub.add_parser("query", help="Search the index")
+    p_query.add_argument("corpus", help="Folder of converted SOP Markdown")
+    p_query.add_argument("text", help="Query text (English and/or Chinese)")
+    p_query.add_argument("-k", type=int, default=10, help="Number of results")
+    p_query.add_argument("--snippet", action="store_true",
+                         help="Show the start of each matching section")
+    p_query.add_argument("--json", action="store_true",
+                         help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not Path(args.corpus).is_dir():
+        print(f"Error: Folder not found: {args.corpus}")
+        return 1
+
+    t0 = time.perf_counter()
+    index, stats = update_index(args.corpus, force=getattr(args, "force", False))
+    t_update = time.perf_counter() - t0
+
+    if args.command == "build":
+        print(f"Indexed: {stats['indexed']}, unchanged: {stats['unchanged']}, "
+              f"removed: {stats['removed']}")
+        print(f"Sections: {len(index.sections)}, terms: {len(index.postings)} "
+              f"({t_update * 1000:.0f} ms)")
+        return 0
+
+    t0 = time.perf_counter()
+    results = index.search(args.text, args.k)
+    t_query = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"{len(results)} results for: {args.text}  "
+          f"(query {t_query * 1000:.1f} ms, index refresh {t_update * 1000:.0f} ms)")
+    for n, r in enumerate(results, 1):
+        print(f"\n{n}. [{r['score']:.2f}] {r['sop_number'] or r['file']} | "
+              f"{r['heading']}  ({r['file']}:{r['line']})")
+        if args.snippet:
+            print(f"   {read_section(args.corpus, r)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,16 +13,25 @@ SOP to Markdown Converter
   - mammoth: Word -> HTML -> Markdown (表格支援好)
   - markitdown: 微軟出品，Word/PDF/PPT 都能轉 (簡單快速)
   - pymupdf: PDF 文字提取 (輕量，不需 OCR 的場景)
+  - 掃描頁 (文字層過少且含圖片) 自動改走 Tesseract OCR，需另裝
+    pip install pytesseract 與 Tesseract 本體 (含 chi_tra 語言包)
   - 如需高品質 PDF 轉換(含表格、圖片)，另裝 marker-pdf
 """
 
 import os
 import re
 import sys
+import json
+import bisect
+import hashlib
+import functools
 import yaml
 from pathlib import Path
 from datetime import datetime
 
+VERSION = "1.2.0"
+MANIFEST_FILE = ".conversion_manifest.json"
+
 
 # ============================================================
 # 方法 1: mammoth (Word -> Markdown, 表格支援最好)
@@ -39,49 +48,237 @@ def docx_to_md_mammoth(filepath: str) -> str:
 # ============================================================
 # 方法 2: markitdown (微軟出品, 支援 Word/PDF/PPT/Excel)
 # ============================================================
-def file_to_md_markitdown(filepath: str) -> str:
-    """用微軟 markitdown 轉換（最簡單的萬用方案）"""
+@functools.lru_cache(maxsize=1)
+def _get_markitdown():
+    """每個 process 只建立一次 MarkItDown (建構時會載入所有轉換器)"""
     from markitdown import MarkItDown
 
-    md = MarkItDown()
-    result = md.convert(filepath)
+    return MarkItDown()
+
+
+def file_to_md_markitdown(filepath: str) -> str:
+    """用微軟 markitdown 轉換（最簡單的萬用方案）"""
+    result = _get_markitdown().convert(filepath)
     return result.text_content
 
 
 # ============================================================
 # 方法 3: PyMuPDF (PDF -> 文字, 輕量快速)
 # ============================================================
-def pdf_to_md_pymupdf(filepath: str, skip_first_page: bool = True) -> str:
-    """用 PyMuPDF 提取 PDF 文字，加上基本 Markdown 格式"""
+# 簡單的標題偵測：全大寫或短行可能是標題
+_SECTION_HEADING = re.compile(r'^\d+\.?\s+[A-Z\s]{4,}$')     # "1. PURPOSE"
+_SUBSECTION_HEADING = re.compile(r'^\d+\.\d+\.?\s+')          # "1.1 ..."
+PAGE_SEPARATOR = "\n\n---\n\n"
+# 每個 worker 至少分到的頁數；頁數太少時不值得啟動 process pool
+MIN_PAGES_PER_WORKER = 8
+# 每頁可選取文字少於此字數且含圖片 => 視為掃描頁，改走 OCR
+MIN_TEXT_CHARS = 25
+OCR_DPI = 300
+DEFAULT_OCR_LANG = "chi_tra+eng"
+
+
+def _format_page_text(text: str) -> str:
+    """把單頁純文字加上 ##/### 標題標記"""
+    formatted_lines = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            formatted_lines.append("")
+            continue
+        # 偵測可能的章節標題 (例如 "1. PURPOSE", "2. SCOPE")
+        if _SECTION_HEADING.match(stripped):
+            formatted_lines.append(f"## {stripped}")
+        elif _SUBSECTION_HEADING.match(stripped):
+            formatted_lines.append(f"### {stripped}")
+        else:
+            formatted_lines.append(stripped)
+    return "\n".join(formatted_lines)
+
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> list:
+    """
+    提取 [start, stop) 頁並依文字層密度分流
+
+    每個 worker 自己開啟 fitz 文件 (fitz.Document 不能跨 process 傳遞)。
+
+    Returns:
+        [(route, 格式化文字)]；route 為 "text"，或 "ocr" (文字過少且含圖片，
+        文字留空待 OCR)
+    """
     import fitz  # PyMuPDF
 
-    doc = fitz.open(filepath)
     pages = []
+    with fitz.open(filepath) as doc:
+        for i in range(start, min(stop, doc.page_count)):
+            page = doc[i]
+            text = page.get_text("text")
+            if len(text.strip()) < MIN_TEXT_CHARS and page.get_images():
+                pages.append(("ocr", ""))
+            else:
+                pages.append(("text", _format_page_text(text)))
+    return pages
 
-    for i, page in enumerate(doc):
-        # Skip scanned cover/signature page (usually page 1)
-        if skip_first_page and i == 0:
-            continue
-        text = page.get_text("text")
-        # 簡單的標題偵測：全大寫或短行可能是標題
-        lines = text.split("\n")
-        formatted_lines = []
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                formatted_lines.append("")
-                continue
-            # 偵測可能的章節標題 (例如 "1. PURPOSE", "2. SCOPE")
-            if re.match(r'^\d+\.?\s+[A-Z\s]{4,}$', stripped):
-                formatted_lines.append(f"## {stripped}")
-            elif re.match(r'^\d+\.\d+\.?\s+', stripped):
-                formatted_lines.append(f"### {stripped}")
+
+def _ocr_page(filepath: str, index: int, lang: str = DEFAULT_OCR_LANG,
+              dpi: int = OCR_DPI) -> str:
+    """以 Tesseract OCR 單一頁 (每次呼叫自行開啟文件，可在 worker 中執行)"""
+    import fitz  # PyMuPDF
+    import pytesseract
+    from PIL import Image
+
+    with fitz.open(filepath) as doc:
+        pix = doc[index].get_pixmap(dpi=dpi)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    return pytesseract.image_to_string(img, lang=lang)
+
+
+def _ocr_pages(filepath: str, indexes: list, ocr_workers: int = 1,
+               lang: str = DEFAULT_OCR_LANG) -> dict:
+    """
+    OCR 指定頁面，使用獨立於文字提取的 process pool
+
+    Returns:
+        {頁索引: (route, 格式化文字)}；缺少 pytesseract / Tesseract 時 route
+        為 "ocr-unavailable"，單頁失敗為 "ocr-failed"，文字皆留空
+    """
+    try:
+        import pytesseract  # noqa: F401
+    except ImportError:
+        print(f"  WARNING: {len(indexes)} image-only pages need OCR; "
+              f"install with: pip install pytesseract (+ Tesseract)")
+        return {i: ("ocr-unavailable", "") for i in indexes}
+
+    results = {}
+    if ocr_workers <= 1 or len(indexes) <= 1:
+        outcomes = ((i, _try(_ocr_page, filepath, i, lang)) for i in indexes)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=ocr_workers)
+        futures = {i: pool.submit(_ocr_page, filepath, i, lang) for i in indexes}
+        outcomes = ((i, _try(f.result)) for i, f in futures.items())
+    try:
+        for i, (text, error) in outcomes:
+            if error is None:
+                results[i] = ("ocr", _format_page_text(text))
             else:
-                formatted_lines.append(stripped)
-        pages.append("\n".join(formatted_lines))
+                print(f"  WARNING: OCR failed on page {i + 1}: {error}")
+                results[i] = ("ocr-failed", "")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+
+def _try(func, *args):
+    """執行 func，回傳 (結果, None) 或 (None, 例外)"""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
+
+
+def pdf_pages_routed(filepath: str, skip_first_page: bool = True,
+                     page_workers: int = 1, ocr_workers: int = 1,
+                     ocr_lang: str = DEFAULT_OCR_LANG):
+    """
+    PyMuPDF 提取 + 掃描頁 OCR 分流 (逐頁)
+
+    先以 PyMuPDF 提取所有頁面並量測文字層；有文字的頁面直接使用，
+    只有文字過少且含圖片的頁面才送 OCR。
+
+    Args:
+        skip_first_page: 跳過掃描的封面/簽核頁
+        page_workers: 平行提取頁面的 process 數量；頁面按連續區段分配，
+                      輸出與逐頁提取完全相同
+        ocr_workers: OCR 的 process 數量 (獨立的 pool)
+        ocr_lang: Tesseract 語言
 
-    doc.close()
-    return "\n\n---\n\n".join(pages)
+    Returns:
+        ([每頁 Markdown], {頁碼 (1-based): route})
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(filepath) as doc:
+        page_count = doc.page_count
+    first = 1 if skip_first_page else 0
+    n_pages = max(page_count - first, 0)
+
+    workers = min(page_workers, n_pages // MIN_PAGES_PER_WORKER)
+    if workers <= 1:
+        pages = _extract_page_range(filepath, first, page_count)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        step = -(-n_pages // workers)
+        starts = list(range(first, page_count, step))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_extract_page_range, [filepath] * len(starts),
+                             starts, [s + step for s in starts])
+            pages = [page for part in parts for page in part]
+
+    ocr_indexes = [first + k for k, (route, _) in enumerate(pages) if route == "ocr"]
+    if ocr_indexes:
+        for i, result in _ocr_pages(filepath, ocr_indexes, ocr_workers, ocr_lang).items():
+            pages[i - first] = result
+
+    routes = {first + k + 1: route for k, (route, _) in enumerate(pages)}
+    return [text for _, text in pages], routes
+
+
+def page_chunks(pages):
+    """逐頁文字穿插分頁線；"".join() 的結果與 PAGE_SEPARATOR.join(pages) 相同"""
+    for i, text in enumerate(pages):
+        if i:
+            yield PAGE_SEPARATOR
+        yield text
+
+
+def pdf_to_md_routed(filepath: str, skip_first_page: bool = True,
+                     page_workers: int = 1, ocr_workers: int = 1,
+                     ocr_lang: str = DEFAULT_OCR_LANG):
+    """
+    pdf_pages_routed() 的整份文件版本
+
+    Returns:
+        (Markdown, {頁碼 (1-based): route})
+    """
+    pages, routes = pdf_pages_routed(filepath, skip_first_page, page_workers,
+                                     ocr_workers, ocr_lang)
+    return PAGE_SEPARATOR.join(pages), routes
+
+
+def pdf_to_md_pymupdf(filepath: str, skip_first_page: bool = True,
+                      page_workers: int = 1, ocr_workers: int = 1,
+                      ocr_lang: str = DEFAULT_OCR_LANG) -> str:
+    """用 PyMuPDF 提取 PDF 文字，加上基本 Markdown 格式 (掃描頁走 OCR)"""
+    return pdf_to_md_routed(filepath, skip_first_page, page_workers,
+                            ocr_workers, ocr_lang)[0]
+
+
+def page_route_summary(routes: dict) -> dict:
+    """{頁碼: route} 壓縮成 {route: "2-14,16"} 供 front matter 使用"""
+    by_route = {}
+    for page in sorted(routes):
+        by_route.setdefault(routes[page], []).append(page)
+    summary = {}
+    for route, pages in by_route.items():
+        spans, start, prev = [], pages[0], pages[0]
+        for p in pages[1:] + [None]:
+            if p is not None and p == prev + 1:
+                prev = p
+                continue
+            spans.append(f"{start}-{prev}" if prev > start else str(start))
+            if p is not None:
+                start = prev = p
+        summary[route] = ",".join(spans)
+    return summary
+
+
+def has_text_layer(content: str) -> bool:
+    """PyMuPDF 輸出是否有實際文字 (掃描檔只會剩分頁線與空白)"""
+    return bool(re.sub(r'[\s\-#]', '', content))
 
 
 # ============================================================
@@ -146,8 +343,14 @@ def parse_page2_header(content: str) -> dict:
 # ============================================================
 # YAML Front Matter 生成
 # ============================================================
-def generate_front_matter(filepath: str, content: str) -> str:
-    """從檔名和內容自動生成 YAML Front Matter"""
+def generate_front_matter(filepath: str, content: str,
+                          page_routes: dict = None) -> str:
+    """
+    從檔名和內容自動生成 YAML Front Matter
+
+    page_routes: pdf_to_md_routed() 回傳的 {頁碼: route}，記錄每頁走文字層
+                 或 OCR，方便事後抽查 OCR 頁面
+    """
     filename = Path(filepath).stem
     ext = Path(filepath).suffix.lower()
 
@@ -183,6 +386,8 @@ def generate_front_matter(filepath: str, content: str) -> str:
     }
     if effective_date:
         metadata["effective_date"] = effective_date
+    if page_routes:
+        metadata["page_routes"] = page_route_summary(page_routes)
 
     yaml_str = yaml.dump(
         metadata,
@@ -216,42 +421,316 @@ KEEP_PATTERNS = [
 ]
 
 
-def desensitize(content: str) -> str:
+# 字典式脫敏 (客戶/產品名稱等固定字串) 的替換文字
+TERM_REPLACEMENT = "[REDACTED]"
+
+# 開頭的全域 inline flag，例如 "(?i)"；合併 KEEP_PATTERNS 時需改為 scoped "(?i:...)"
+_INLINE_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+
+def _scoped_pattern(pattern: str) -> str:
+    """把 "(?i)xxx" 改寫成 "(?i:xxx)"，才能放進合併後的 alternation"""
+    m = _INLINE_FLAGS.match(pattern)
+    if not m:
+        return f"(?:{pattern})"
+    return f"(?{m.group(1)}:{pattern[m.end():]})"
+
+
+def _literal_trie_pattern(terms) -> str:
+    """
+    將大量固定字串編成 trie 形狀的 regex (共用前綴只比對一次)
+
+    例: ["Acme", "Acme Bio", "Abc"] -> "A(?:cme(?: Bio)?|bc)"
+    效果接近 Aho-Corasick：掃描成本與字典大小幾乎無關。
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term.lower():
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        optional = "" in node
+        branches = [
+            re.escape(ch) + build(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return build(trie)
+
+
+class RedactionEngine:
+    """
+    預先編譯的脫敏引擎
+
+    - REDACT_RULES 依序逐條套用 (與原本逐條 re.sub 結果相同；規則彼此
+      相鄰或重疊時，合併成單一 alternation 會讓先出現的匹配吃掉後面的)
+    - 字典字串編成單一 trie regex，不論字典多大都只掃描一次
+    - KEEP_PATTERNS 命中的區段視為保護區，與其重疊的匹配不替換
+    """
+
+    def __init__(self, rules, keep_patterns, terms=()):
+        self.rules = [
+            (re.compile(pattern), replacement)
+            for pattern, replacement, _desc in rules
+        ]
+
+        terms = sorted({t.strip() for t in terms if t.strip()})
+        # 前後不可緊鄰英數字，避免把長字串中的片段誤判；CJK 仍可命中
+        self.terms = (
+            re.compile(r"(?<![A-Za-z0-9])(?i:" + _literal_trie_pattern(terms)
+                       + r")(?![A-Za-z0-9])")
+            if terms else None
+        )
+        self.keep = (
+            re.compile("|".join(_scoped_pattern(p) for p in keep_patterns))
+            if keep_patterns else None
+        )
+        self.term_count = len(terms)
+
+    def _protected_spans(self, content: str):
+        if self.keep is None:
+            return [], []
+        spans = [m.span() for m in self.keep.finditer(content) if m.end() > m.start()]
+        return [s for s, _ in spans], [e for _, e in spans]
+
+    @staticmethod
+    def _sub(rx, expand, content, protected):
+        """rx.sub()，但與保護區重疊的匹配保留原文"""
+        starts, ends = protected
+
+        def replace(m):
+            if starts:
+                i = bisect.bisect_left(ends, m.start() + 1)
+                if i < len(starts) and starts[i] < m.end():
+                    return m.group(0)
+            return expand(m)
+
+        return rx.sub(replace, content)
+
+    def redact(self, content: str) -> str:
+        """依序套用規則，最後一次掃描替換字典字串"""
+        protected = self._protected_spans(content)
+        for rx, repl in self.rules:
+            new = self._sub(rx, lambda m, repl=repl: m.expand(repl),
+                            content, protected)
+            # 替換會位移後續文字，保護區需重新定位
+            if new != content and protected[0]:
+                protected = self._protected_spans(new)
+            content = new
+        if self.terms is not None:
+            content = self._sub(self.terms, lambda m: TERM_REPLACEMENT,
+                                content, protected)
+        return content
+
+
+@functools.lru_cache(maxsize=8)
+def get_redaction_engine(terms: tuple = ()) -> RedactionEngine:
+    """依字典內容快取已編譯的引擎 (同一 process 內只編譯一次)"""
+    return RedactionEngine(REDACT_RULES, KEEP_PATTERNS, terms)
+
+
+def load_redact_terms(filepath: str) -> tuple:
+    """讀取脫敏字典檔 (一行一個名稱，# 開頭為註解)"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        return tuple(
+            line.strip() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        )
+
+
+def desensitize(content: str, terms: tuple = ()) -> str:
     """對內容進行脫敏處理"""
-    result = content
-    for pattern, replacement, desc in REDACT_RULES:
-        result = re.sub(pattern, replacement, result)
-    return result
+    return get_redaction_engine(tuple(terms)).redact(content)
 
 
 # ============================================================
 # 品質清理
 # ============================================================
-def clean_markdown(content: str) -> str:
-    """清理轉換後的 Markdown，改善品質"""
-    # 移除連續多個空行 (保留最多2個)
-    content = re.sub(r'\n{4,}', '\n\n\n', content)
+# clean_markdown() 的四項規則 (與原本四次 re.sub 的結果逐字相同)：
+#   1. 連續空行最多保留 2 行      2. 移除行尾空白 (空格 / tab)
+#   3. 標題前補空行               4. 標題後補空行
+# 規則 3、4 沿用原本的 regex 語意 (\s 可跨行、規則 4 不限行首)，
+# 只在含 "#" 的行上執行，其餘行直接通過。
+_HEADING_START = re.compile(r'#{1,4}\s')
+_HEADING_FOLLOWED = re.compile(r'#{1,4}\s[^\n]+\n[^#\n]')
+_END = object()
+
+
+def _split_lines(chunks):
+    """把任意切分的文字片段 (例如逐頁) 轉成逐行；最後一個元素是最後一個換行之後的內容"""
+    tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split("\n")
+        tail = lines.pop()
+        yield from lines
+    yield tail
+
+
+def _collapse_blank_lines(lines):
+    """規則 1、2"""
+    empties = 0
+    for line in lines:
+        if line:
+            empties = 0
+            yield line.rstrip(" \t")
+        else:
+            empties += 1
+            if empties <= 2:
+                yield line
+
+
+def _blank_before_headings(lines):
+    """規則 3：前一行的最後一個字元尚未被上一個匹配吃掉時才補空行"""
+    it = iter(lines)
+    line = next(it, _END)
+    prev_open = False
+    while line is not _END:
+        nxt = next(it, _END)
+        m = None
+        if prev_open and line.startswith("#"):
+            # \s 可以是行尾的換行 (例如單獨一行 "##")
+            m = _HEADING_START.match(line if nxt is _END else line + "\n")
+        if m:
+            yield ""
+            prev_open = m.end() < len(line)
+        else:
+            prev_open = bool(line)
+        yield line
+        line = nxt
+
+
+def _blank_after_headings(lines):
+    """規則 4：以最多 3 行的視窗重現原 regex 由左至右、不重疊的匹配"""
+    it = iter(lines)
+    window = []
+    start = 0       # 上一個匹配已吃掉本行開頭的字元數
+    while True:
+        while len(window) < 3:
+            line = next(it, _END)
+            if line is _END:
+                break
+            window.append(line)
+        if not window:
+            return
+        line = window[0]
+        if line.find("#", start) >= 0:
+            seg = line[start:]
+            text = seg
+            if len(window) > 1:
+                text += "\n" + window[1]
+                if len(window) > 2:
+                    text += "\n" + window[2][:1]
+            m = _HEADING_FOLLOWED.search(text)
+            if m and m.start() < len(seg):
+                if m.end() == len(seg) + 2:
+                    # 標題行 + 下一行第一個字 => 空行插在兩行之間
+                    yield line
+                    del window[0]
+                else:
+                    # 行尾的 "#" 以換行作為 \s => 空行插在下一行之後
+                    yield line
+                    yield window[1]
+                    del window[:2]
+                yield ""
+                start = 1
+                continue
+        yield line
+        del window[0]
+        start = 0
+
+
+def clean_markdown_stream(chunks):
+    """
+    clean_markdown() 的串流版本：逐行一次處理完四項規則
 
-    # 移除行尾多餘空格
-    content = re.sub(r'[ \t]+$', '', content, flags=re.MULTILINE)
+    Args:
+        chunks: 文字片段的 iterable (整份文件、逐頁文字皆可；
+                片段可在任意位置切開，不必對齊行尾)
 
-    # 確保標題前有空行
-    content = re.sub(r'([^\n])\n(#{1,4}\s)', r'\1\n\n\2', content)
+    Yields:
+        清理後的 Markdown 片段；"".join() 的結果與 clean_markdown() 相同
+    """
+    lines = _blank_after_headings(_blank_before_headings(
+        _collapse_blank_lines(_split_lines(chunks))))
+    # 最後的 strip()：去掉開頭空白行，最後一個有內容的行保留到結尾才輸出
+    held = None
+    pending = []
+    for line in lines:
+        if not line.strip():
+            if held is not None:
+                pending.append(line)
+            continue
+        if held is None:
+            held = line.lstrip()
+            continue
+        yield held + "\n"
+        if pending:
+            yield "\n".join(pending) + "\n"
+            pending.clear()
+        held = line
+    yield ("" if held is None else held.rstrip()) + "\n"
 
-    # 確保標題後有空行
-    content = re.sub(r'(#{1,4}\s[^\n]+)\n([^#\n])', r'\1\n\n\2', content)
 
-    return content.strip() + "\n"
+def clean_markdown(content: str) -> str:
+    """清理轉換後的 Markdown，改善品質"""
+    return "".join(clean_markdown_stream((content,)))
 
 
 # ============================================================
 # 主轉換函數
 # ============================================================
+def resolve_method(filepath: str, method: str = "auto") -> str:
+    """依副檔名把 "auto" 解析為實際使用的轉換方法"""
+    if method != "auto":
+        return method
+
+    ext = Path(filepath).suffix.lower()
+    if ext == ".docx":
+        return "mammoth"
+    elif ext == ".pdf":
+        return "pymupdf"     # 最輕量；無文字層時 convert_file 改用 markitdown
+    else:
+        return "markitdown"  # 萬用方案
+
+
+def _run_method(filepath: str, method: str, page_workers: int = 1,
+                ocr_workers: int = 1, ocr_lang: str = DEFAULT_OCR_LANG):
+    """
+    Returns:
+        ([Markdown 片段], {頁碼: route} 或 None)；PDF 為逐頁片段 (含分頁線)，
+        可直接逐頁餵給 clean_markdown_stream()
+    """
+    if method == "mammoth":
+        return [docx_to_md_mammoth(filepath)], None
+    elif method == "markitdown":
+        return [file_to_md_markitdown(filepath)], None
+    elif method == "pymupdf":
+        pages, routes = pdf_pages_routed(filepath, page_workers=page_workers,
+                                         ocr_workers=ocr_workers,
+                                         ocr_lang=ocr_lang)
+        return list(page_chunks(pages)), routes
+    raise ValueError(f"Unknown method: {method}")
+
+
 def convert_file(
     filepath: str,
     method: str = "auto",
     add_front_matter: bool = True,
     do_desensitize: bool = False,
+    redact_terms: tuple = (),
+    page_workers: int = 1,
+    ocr_workers: int = 1,
+    ocr_lang: str = DEFAULT_OCR_LANG,
 ) -> str:
     """
     轉換單一檔案為 Markdown
@@ -261,33 +740,37 @@ def convert_file(
         method: 轉換方法 ("mammoth", "markitdown", "pymupdf", "auto")
         add_front_matter: 是否加上 YAML Front Matter
         do_desensitize: 是否執行脫敏
+        redact_terms: 額外的脫敏字典 (客戶/產品名稱)
+        page_workers: PyMuPDF 平行提取頁面的 process 數量
+        ocr_workers: 掃描頁 OCR 的 process 數量 (獨立的 pool)
+        ocr_lang: Tesseract 語言
 
     Returns:
         轉換後的 Markdown 字串
     """
-    ext = Path(filepath).suffix.lower()
-
-    # 自動選擇方法
-    if method == "auto":
-        if ext == ".docx":
-            method = "mammoth"
-        elif ext == ".pdf":
-            method = "markitdown"  # markitdown 也能處理 PDF
-        else:
-            method = "markitdown"  # 萬用方案
+    auto = method == "auto"
+    method = resolve_method(filepath, method)
 
     # 執行轉換
     print(f"  Converting: {Path(filepath).name} (method: {method})")
 
     try:
-        if method == "mammoth":
-            content = docx_to_md_mammoth(filepath)
-        elif method == "markitdown":
-            content = file_to_md_markitdown(filepath)
-        elif method == "pymupdf":
-            content = pdf_to_md_pymupdf(filepath)
-        else:
-            raise ValueError(f"Unknown method: {method}")
+        try:
+            chunks, routes = _run_method(filepath, method, page_workers,
+                                         ocr_workers, ocr_lang)
+        except ImportError:
+            if not (auto and method == "pymupdf"):
+                raise
+            print("  PyMuPDF not installed, falling back to markitdown")
+            method = "markitdown"
+            chunks, routes = _run_method(filepath, method)
+        # auto 模式：文字層與 OCR 都沒有結果 (例如未安裝 Tesseract) 才退回 markitdown
+        # (分頁線只含空白與 "-"，逐頁檢查與整份檢查結果相同)
+        if (auto and method == "pymupdf"
+                and not any(has_text_layer(c) for c in chunks)):
+            print("  No text layer, falling back to markitdown")
+            method = "markitdown"
+            chunks, routes = _run_method(filepath, method)
     except ImportError as e:
         print(f"  ERROR: Missing package - {e}")
         print(f"  Install with: pip install {method}")
@@ -296,45 +779,224 @@ def convert_file(
         print(f"  ERROR converting {filepath}: {e}")
         return ""
 
-    # 清理
-    content = clean_markdown(content)
+    # 清理 (逐頁串流，不先組成整份原始文件)
+    content = "".join(clean_markdown_stream(chunks))
 
     # 脫敏
     if do_desensitize:
-        content = desensitize(content)
+        content = desensitize(content, redact_terms)
 
     # 加 Front Matter
     if add_front_matter:
-        front_matter = generate_front_matter(filepath, content)
+        front_matter = generate_front_matter(filepath, content, routes)
         content = front_matter + content
 
     return content
 
 
+# ============================================================
+# 增量轉換 Manifest
+# ============================================================
+# 每個輸出資料夾保存一份 manifest，記錄來源檔的 size / mtime / SHA-256
+# 與轉換設定。來源與設定都沒變、且 .md 仍存在時直接跳過。
+def file_sha256(filepath: str) -> str:
+    """計算檔案 SHA-256 (分塊讀取，不整檔載入記憶體)"""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(output_path: Path) -> dict:
+    """讀取輸出資料夾內的 manifest；不存在或損毀時回傳空 dict"""
+    manifest_path = output_path / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"  WARNING: Unreadable manifest, rebuilding: {manifest_path}")
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(output_path: Path, entries: dict):
+    """寫回 manifest (先寫暫存檔再取代，避免中斷時留下半份 JSON)"""
+    manifest_path = output_path / MANIFEST_FILE
+    tmp_path = manifest_path.with_suffix(".tmp")
+    data = {
+        "script_version": VERSION,
+        "updated_at": datetime.now().isoformat(),
+        "files": dict(sorted(entries.items())),
+    }
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def conversion_settings(filepath: str, method: str, do_desensitize: bool,
+                        redact_terms: tuple = (), chunks: bool = False,
+                        ocr_lang: str = DEFAULT_OCR_LANG) -> dict:
+    """影響輸出內容的轉換設定；任何一項變動都需重新轉換"""
+    settings = {
+        "method": resolve_method(filepath, method),
+        "desensitize": do_desensitize,
+        "script_version": VERSION,
+    }
+    if settings["method"] == "pymupdf":
+        settings["ocr_lang"] = ocr_lang
+    if do_desensitize and redact_terms:
+        settings["redact_terms_sha256"] = hashlib.sha256(
+            "\n".join(sorted(redact_terms)).encode("utf-8")
+        ).hexdigest()
+    if chunks:
+        settings["chunks"] = True
+    return settings
+
+
+def is_up_to_date(f: Path, entry: dict, settings: dict, output_path: Path):
+    """
+    判斷來源檔是否可跳過
+
+    Returns:
+        (是否跳過, 來源 SHA-256 或 None)
+        size/mtime 未變時不計算 hash；變了才讀檔比對內容。
+    """
+    if not entry or entry.get("settings") != settings:
+        return False, None
+    if not (output_path / entry.get("output", "")).exists():
+        return False, None
+
+    st = f.stat()
+    if entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+        return True, entry.get("sha256")
+
+    # mtime 改變但內容相同 (例如重新複製) 仍可跳過
+    digest = file_sha256(str(f))
+    return digest == entry.get("sha256"), digest
+
+
+def manifest_entry(f: Path, out_file: Path, settings: dict, digest=None) -> dict:
+    """建立單一來源檔的 manifest 紀錄"""
+    st = f.stat()
+    return {
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "sha256": digest or file_sha256(str(f)),
+        "settings": settings,
+        "output": out_file.name,
+    }
+
+
 # ============================================================
 # 批次轉換
 # ============================================================
+SUPPORTED_FORMATS = {".docx", ".pdf", ".doc", ".pptx", ".xlsx"}
+
+
+def list_sources(input_path: Path) -> list:
+    """資料夾內支援的來源檔 (略過 Word 暫存檔 ~$*.docx)"""
+    return [
+        f for f in input_path.iterdir()
+        if f.suffix.lower() in SUPPORTED_FORMATS and not f.name.startswith("~")
+    ]
+
+
+def save_output(f: Path, md_content: str, output_path: Path,
+                chunks: bool = False) -> Path:
+    """寫出 <檔名>.md (以及 chunks/<檔名>.jsonl)，回傳輸出路徑"""
+    # 輸出檔名: 保持原名但改副檔名為 .md
+    out_file = output_path / f"{f.stem}.md"
+    out_file.write_text(md_content, encoding="utf-8")
+    size_kb = len(md_content.encode("utf-8")) / 1024
+    print(f"  -> Saved: {out_file.name} ({size_kb:.1f} KB)")
+
+    if chunks:
+        # 延遲載入：sop_chunker 經由 sop_context_packer 反向引用本模組
+        from sop_chunker import chunk_markdown, write_chunks_jsonl
+        chunk_dir = output_path / "chunks"
+        chunk_dir.mkdir(exist_ok=True)
+        stats = write_chunks_jsonl(
+            chunk_markdown(md_content, out_file.name),
+            chunk_dir / f"{f.stem}.jsonl",
+        )
+        print(f"     Chunks: {stats['chunks']} "
+              f"(+{stats['added']} / -{stats['removed']})")
+    return out_file
+
+
+def _convert_worker(filepath: str, convert_kwargs: dict) -> str:
+    """Process pool 的工作函數 (需為 module-level 才能 pickle)"""
+    return convert_file(filepath, add_front_matter=True, **convert_kwargs)
+
+
+def _iter_conversions(files, convert_kwargs: dict, workers: int):
+    """
+    逐一產出 (檔案, Markdown 內容)
+
+    workers > 1 時以 process pool 平行轉換，依完成順序回傳結果；
+    輸出檔名只由來源檔名決定，與完成順序無關。
+    """
+    if workers <= 1 or len(files) <= 1:
+        for f in files:
+            yield f, _convert_worker(str(f), convert_kwargs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_convert_worker, str(f), convert_kwargs): f
+            for f in files
+        }
+        for future in as_completed(futures):
+            f = futures[future]
+            try:
+                md_content = future.result()
+            except Exception as e:
+                # worker 崩潰 (例如 BrokenProcessPool) 也計入失敗
+                print(f"  ERROR converting {f}: {e}")
+                md_content = ""
+            yield f, md_content
+
+
 def batch_convert(
     input_dir: str,
     output_dir: str,
     method: str = "auto",
     do_desensitize: bool = False,
+    workers: int = 1,
+    force: bool = False,
+    redact_terms: tuple = (),
+    chunks: bool = False,
+    page_workers: int = 1,
+    ocr_workers: int = 1,
+    ocr_lang: str = DEFAULT_OCR_LANG,
 ):
-    """批次轉換整個資料夾"""
+    """
+    批次轉換整個資料夾
+
+    Args:
+        workers: 平行處理的 process 數量 (1 = 逐一轉換)
+        force: 忽略 manifest，全部重新轉換
+        redact_terms: 額外的脫敏字典 (僅 do_desensitize=True 時使用)
+        chunks: 另存 chunks/<檔名>.jsonl (見 sop_chunker.py)
+        page_workers: PyMuPDF 平行提取頁面的 process 數量；
+                      僅在逐檔轉換 (workers=1 或只有一個待轉檔) 時生效
+        ocr_workers: 掃描頁 OCR 的 process 數量；同樣僅在逐檔轉換時生效
+        ocr_lang: Tesseract 語言
+    """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    # 支援的格式
-    supported = {".docx", ".pdf", ".doc", ".pptx", ".xlsx"}
-    files = [
-        f for f in input_path.iterdir()
-        if f.suffix.lower() in supported and not f.name.startswith("~")
-    ]
+    files = list_sources(input_path)
 
     if not files:
         print(f"No supported files found in {input_dir}")
-        print(f"Supported formats: {supported}")
+        print(f"Supported formats: {SUPPORTED_FORMATS}")
         return
 
     print(f"\n{'='*50}")
@@ -343,51 +1005,313 @@ def batch_convert(
     print(f"Input:  {input_dir} ({len(files)} files)")
     print(f"Output: {output_dir}")
     print(f"Method: {method}")
-    print(f"Desensitize: {do_desensitize}")
+    print(f"Desensitize: {do_desensitize}"
+          + (f" (+{len(redact_terms)} dictionary terms)" if redact_terms else ""))
+    print(f"Workers: {workers}"
+          + (f" (PDF pages: {page_workers})" if page_workers > 1 else "")
+          + (f" (OCR: {ocr_workers})" if ocr_workers > 1 else ""))
+    if chunks:
+        print(f"Chunks: {output_path / 'chunks'}")
     print(f"{'='*50}\n")
 
-    success = 0
-    failed = 0
-    total_size = 0
+    # 增量判斷: 只轉換來源或設定有變動的檔案
+    old_manifest = {} if force else load_manifest(output_path)
+    manifest = {}
+    pending = []
+    known_digests = {}
+    skipped = 0
 
     for f in sorted(files):
-        md_content = convert_file(
-            str(f),
-            method=method,
-            add_front_matter=True,
-            do_desensitize=do_desensitize,
+        key = f.name
+        settings = conversion_settings(str(f), method, do_desensitize,
+                                       redact_terms, chunks, ocr_lang)
+        up_to_date, digest = is_up_to_date(
+            f, old_manifest.get(key), settings, output_path
         )
+        if up_to_date:
+            manifest[key] = manifest_entry(
+                f, output_path / old_manifest[key]["output"], settings, digest
+            )
+            skipped += 1
+            continue
+        known_digests[key] = digest
+        pending.append(f)
 
-        if md_content:
-            # 輸出檔名: 保持原名但改副檔名為 .md
-            out_file = output_path / f"{f.stem}.md"
-            out_file.write_text(md_content, encoding="utf-8")
+    if skipped:
+        print(f"  Unchanged (skipped): {skipped} files")
 
-            size_kb = len(md_content.encode("utf-8")) / 1024
-            total_size += size_kb
-            print(f"  -> Saved: {out_file.name} ({size_kb:.1f} KB)")
+    success = 0
+    failed = 0
+    total_size = 0
+
+    convert_kwargs = {
+        "method": method,
+        "do_desensitize": do_desensitize,
+        "redact_terms": tuple(redact_terms),
+        "ocr_lang": ocr_lang,
+    }
+    # 檔案層級已平行時不再開頁面 / OCR 層級的 pool (避免 process 數相乘)
+    if workers <= 1 or len(pending) <= 1:
+        convert_kwargs.update(page_workers=page_workers, ocr_workers=ocr_workers)
+    for f, md_content in _iter_conversions(pending, convert_kwargs, workers):
+        if md_content:
+            out_file = save_output(f, md_content, output_path, chunks)
+            total_size += len(md_content.encode("utf-8")) / 1024
             success += 1
+            manifest[f.name] = manifest_entry(
+                f, out_file,
+                conversion_settings(str(f), method, do_desensitize,
+                                    redact_terms, chunks, ocr_lang),
+                known_digests.get(f.name),
+            )
         else:
             failed += 1
 
+    save_manifest(output_path, manifest)
+
     print(f"\n{'='*50}")
-    print(f"Done! {success} converted, {failed} failed")
+    print(f"Done! {success} converted, {skipped} unchanged, {failed} failed")
     print(f"Total output: {total_size:.1f} KB ({total_size/1024:.2f} MB)")
     print(f"{'='*50}")
 
 
+# ============================================================
+# 監看資料夾 (常駐模式)
+# ============================================================
+# 文件管制人員把新版 SOP 放進共用資料夾，幾秒後 Markdown 就出現在輸出資料夾。
+# 常駐 process 只載入一次 mammoth / markitdown / PyMuPDF，之後每個檔案只付轉換成本。
+# 採用輪詢 (網路共用資料夾收不到 inotify 事件)；每輪只 stat 檔案，不讀內容。
+DEFAULT_WATCH_INTERVAL = 2.0
+DEFAULT_SETTLE_SECONDS = 2.0
+
+
+def _warm_converters():
+    """預先載入已安裝的轉換器，讓第一個檔案不用付 import 成本"""
+    loaded = []
+    for name, load in (("mammoth", lambda: __import__("mammoth")),
+                       ("markitdown", _get_markitdown),
+                       ("pymupdf", lambda: __import__("fitz"))):
+        try:
+            load()
+        except ImportError:
+            continue
+        loaded.append(name)
+    return loaded
+
+
+def _is_readable(f: Path) -> bool:
+    """複製中或被 Word 鎖住的檔案無法開啟"""
+    try:
+        with open(f, "rb") as fh:
+            fh.read(1)
+        return True
+    except OSError:
+        return False
+
+
+def watch_folder(
+    input_dir: str,
+    output_dir: str,
+    method: str = "auto",
+    do_desensitize: bool = False,
+    workers: int = 1,
+    redact_terms: tuple = (),
+    chunks: bool = False,
+    page_workers: int = 1,
+    ocr_workers: int = 1,
+    ocr_lang: str = DEFAULT_OCR_LANG,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    settle: float = DEFAULT_SETTLE_SECONDS,
+    max_polls: int = None,
+):
+    """
+    監看資料夾，只轉換新增或修改過的檔案 (Ctrl+C 結束)
+
+    啟動時先以 batch_convert() 補齊所有變動，之後每 interval 秒檢查一次。
+    檔案的 size / mtime 需連續兩輪不變、最後修改已超過 settle 秒、
+    且能開啟讀取，才視為寫入完成 (避免轉換複製到一半的檔案)。
+    轉換失敗的檔案在內容再次變動前不會重試。
+
+    Args:
+        workers: 啟動時補轉換使用的 process 數量；之後在本 process 內逐一轉換
+        interval: 輪詢間隔 (秒)
+        settle: 最後修改後需等待的秒數
+        max_polls: 輪詢次數上限 (None = 不限，測試用)
+    """
+    import time
+
+    input_path = Path(input_dir)
+    output_path = Path(output_dir)
+    batch_convert(input_dir, output_dir, method, do_desensitize, workers, False,
+                  redact_terms, chunks, page_workers, ocr_workers, ocr_lang)
+
+    loaded = _warm_converters()
+    print(f"\nWatching {input_dir} every {interval:g}s "
+          f"(converters loaded: {', '.join(loaded) or 'none'}; Ctrl+C to stop)")
+
+    convert_kwargs = {
+        "method": method,
+        "do_desensitize": do_desensitize,
+        "redact_terms": tuple(redact_terms),
+        "page_workers": page_workers,
+        "ocr_workers": ocr_workers,
+        "ocr_lang": ocr_lang,
+    }
+    manifest = load_manifest(output_path)
+    last_seen = {}      # 檔名 -> 上一輪的 (size, mtime)
+    failed = {}         # 檔名 -> 轉換失敗時的 (size, mtime)
+    polls = 0
+
+    try:
+        while max_polls is None or polls < max_polls:
+            time.sleep(interval)
+            polls += 1
+            current = {}
+            for f in list_sources(input_path):
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue    # 掃描後被刪除或改名
+                current[f] = (st.st_size, st.st_mtime)
+
+            ready = []
+            for f, sig in sorted(current.items()):
+                if last_seen.get(f.name) != sig or failed.get(f.name) == sig:
+                    continue
+                if time.time() - sig[1] < settle:
+                    continue
+                settings = conversion_settings(str(f), method, do_desensitize,
+                                               redact_terms, chunks, ocr_lang)
+                up_to_date, digest = is_up_to_date(
+                    f, manifest.get(f.name), settings, output_path)
+                if up_to_date:
+                    if manifest[f.name].get("mtime") != sig[1]:
+                        # 內容未變只是重新複製：更新 mtime，下一輪不必再算 hash
+                        manifest[f.name] = manifest_entry(
+                            f, output_path / manifest[f.name]["output"],
+                            settings, digest)
+                        save_manifest(output_path, manifest)
+                    continue
+                if _is_readable(f):
+                    ready.append((f, settings, digest))
+            last_seen = {f.name: sig for f, sig in current.items()}
+
+            for f, settings, digest in ready:
+                stamp = datetime.now().strftime("%H:%M:%S")
+                print(f"[{stamp}] Changed: {f.name}")
+                md_content = convert_file(str(f), add_front_matter=True,
+                                          **convert_kwargs)
+                if not md_content:
+                    failed[f.name] = current[f]
+                    continue
+                failed.pop(f.name, None)
+                out_file = save_output(f, md_content, output_path, chunks)
+                manifest[f.name] = manifest_entry(f, out_file, settings, digest)
+                save_manifest(output_path, manifest)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+# ============================================================
+# PDF 引擎效能比較
+# ============================================================
+def benchmark_pdf_engines(input_dir: str, page_workers: int = 4,
+                          output_json: str = None) -> list:
+    """
+    對資料夾內每個 PDF 分別以各引擎轉換並計時
+
+    引擎: pymupdf (逐頁)、pymupdf xN (平行頁面)、markitdown。
+    未安裝的引擎記為 "missing"。
+
+    Returns:
+        [{"file", "pages", "engine", "status", "seconds", "chars"}]
+    """
+    import time
+
+    engines = [
+        ("pymupdf", lambda f: pdf_to_md_pymupdf(f)),
+        (f"pymupdf x{page_workers}",
+         lambda f: pdf_to_md_pymupdf(f, page_workers=page_workers)),
+        ("markitdown", file_to_md_markitdown),
+    ]
+    pdfs = sorted(p for p in Path(input_dir).iterdir() if p.suffix.lower() == ".pdf")
+    results = []
+
+    print(f"{'file':<40} {'engine':<14} {'pages':>5} {'sec':>8} {'chars':>9}")
+    for pdf in pdfs:
+        try:
+            import fitz  # PyMuPDF
+            with fitz.open(str(pdf)) as doc:
+                pages = doc.page_count
+        except ImportError:
+            pages = None
+        for name, engine in engines:
+            row = {"file": pdf.name, "pages": pages, "engine": name}
+            t0 = time.perf_counter()
+            try:
+                content = engine(str(pdf))
+            except ImportError:
+                row["status"] = "missing"
+            except Exception as e:
+                row["status"] = f"error: {e}"
+            else:
+                row.update(status="ok", seconds=round(time.perf_counter() - t0, 3),
+                           chars=len(content))
+            results.append(row)
+            if row["status"] == "ok":
+                print(f"{pdf.name[:40]:<40} {name:<14} {pages or '-':>5} "
+                      f"{row['seconds']:>8.3f} {row['chars']:>9,}")
+            else:
+                print(f"{pdf.name[:40]:<40} {name:<14} {pages or '-':>5} {row['status']}")
+
+    print("\nTotals:")
+    for name, _ in engines:
+        ok = [r for r in results if r["engine"] == name and r["status"] == "ok"]
+        if ok:
+            print(f"  {name:<14} {sum(r['seconds'] for r in ok):>8.3f} s "
+                  f"over {len(ok)} files")
+
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return results
+
+
 # ============================================================
 # CLI Entry Point
 # ============================================================
 if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "--benchmark":
+        bench_workers = 4
+        bench_json = None
+        for i, arg in enumerate(sys.argv[3:], 3):
+            if arg == "--page-workers" and i + 1 < len(sys.argv):
+                bench_workers = int(sys.argv[i + 1])
+            if arg == "--json" and i + 1 < len(sys.argv):
+                bench_json = sys.argv[i + 1]
+        benchmark_pdf_engines(sys.argv[2], bench_workers, bench_json)
+        sys.exit(0)
+
     if len(sys.argv) < 3:
         print("""
 Usage:
   python sop_to_markdown.py <input_folder> <output_folder> [options]
+  python sop_to_markdown.py --benchmark <pdf_folder> [--page-workers N] [--json FILE]
 
 Options:
-  --method mammoth|markitdown|pymupdf|auto  (default: auto)
+  --method mammoth|markitdown|pymupdf|auto  (default: auto; PDF -> pymupdf,
+                                             markitdown if no text layer)
   --desensitize                              Enable desensitization
+  --workers N                                Parallel conversion processes (default: 1)
+  --force                                    Ignore manifest, reconvert everything
+  --terms FILE                               Extra redaction dictionary (one name per line)
+  --chunks                                   Also write chunks/<name>.jsonl for embedding stores
+  --page-workers N                           Parallel PDF page extraction (pymupdf, default: 1)
+  --ocr-workers N                            Parallel OCR of image-only PDF pages (default: 1)
+  --ocr-lang LANG                            Tesseract languages (default: chi_tra+eng)
+  --watch                                    Keep running and convert new/changed files
+  --interval SEC                             Watch polling interval (default: 2)
+  --settle SEC                               Wait this long after the last write (default: 2)
 
 Examples:
   # 基本轉換
@@ -398,6 +1322,15 @@ Examples:
 
   # 指定方法
   python sop_to_markdown.py ./sops/ ./markdown_sops/ --method markitdown
+
+  # 4 個 process 平行轉換
+  python sop_to_markdown.py ./sops/ ./markdown_sops/ --workers 4
+
+  # 常駐監看共用資料夾
+  python sop_to_markdown.py //share/SOP_Drop/ ../../sops_markdown/ --watch
+
+  # 比較 PDF 引擎速度
+  python sop_to_markdown.py --benchmark ./sops/
         """)
         sys.exit(1)
 
@@ -406,11 +1339,47 @@ Examples:
 
     method = "auto"
     do_desensitize = False
+    workers = 1
+    force = False
+    redact_terms = ()
+    chunks = False
+    page_workers = 1
+    ocr_workers = 1
+    ocr_lang = DEFAULT_OCR_LANG
+    watch = False
+    interval = DEFAULT_WATCH_INTERVAL
+    settle = DEFAULT_SETTLE_SECONDS
 
     for i, arg in enumerate(sys.argv[3:], 3):
         if arg == "--method" and i + 1 < len(sys.argv):
             method = sys.argv[i + 1]
         if arg == "--desensitize":
             do_desensitize = True
-
-    batch_convert(input_dir, output_dir, method, do_desensitize)
+        if arg == "--workers" and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        if arg == "--force":
+            force = True
+        if arg == "--terms" and i + 1 < len(sys.argv):
+            redact_terms = load_redact_terms(sys.argv[i + 1])
+        if arg == "--chunks":
+            chunks = True
+        if arg == "--page-workers" and i + 1 < len(sys.argv):
+            page_workers = int(sys.argv[i + 1])
+        if arg == "--ocr-workers" and i + 1 < len(sys.argv):
+            ocr_workers = int(sys.argv[i + 1])
+        if arg == "--ocr-lang" and i + 1 < len(sys.argv):
+            ocr_lang = sys.argv[i + 1]
+        if arg == "--watch":
+            watch = True
+        if arg == "--interval" and i + 1 < len(sys.argv):
+            interval = float(sys.argv[i + 1])
+        if arg == "--settle" and i + 1 < len(sys.argv):
+            settle = float(sys.argv[i + 1])
+
+    if watch:
+        watch_folder(input_dir, output_dir, method, do_desensitize, workers,
+                     redact_terms, chunks, page_workers, ocr_workers, ocr_lang,
+                     interval, settle)
+    else:
+        batch_convert(input_dir, output_dir, method, do_desensitize, workers, force,
+                      redact_terms, chunks, page_workers, ocr_workers, ocr_lang)
@@ -0,0 +1,478 @@
+"""
+SOP Vector Index
+================
+讀取 sop_chunker.py 產生的 chunks JSONL，建立 embedding 索引：
+向量存成 memory-mapped NumPy 矩陣，查詢後端可替換
+(exact: 向量化 cosine top-k；ivf: k-means 分群的近似搜尋)。
+附 bench 指令，在 100 / 500 / 5000 份文件規模下量測建置時間、記憶體
+與查詢延遲，作為 Phase 3 架構評估 (Markdown-in-context vs. 向量檢索) 的依據。
+
+使用方式：
+  python sop_vector_index.py build ./chunks.jsonl ./vector_store/
+  python sop_vector_index.py query ./vector_store/ "filter integrity" -k 5
+  python sop_vector_index.py bench --chunks ./chunks.jsonl --output bench.json
+
+安裝依賴：
+  pip install numpy
+
+備註：
+  - 預設 embedding 為離線、可重現的 feature hashing (hash_embed)，
+    只用於測試與效能量測；正式使用時以 Embedder 介面換成真正的模型
+  - 所有向量皆 L2 正規化，cosine = 內積
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import zipfile
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+from sop_search_index import tokenize
+
+VERSION = "1.0.0"
+DEFAULT_DIM = 256
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.jsonl"
+STORE_META_FILE = "store.json"
+IVF_FILE = "ivf.npz"
+
+
+# ============================================================
+# Embedding
+# ============================================================
+def hash_embed(texts, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    離線、可重現的 embedding：斷詞後以 CRC32 做 signed feature hashing
+
+    不依賴 PYTHONHASHSEED，任何機器、任何 process 結果都相同。
+
+    Returns:
+        (len(texts), dim) float32，每列已 L2 正規化
+    """
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for term in tokenize(text):
+            h = zlib.crc32(term.encode("utf-8"))
+            out[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    out /= norms
+    return out
+
+
+class HashEmbedder:
+    """Embedder 介面：name、dim 與 __call__(texts) -> (n, dim) float32"""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.name = f"hash-crc32-{dim}"
+
+    def __call__(self, texts) -> np.ndarray:
+        return hash_embed(texts, self.dim)
+
+
+# ============================================================
+# 搜尋後端
+# ============================================================
+def _top_k(scores: np.ndarray, k: int):
+    """回傳分數最高的 k 個位置 (依分數遞減)，用 argpartition 避免全排序"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class ExactIndex:
+    """暴力法：整個矩陣與查詢向量做一次矩陣乘法"""
+
+    name = "exact"
+
+    def __init__(self, vectors: np.ndarray, **_):
+        self.vectors = vectors
+
+    def search(self, query: np.ndarray, k: int = 10):
+        """Returns: (位置陣列, 分數陣列)"""
+        scores = self.vectors @ query
+        idx = _top_k(scores, k)
+        return idx, scores[idx]
+
+    def nbytes(self) -> int:
+        return 0
+
+
+class IVFIndex:
+    """
+    倒排檔 (IVF) 近似搜尋：k-means 把向量分成 n_lists 群，
+    查詢時只掃描最接近的 n_probe 群
+    """
+
+    name = "ivf"
+
+    def __init__(self, vectors: np.ndarray, n_lists: int = 0, n_probe: int = 8,
+                 iterations: int = 10, seed: int = 0):
+        self.vectors = vectors
+        n = vectors.shape[0]
+        self.n_lists = n_lists or max(1, int(np.sqrt(n)))
+        self.n_lists = min(self.n_lists, max(n, 1))
+        self.n_probe = min(n_probe, self.n_lists)
+        self.centroids = self._train(vectors, self.n_lists, iterations, seed)
+        assign = self._assign(vectors)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+        self.from_cache = False
+
+    def save(self, path, key: str):
+        """存下分群結果 (中心 + 倒排清單)；key 用來辨識對應的向量庫與參數"""
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        ids = (np.concatenate(self.lists) if self.lists
+               else np.empty(0, dtype=np.int64))
+        bounds = np.cumsum([0] + [len(l) for l in self.lists])
+        with open(tmp_path, "wb") as f:
+            np.savez(f, key=np.array(key), centroids=self.centroids,
+                     ids=ids, bounds=bounds)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, vectors: np.ndarray, path, key: str, n_probe: int = 8):
+        """讀取 save() 的結果；檔案不存在、損毀或 key 不符時回傳 None"""
+        try:
+            with np.load(path) as data:
+                if str(data["key"]) != key:
+                    return None
+                centroids, ids, bounds = data["centroids"], data["ids"], data["bounds"]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        index = cls.__new__(cls)
+        index.vectors = vectors
+        index.n_lists = len(bounds) - 1
+        index.n_probe = min(n_probe, index.n_lists)
+        index.centroids = centroids
+        index.lists = [ids[bounds[i]:bounds[i + 1]] for i in range(index.n_lists)]
+        index.from_cache = True
+        return index
+
+    @staticmethod
+    def _train(vectors, n_lists, iterations, seed):
+        """Spherical k-means (固定 seed，結果可重現)"""
+        if vectors.shape[0] == 0:
+            return np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        pick = rng.choice(vectors.shape[0], n_lists, replace=False)
+        centroids = np.array(vectors[pick], dtype=np.float32)
+        for _ in range(iterations):
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[~empty] /= norms[~empty]
+            sums[empty] = centroids[empty]      # 空群保留原中心
+            centroids = sums
+        return centroids
+
+    def _assign(self, vectors, batch: int = 65536) -> np.ndarray:
+        """分批計算最近中心，避免 (n, n_lists) 的大暫存矩陣"""
+        out = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], batch):
+            block = vectors[start:start + batch]
+            out[start:start + batch] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def search(self, query: np.ndarray, k: int = 10):
+        """Returns: (位置陣列, 分數陣列)"""
+        if not self.n_lists or self.vectors.shape[0] == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        probes = _top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self.lists[p] for p in probes])
+        scores = self.vectors[candidates] @ query
+        idx = _top_k(scores, k)
+        return candidates[idx], scores[idx]
+
+    def nbytes(self) -> int:
+        return self.centroids.nbytes + sum(l.nbytes for l in self.lists)
+
+
+BACKENDS = {
+    ExactIndex.name: ExactIndex,
+    IVFIndex.name: IVFIndex,
+}
+
+
+# ============================================================
+# 向量庫 (memory-mapped)
+# ============================================================
+def build_store(chunks_path: str, store_dir: str, embedder=None,
+                batch_size: int = 512) -> dict:
+    """
+    讀 chunks JSONL，分批 embedding 後寫入 vectors.npy (memmap) 與 records.jsonl
+
+    Returns:
+        store.json 內容 (含建置耗時)
+    """
+    embedder = embedder or HashEmbedder()
+    store_path = Path(store_dir)
+    store_path.mkdir(parents=True, exist_ok=True)
+
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        chunks = [json.loads(line) for line in f if line.strip()]
+
+    t0 = time.perf_counter()
+    vectors = np.lib.format.open_memmap(
+        store_path / VECTORS_FILE, mode="w+", dtype=np.float32,
+        shape=(len(chunks), embedder.dim))
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        vectors[start:start + len(batch)] = embedder([c["text"] for c in batch])
+    vectors.flush()
+    del vectors
+
+    with open(store_path / RECORDS_FILE, "w", encoding="utf-8") as f:
+        for c in chunks:
+            record = {k: c.get(k) for k in
+                      ("chunk_id", "sop_number", "title", "source_file",
+                       "heading_path", "page")}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    # 舊的 IVF 分群屬於舊向量；store.json 改寫後 key 也會不符，這裡直接清掉
+    (store_path / IVF_FILE).unlink(missing_ok=True)
+
+    meta = {
+        "script_version": VERSION,
+        "built_at": datetime.now().isoformat(),
+        "embedder": embedder.name,
+        "dim": embedder.dim,
+        "count": len(chunks),
+        "build_seconds": round(time.perf_counter() - t0, 3),
+    }
+    with open(store_path / STORE_META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return meta
+
+
+class VectorStore:
+    """
+    開啟既有向量庫；向量以唯讀 memmap 載入，只有被讀到的頁面進記憶體
+
+    ivf 的分群結果存在 ivf.npz，以 store.json 與分群參數的雜湊為 key，
+    之後的查詢直接載入，不必每次重新 k-means
+    """
+
+    def __init__(self, store_dir: str, backend: str = "exact", **backend_opts):
+        store_path = Path(store_dir)
+        meta_bytes = (store_path / STORE_META_FILE).read_bytes()
+        self.meta = json.loads(meta_bytes.decode("utf-8"))
+        self.vectors = np.load(store_path / VECTORS_FILE, mmap_mode="r")
+        with open(store_path / RECORDS_FILE, "r", encoding="utf-8") as f:
+            self.records = [json.loads(line) for line in f if line.strip()]
+        if backend == IVFIndex.name:
+            self.index = self._open_ivf(store_path, meta_bytes, **backend_opts)
+        else:
+            self.index = BACKENDS[backend](self.vectors, **backend_opts)
+
+    def _open_ivf(self, store_path: Path, meta_bytes: bytes, n_lists: int = 0,
+                  n_probe: int = 8, iterations: int = 10, seed: int = 0):
+        params = {"n_lists": n_lists, "iterations": iterations, "seed": seed}
+        key = hashlib.sha256(
+            meta_bytes + json.dumps(params, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        index = IVFIndex.load(self.vectors, store_path / IVF_FILE, key, n_probe)
+        if index is None:
+            index = IVFIndex(self.vectors, n_probe=n_probe, **params)
+            try:
+                index.save(store_path / IVF_FILE, key)
+            except OSError as e:      # 唯讀的向量庫仍可查詢，只是不快取
+                print(f"  WARNING: Could not save IVF index: {e}")
+        return index
+
+    def search(self, query_vector: np.ndarray, k: int = 10) -> list:
+        idx, scores = self.index.search(query_vector, k)
+        return [dict(self.records[i], score=round(float(s), 4))
+                for i, s in zip(idx, scores)]
+
+
+# ============================================================
+# 規模量測 (Phase 3 架構評估)
+# ============================================================
+_FALLBACK_VOCAB = (
+    "batch record filter integrity sterilization autoclave cycle weighing "
+    "deviation capa cleaning validation equipment calibration environmental "
+    "monitoring particle bioburden endotoxin aseptic gowning qualification "
+    "change control risk assessment procedure responsibility scope purpose "
+    "過濾 滅菌 秤重 偏差 清潔 確效 設備 校正 環境 監測 無菌 變更 風險"
+).split()
+
+
+def synthetic_chunks(n_docs: int, chunks_per_doc: int, vocab, words: int = 80,
+                     seed: int = 0):
+    """以固定 seed 從字彙隨機組出 chunk 文字 (可重現)"""
+    rng = np.random.default_rng(seed)
+    vocab = np.array(vocab)
+    for d in range(n_docs):
+        for c in range(chunks_per_doc):
+            yield f"SYN-{d:05d}:{c:03d}", " ".join(rng.choice(vocab, words))
+
+
+def _latency_stats(samples) -> dict:
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "mean_ms": round(float(ms.mean()), 3)}
+
+
+def benchmark(scales=(100, 500, 5000), chunks_per_doc: int = 20,
+              n_queries: int = 50, k: int = 10, dim: int = DEFAULT_DIM,
+              chunks_path: str = None, seed: int = 0) -> dict:
+    """
+    在各文件規模下量測 embedding / 建置時間、記憶體與查詢延遲
+
+    若提供 chunks_path，合成文字的字彙取自實際語料；查詢取自合成 chunk。
+    ivf 另回報對 exact 的 recall@k。
+    """
+    vocab = _FALLBACK_VOCAB
+    if chunks_path:
+        terms = set()
+        with open(chunks_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    terms.update(tokenize(json.loads(line)["text"]))
+        vocab = sorted(terms) or vocab
+
+    embedder = HashEmbedder(dim)
+    report = {
+        "script_version": VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "embedder": embedder.name,
+        "chunks_per_doc": chunks_per_doc,
+        "queries": n_queries,
+        "k": k,
+        "vocab_size": len(vocab),
+        "scales": [],
+    }
+
+    for n_docs in scales:
+        texts = [t for _, t in synthetic_chunks(n_docs, chunks_per_doc, vocab,
+                                                seed=seed)]
+        t0 = time.perf_counter()
+        vectors = embedder(texts)
+        embed_s = time.perf_counter() - t0
+
+        rng = np.random.default_rng(seed + 1)
+        queries = embedder([texts[i] for i in
+                            rng.choice(len(texts), min(n_queries, len(texts)),
+                                       replace=False)])
+
+        scale = {
+            "documents": n_docs,
+            "chunks": len(texts),
+            "queries": len(queries),
+            "embed_seconds": round(embed_s, 3),
+            "vector_bytes": int(vectors.nbytes),
+            "backends": {},
+        }
+        exact_hits = None
+        for name, cls in BACKENDS.items():
+            t0 = time.perf_counter()
+            index = cls(vectors)
+            build_s = time.perf_counter() - t0
+
+            samples, hits = [], []
+            for q in queries:
+                t0 = time.perf_counter()
+                idx, _ = index.search(q, k)
+                samples.append(time.perf_counter() - t0)
+                hits.append(set(idx.tolist()))
+
+            result = {"build_seconds": round(build_s, 4),
+                      "index_bytes": int(index.nbytes()),
+                      **_latency_stats(samples)}
+            if exact_hits is None:
+                exact_hits = hits
+            else:
+                recall = np.mean([len(h & e) / max(len(e), 1)
+                                  for h, e in zip(hits, exact_hits)])
+                result[f"recall_at_{k}"] = round(float(recall), 4)
+            scale["backends"][name] = result
+        report["scales"].append(scale)
+
+    return report
+
+
+# ============================================================
+# CLI Entry Point
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"SOP Vector Index v{VERSION} - embedding store and scale benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Embed a chunks JSONL into a vector store")
+    p_build.add_argument("chunks", help="chunks .jsonl from sop_chunker.py")
+    p_build.add_argument("store", help="Output vector store folder")
+    p_build.add_argument("--dim", type=int, default=DEFAULT_DIM)
+
+    p_query = sub.add_parser("query", help="Search a vector store")
+    p_query.add_argument("store", help="Vector store folder")
+    p_query.add_argument("text", help="Query text")
+    p_query.add_argument("-k", type=int, default=10)
+    p_query.add_argument("--backend", choices=sorted(BACKENDS), default="exact")
+
+    p_bench = sub.add_parser("bench", help="Measure build/memory/latency at corpus scales")
+    p_bench.add_argument("--chunks", help="Real chunks .jsonl to draw vocabulary from")
+    p_bench.add_argument("--scales", type=int, nargs="+", default=[100, 500, 5000],
+                         help="Document counts to test (default: 100 500 5000)")
+    p_bench.add_argument("--chunks-per-doc", type=int, default=20)
+    p_bench.add_argument("--queries", type=int, default=50)
+    p_bench.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    p_bench.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        meta = build_store(args.chunks, args.store, HashEmbedder(args.dim))
+        print(f"Stored {meta['count']} vectors (dim {meta['dim']}) "
+              f"in {meta['build_seconds']} s -> {args.store}")
+        return 0
+
+    if args.command == "query":
+        store = VectorStore(args.store, args.backend)
+        if store.meta["embedder"] != HashEmbedder(store.meta["dim"]).name:
+            print(f"Error: store was built with {store.meta['embedder']}")
+            return 1
+        t0 = time.perf_counter()
+        results = store.search(hash_embed([args.text], store.meta["dim"])[0], args.k)
+        print(f"{len(results)} results ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        for n, r in enumerate(results, 1):
+            path = " > ".join(r.get("heading_path") or [])
+            print(f"{n}. [{r['score']:.3f}] {r['sop_number'] or r['source_file']} | "
+                  f"{path}  ({r['chunk_id']})")
+        return 0
+
+    report = benchmark(args.scales, args.chunks_per_doc, args.queries,
+                       dim=args.dim, chunks_path=args.chunks)
+    print(f"{'docs':>6} {'chunks':>7} {'backend':>7} {'build s':>8} "
+          f"{'MB':>7} {'p50 ms':>7} {'p95 ms':>7} {'recall':>6}")
+    for s in report["scales"]:
+        for name, b in s["backends"].items():
+            mb = (s["vector_bytes"] + b["index_bytes"]) / 1024 / 1024
+            recall = b.get(f"recall_at_{report['k']}", 1.0)
+            print(f"{s['documents']:>6} {s['chunks']:>7} {name:>7} "
+                  f"{b['build_seconds']:>8.3f} {mb:>7.1f} {b['p50_ms']:>7.3f} "
+                  f"{b['p95_ms']:>7.3f} {recall:>6.2f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Tests for the token cache in sop_context_packer.scan_corpus().
+
+Run: python -m pytest phase0_foundation/sop_conversion/tests -q
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sop_context_packer as packer  # noqa: E402
+
+DOC = """---
+sop_number: SOP-QA-001
+title: Deviation Handling
+effective_date: 2024-03-01
+department: QA
+tags:
+- deviation
+---
+
+# Deviation Handling
+
+Record the deviation within one working day.
+"""
+
+
+def _corpus(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "sop_qa_001.md").write_text(DOC, encoding="utf-8")
+    return corpus
+
+
+def test_fresh_and_cached_scans_agree(tmp_path):
+    corpus = _corpus(tmp_path)
+    fresh = packer.scan_corpus(str(corpus))
+    assert (corpus / packer.TOKEN_CACHE_FILE).exists()
+    cached = packer.scan_corpus(str(corpus))
+    assert fresh == cached
+    assert fresh[0]["metadata"]["effective_date"] == "2024-03-01"
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    corpus = _corpus(tmp_path)
+    out = tmp_path / "bundles"
+    manifest = packer.pack_corpus(str(corpus), str(out), dry_run=True)
+    assert manifest["corpus_documents"] == 1
+    assert not (corpus / packer.TOKEN_CACHE_FILE).exists()
+    assert not out.exists()
@@ -0,0 +1,78 @@
+"""
+Tests for RedactionEngine / desensitize().
+
+Without dictionary terms or KEEP_PATTERNS hits, the engine must give the
+same result as the original per-rule loop (sequential_redact below),
+including where one rule's match is adjacent to or overlaps another's.
+
+Run: python -m pytest phase0_foundation/sop_conversion/tests -q
+"""
+
+import re
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sop_to_markdown import (KEEP_PATTERNS, REDACT_RULES,  # noqa: E402
+                             TERM_REPLACEMENT, RedactionEngine, desensitize)
+
+
+def sequential_redact(content):
+    """desensitize() before the engine: one re.sub per rule, in order."""
+    for pattern, replacement, _desc in REDACT_RULES:
+        content = re.sub(pattern, replacement, content)
+    return content
+
+
+RULES_ONLY = RedactionEngine(REDACT_RULES, [])
+
+CASES = [
+    "lot 12345Client: Acme",
+    "lot Client: Acme",
+    "Batch: AB-1234 Product: Widget",
+    "Batch#AB12Lot#CD34",
+    "sponsor: product: X",
+    "Client：Acme 產品 Product：阿莫西林",
+    "Drug Product: X\nLot Number 2024-001 batch 9999",
+    "Customer:\nAcme",
+    "lot number lot number 12345",
+    "No identifiers here.",
+]
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_matches_sequential_rules(text):
+    assert RULES_ONLY.redact(text) == sequential_redact(text)
+
+
+def test_adjacent_matches_both_redacted():
+    out = RULES_ONLY.redact("lot Client: Acme")
+    assert "Acme" not in out
+
+
+def test_matches_sequential_rules_random():
+    words = ["lot", "Lot#", "lot number", "batch", "Batch #", "client",
+             "Sponsor", "product", "drug product", ":", "：", " ", "\n",
+             "12345", "AB-12", "Acme", "x", "-", "#"]
+    rng = random.Random(0)
+    for _ in range(3000):
+        text = "".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+        assert RULES_ONLY.redact(text) == sequential_redact(text), text
+
+
+def test_keep_patterns_protected():
+    engine = RedactionEngine(REDACT_RULES, KEEP_PATTERNS)
+    text = "Client: Acme per 21 CFR Part 11, lot 12345"
+    assert engine.redact(text) == sequential_redact(text)
+    # A rule match overlapping a protected span keeps its original text
+    assert engine.redact("Product: ICH Q7") == "Product: ICH Q7"
+
+
+def test_terms():
+    text = "Made by ACME pharma for AcmeBio; 艾克美 site"
+    out = desensitize(text, ("Acme Pharma", "艾克美"))
+    assert out == f"Made by {TERM_REPLACEMENT} for AcmeBio; {TERM_REPLACEMENT} site"
@@ -0,0 +1,51 @@
+"""
+Tests for the saved IVF index in sop_vector_index.VectorStore.
+
+Run: python -m pytest phase0_foundation/sop_conversion/tests -q
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sop_vector_index as vi  # noqa: E402
+
+
+def _store(tmp_path, n=60):
+    chunks = vi.synthetic_chunks(n_docs=n // 3, chunks_per_doc=3,
+                                 vocab=vi._FALLBACK_VOCAB, seed=1)
+    chunks_path = tmp_path / "chunks.jsonl"
+    with open(chunks_path, "w", encoding="utf-8") as f:
+        for chunk_id, text in chunks:
+            f.write(json.dumps({"chunk_id": chunk_id, "text": text},
+                               ensure_ascii=False) + "\n")
+    store = tmp_path / "store"
+    vi.build_store(str(chunks_path), str(store))
+    return chunks_path, store
+
+
+def test_ivf_saved_and_reloaded(tmp_path):
+    _, store = _store(tmp_path)
+    first = vi.VectorStore(str(store), "ivf")
+    assert not first.index.from_cache
+    assert (store / vi.IVF_FILE).exists()
+
+    second = vi.VectorStore(str(store), "ivf")
+    assert second.index.from_cache
+    np.testing.assert_array_equal(first.index.centroids, second.index.centroids)
+    query = vi.hash_embed(["filter integrity"])[0]
+    assert first.search(query, 5) == second.search(query, 5)
+
+
+def test_ivf_retrained_after_rebuild_or_new_params(tmp_path):
+    chunks_path, store = _store(tmp_path)
+    vi.VectorStore(str(store), "ivf")
+    assert not vi.VectorStore(str(store), "ivf", n_lists=3).index.from_cache
+
+    vi.build_store(str(chunks_path), str(store))
+    assert not (store / vi.IVF_FILE).exists()
+    assert not vi.VectorStore(str(store), "ivf", n_lists=3).index.from_cache
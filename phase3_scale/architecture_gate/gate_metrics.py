@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Amaran Architecture Gate Metrics
+================================
+Measures the corpus against the architecture gate criteria in one
+streaming pass over sops_markdown/:
+
+  - document count (gate threshold: 500)
+  - total bytes and estimated tokens
+  - documents / tokens per department, and growth since the last run
+  - exact and near-duplicate documents (64-bit SimHash, banded lookup)
+  - context-window headroom and projected runs until it is exhausted
+
+Per-file results are cached in <corpus>/.gate_metrics_cache.json keyed by
+size/mtime, so only new or edited files are read; every run that changes
+the totals appends them to .gate_metrics_history.jsonl for growth tracking,
+so re-running on an unchanged corpus still reports the last batch's
+growth. Cheap enough to run after every conversion batch.
+
+Usage:
+  python gate_metrics.py ../../sops_markdown/ --output gate_metrics.json
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]
+                       / "phase0_foundation" / "sop_conversion"))
+
+from sop_context_packer import estimate_tokens, split_front_matter  # noqa: E402
+from sop_search_index import tokenize  # noqa: E402
+
+VERSION = "1.0.0"
+CACHE_FILE = ".gate_metrics_cache.json"
+HISTORY_FILE = ".gate_metrics_history.jsonl"
+# Bump when per-file metrics change meaning so stale cache entries are dropped
+CACHE_FORMAT = 1
+
+DOC_THRESHOLD = 500
+DEFAULT_CONTEXT_WINDOW = 1_000_000
+SHINGLE = 3
+NEAR_DUP_BITS = 3       # SimHash Hamming distance counted as near-duplicate
+SIMHASH_BANDS = 4       # > NEAR_DUP_BITS, so any near-duplicate shares a band
+
+
+# ================================================================
+# PER-FILE METRICS
+# ================================================================
+def simhash(tokens, shingle=SHINGLE):
+    """64-bit SimHash over token shingles."""
+    weights = [0] * 64
+    grams = (" ".join(tokens[i:i + shingle])
+             for i in range(max(len(tokens) - shingle + 1, 1)))
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"),
+                                           digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def file_metrics(path):
+    """Read one Markdown file and compute everything the gate needs."""
+    raw = path.read_bytes()
+    content = raw.decode("utf-8")
+    meta, body = split_front_matter(content)
+    return {
+        "bytes": len(raw),
+        "tokens": estimate_tokens(content),
+        "department": str(meta.get("department") or "TBD"),
+        "doc_type": str(meta.get("doc_type") or "TBD"),
+        "sop_number": str(meta.get("sop_number") or ""),
+        # Body only: identical SOPs converted on different dates still match
+        "sha256": hashlib.sha256(body.strip().encode("utf-8")).hexdigest(),
+        "simhash": format(simhash(tokenize(body)), "016x"),
+    }
+
+
+def load_cache(corpus_path):
+    cache_path = corpus_path / CACHE_FILE
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"  WARNING: Unreadable metrics cache, rebuilding: {cache_path}")
+        return {}
+    if data.get("cache_format") != CACHE_FORMAT:
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(corpus_path, files):
+    cache_path = corpus_path / CACHE_FILE
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"cache_format": CACHE_FORMAT,
+                   "files": dict(sorted(files.items()))},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+
+
+# ================================================================
+# DUPLICATES
+# ================================================================
+def find_duplicates(files):
+    """
+    Returns (exact groups, near-duplicate pairs).
+
+    Near-duplicates: SimHash split into SIMHASH_BANDS bands; two hashes
+    within NEAR_DUP_BITS differ in at most that many bands, so they share
+    at least one band exactly. Only those candidates are compared.
+    """
+    by_sha = defaultdict(list)
+    for name, m in files.items():
+        by_sha[m["sha256"]].append(name)
+    exact = [sorted(g) for g in by_sha.values() if len(g) > 1]
+
+    # One representative per exact group so exact copies are not re-reported
+    reps = {names[0]: int(files[names[0]]["simhash"], 16)
+            for names in map(sorted, by_sha.values())}
+    width = 64 // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    buckets = defaultdict(list)
+    for name, h in reps.items():
+        for band in range(SIMHASH_BANDS):
+            buckets[(band, h >> (band * width) & mask)].append(name)
+
+    near = set()
+    for names in buckets.values():
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                dist = bin(reps[a] ^ reps[b]).count("1")
+                if dist <= NEAR_DUP_BITS:
+                    near.add((min(a, b), max(a, b), dist))
+    near_pairs = [{"a": a, "b": b, "distance": d} for a, b, d in sorted(near)]
+    return sorted(exact), near_pairs
+
+
+# ================================================================
+# COLLECTOR
+# ================================================================
+def _history_totals(entry):
+    return (entry.get("documents"), entry.get("tokens"),
+            entry.get("departments", {}))
+
+
+def _growth_baseline(history_path, snapshot):
+    """
+    The history entry to measure growth from, and whether snapshot is new.
+
+    Only changed totals are appended, so when snapshot equals the last
+    entry the one before it is the last batch's starting point.
+    """
+    if not history_path.exists():
+        return None, True
+    entries = []
+    with open(history_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    if entries and _history_totals(entries[-1]) == _history_totals(snapshot):
+        return (entries[-2] if len(entries) > 1 else None), False
+    return (entries[-1] if entries else None), True
+
+
+def collect(corpus_dir, context_window=DEFAULT_CONTEXT_WINDOW,
+            history_path=None):
+    """
+    Scan the corpus (re-reading only changed files) and build the report.
+
+    Raises:
+        ValueError: context_window is not positive
+    """
+    if context_window <= 0:
+        raise ValueError(f"context_window must be positive, got {context_window}")
+    corpus_path = Path(corpus_dir)
+    history_path = Path(history_path) if history_path else corpus_path / HISTORY_FILE
+    old_cache = load_cache(corpus_path)
+    files = {}
+    reread = 0
+
+    for f in sorted(corpus_path.glob("*.md")):
+        if f.name.upper() == "README.MD":
+            continue
+        st = f.stat()
+        entry = old_cache.get(f.name)
+        if not (entry and entry.get("size") == st.st_size
+                and entry.get("mtime") == st.st_mtime):
+            entry = dict(file_metrics(f), size=st.st_size, mtime=st.st_mtime)
+            reread += 1
+        files[f.name] = entry
+
+    if reread or set(old_cache) != set(files):
+        save_cache(corpus_path, files)
+
+    departments = defaultdict(lambda: {"documents": 0, "tokens": 0, "bytes": 0})
+    for m in files.values():
+        d = departments[m["department"]]
+        d["documents"] += 1
+        d["tokens"] += m["tokens"]
+        d["bytes"] += m["bytes"]
+
+    total_tokens = sum(m["tokens"] for m in files.values())
+    exact, near = find_duplicates(files)
+
+    run_at = datetime.now().isoformat()
+    snapshot = {
+        "run_at": run_at,
+        "documents": len(files),
+        "tokens": total_tokens,
+        "departments": {k: departments[k]["documents"] for k in sorted(departments)},
+    }
+    previous, changed = _growth_baseline(history_path, snapshot)
+    growth = None
+    if previous:
+        prev_depts = previous.get("departments", {})
+        growth = {
+            "since": previous.get("run_at"),
+            "documents": len(files) - previous.get("documents", 0),
+            "tokens": total_tokens - previous.get("tokens", 0),
+            "departments": {
+                name: now - prev_depts.get(name, 0)
+                for name in sorted(set(departments) | set(prev_depts))
+                for now in [departments.get(name, {}).get("documents", 0)]
+                if now != prev_depts.get(name, 0)
+            },
+        }
+
+    headroom = context_window - total_tokens
+    runs_left = None
+    if growth and growth["tokens"] > 0:
+        runs_left = max(headroom, 0) // growth["tokens"]
+
+    report = {
+        "collector_version": VERSION,
+        "run_at": run_at,
+        "corpus": str(corpus_path),
+        "documents": len(files),
+        "bytes": sum(m["bytes"] for m in files.values()),
+        "tokens": total_tokens,
+        "files_reread": reread,
+        "departments": {k: departments[k] for k in sorted(departments)},
+        "duplicates": {"exact": exact, "near": near},
+        "context_window": context_window,
+        "headroom_tokens": headroom,
+        "headroom_pct": round(100 * headroom / context_window, 1),
+        "growth": growth,
+        "projected_runs_until_full": runs_left,
+        "gate": {
+            "doc_count_exceeds_threshold": len(files) > DOC_THRESHOLD,
+            "doc_threshold": DOC_THRESHOLD,
+            "corpus_exceeds_context_window": headroom < 0,
+        },
+    }
+
+    if changed:
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Amaran Architecture Gate Metrics v{VERSION}")
+    parser.add_argument("corpus", help="Folder of converted SOP Markdown")
+    parser.add_argument("--context-window", type=int, default=DEFAULT_CONTEXT_WINDOW,
+                        help=f"Model context window in tokens (default: {DEFAULT_CONTEXT_WINDOW:,})")
+    parser.add_argument("--history", help=f"History file (default: <corpus>/{HISTORY_FILE})")
+    parser.add_argument("--output", "-o", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if not Path(args.corpus).is_dir():
+        print(f"Error: Folder not found: {args.corpus}")
+        return 1
+    if args.context_window <= 0:
+        print("Error: --context-window must be a positive number of tokens")
+        return 1
+
+    r = collect(args.corpus, args.context_window, args.history)
+
+    print("=" * 60)
+    print(f"Architecture Gate Metrics v{VERSION}")
+    print("=" * 60)
+    print(f"Documents: {r['documents']} (threshold {DOC_THRESHOLD})"
+          + ("  << EXCEEDS" if r["gate"]["doc_count_exceeds_threshold"] else ""))
+    print(f"Size:      {r['bytes'] / 1024 / 1024:.2f} MB, ~{r['tokens']:,} tokens")
+    print(f"Headroom:  {r['headroom_tokens']:,} tokens ({r['headroom_pct']}% of "
+          f"{r['context_window']:,})")
+    if r["growth"]:
+        g = r["growth"]
+        print(f"Growth:    {g['documents']:+} docs, {g['tokens']:+,} tokens since {g['since']}")
+        if r["projected_runs_until_full"] is not None:
+            print(f"           ~{r['projected_runs_until_full']} more batches like this until full")
+    print("\nBy department:")
+    for name, d in r["departments"].items():
+        delta = (r["growth"] or {}).get("departments", {}).get(name)
+        print(f"  {name:<20} {d['documents']:>5} docs  ~{d['tokens']:>10,} tokens"
+              + (f"  ({delta:+})" if delta else ""))
+    dups = r["duplicates"]
+    print(f"\nExact duplicates: {len(dups['exact'])} groups, "
+          f"near-duplicates: {len(dups['near'])} pairs")
+    for group in dups["exact"]:
+        print(f"  = {', '.join(group)}")
+    for pair in dups["near"]:
+        print(f"  ~ {pair['a']} / {pair['b']} (distance {pair['distance']})")
+    print(f"\n({r['files_reread']} files re-read)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2, ensure_ascii=False)
+        print(f"Report: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
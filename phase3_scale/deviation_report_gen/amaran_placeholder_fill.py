@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Amaran [[Placeholder]] Filler
+=============================
+Headless replacement for AmaranPlaceholderReplace_DoubleBracket.bas.
+
+Fills [[key]] tokens in a Word .docx template from JSON, without Word:
+  - flat JSON {"batch_number": "90001", ...} (same input as the macro), or
+  - BPR Verifier JSON as consumed by amaran_report_generator_v1_3.py;
+    nested keys are addressed with dots ([[batch_info.batch_number]]) and
+    unique leaf names also work on their own ([[batch_number]])
+
+The template is compiled once: every paragraph's text is reassembled
+from its <w:t> runs, so tokens split across runs by Word's spell-check
+or formatting are still found. The resulting token map is saved next to
+the template as <template>.tokenmap.json, keyed by the template's
+SHA-256, so later runs and pool workers skip the XML scan entirely. Each
+fill is then plain string substitution plus a zip write.
+
+Like the macro, keys match case-insensitively and body, headers,
+footers, footnotes, endnotes, comments and text boxes are all covered.
+Tokens with no value are left in place and reported.
+
+Usage:
+  python amaran_placeholder_fill.py template.docx data/*.json -o out/ -w 8
+  python amaran_placeholder_fill.py template.docx --list
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import hashlib
+import itertools
+import zipfile
+import argparse
+from pathlib import Path
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from amaran_report_generator_v1_3 import resolve_inputs
+
+VERSION = "1.1.0"
+FILL_MANIFEST_FILE = "fill_manifest.json"
+TOKEN_MAP_SUFFIX = ".tokenmap.json"
+# Bump when compile_part() output changes meaning so stale maps are dropped
+TOKEN_MAP_FORMAT = 1
+
+# Parts that can hold visible text ([Content_Types], styles etc. are copied as-is)
+TEXT_PARTS = re.compile(
+    r'word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml$')
+
+TOKEN = re.compile(r'\[\[([^\[\]]+?)\]\]')
+
+# <w:p ...> / <w:p/>, </w:p>, and <w:t ...>text</w:t>. Paragraphs nest
+# (text boxes live inside a run of the outer paragraph), so they are tracked
+# on a stack and every text node belongs to its innermost paragraph.
+_XML_NODES = re.compile(
+    r'<w:p(?=[\s>/])[^>]*?(/?)>'
+    r'|(</w:p>)'
+    r'|(<w:t(?:\s[^>]*)?>)([^<]*)</w:t>')
+
+_XML_ENTITIES = {"&amp;": "&", "&lt;": "<", "&gt;": ">",
+                 "&quot;": '"', "&apos;": "'"}
+_XML_ENTITY = re.compile(r'&(?:amp|lt|gt|quot|apos|#\d+|#x[0-9a-fA-F]+);')
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+_TAB = '</w:t><w:tab/><w:t xml:space="preserve">'
+
+
+# =============================================================================
+# VALUES
+# =============================================================================
+
+def _unescape_entity(m):
+    entity = m.group(0)
+    if entity in _XML_ENTITIES:
+        return _XML_ENTITIES[entity]
+    code = entity[3:-1] if entity[2] == "x" else entity[2:-1]
+    return chr(int(code, 16 if entity[2] == "x" else 10))
+
+
+def read_json_auto(path):
+    """Read JSON written by Notepad, Excel or Python (UTF-8 with/without BOM, UTF-16)."""
+    raw = Path(path).read_bytes()
+    if raw[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        text = raw.decode("utf-16")
+    else:
+        text = raw.decode("utf-8-sig")
+    return json.loads(text)
+
+
+def _text_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, list):
+        return ", ".join(_text_value(v) for v in value)
+    return str(value)
+
+
+def flatten_values(data):
+    """
+    Turn flat or nested JSON into {lowercase key: text}.
+
+    Nested dicts/lists get dotted keys (batch_info.batch_number,
+    gdp_corrections.0.page). Any trailing part of a key that is unique
+    is also available on its own (batch_number, em_1.result). Lists of
+    scalars are joined with ", ".
+    """
+    values = {}
+    suffixes = {}
+
+    def walk(node, prefix):
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if isinstance(value, dict) or (
+                    isinstance(value, list)
+                    and any(isinstance(v, (dict, list)) for v in value)):
+                walk(value, path)
+                continue
+            path = path.lower()
+            values[path] = _text_value(value)
+            parts = path.split(".")
+            for i in range(1, len(parts)):
+                suffixes.setdefault(".".join(parts[i:]), []).append(path)
+
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    walk(data, "")
+    for suffix, paths in suffixes.items():
+        if len(paths) == 1 and suffix not in values:
+            values[suffix] = values[paths[0]]
+    return values
+
+
+# =============================================================================
+# TEMPLATE SCAN
+# =============================================================================
+
+def compile_part(xml):
+    """
+    Split one XML part into literal text and token slots.
+
+    Returns a list of str (literal XML) and (key, token) tuples. A token
+    split over several <w:t> nodes gets its slot in the first node and is
+    cut from the others, so filling never has to look at the XML again.
+    """
+    edits = {}          # node start -> (open tag, [str | slot], node end)
+    stack = []
+
+    for m in _XML_NODES.finditer(xml):
+        if m.group(3):
+            if stack:
+                stack[-1].append(m)
+        elif m.group(2):
+            if stack:
+                _scan_paragraph(stack.pop(), edits)
+        elif not m.group(1):
+            stack.append([])
+
+    if not edits:
+        return [xml]
+
+    pieces = []
+    pos = 0
+    for start in sorted(edits):
+        tag, content, end = edits[start]
+        pieces.append(xml[pos:start])
+        if "xml:space" not in tag:
+            tag = tag[:-1] + ' xml:space="preserve">'
+        pieces.append(tag)
+        pieces.extend(content)
+        pieces.append("</w:t>")
+        pos = end
+    pieces.append(xml[pos:])
+
+    # Merge adjacent literals so filling joins as few strings as possible
+    merged = []
+    for piece in pieces:
+        if isinstance(piece, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += piece
+        else:
+            merged.append(piece)
+    return merged
+
+
+def _scan_paragraph(nodes, edits):
+    """Find tokens in one paragraph and record the node edits they need."""
+    texts = [_XML_ENTITY.sub(_unescape_entity, m.group(4)) for m in nodes]
+    joined = "".join(texts)
+    if "[[" not in joined:
+        return
+
+    offsets = []
+    total = 0
+    for t in texts:
+        offsets.append(total)
+        total += len(t)
+
+    cuts = {}           # node index -> [(start, end, slot or None)]
+    for tok in TOKEN.finditer(joined):
+        slot = (tok.group(1).strip().lower(), tok.group(0))
+        for i, t in enumerate(texts):
+            a = max(tok.start(), offsets[i])
+            b = min(tok.end(), offsets[i] + len(t))
+            if a < b:
+                cuts.setdefault(i, []).append(
+                    (a - offsets[i], b - offsets[i],
+                     slot if a == tok.start() else None))
+
+    for i, node_cuts in cuts.items():
+        text = texts[i]
+        content = []
+        pos = 0
+        for a, b, slot in node_cuts:
+            content.append(escape(text[pos:a]))
+            if slot:
+                content.append(slot)
+            pos = b
+        content.append(escape(text[pos:]))
+        m = nodes[i]
+        edits[m.start()] = (m.group(3), [c for c in content if c != ""], m.end())
+
+
+def _xml_value(value):
+    value = _INVALID_XML_CHARS.sub("", value)
+    value = escape(value.replace("\r\n", "\n"))
+    return value.replace("\n", _BREAK).replace("\t", _TAB)
+
+
+def token_map_path(template_path):
+    template_path = Path(template_path)
+    return template_path.with_name(template_path.name + TOKEN_MAP_SUFFIX)
+
+
+def read_token_map(template_path, digest):
+    """Compiled parts from the saved token map, or None if missing or stale."""
+    try:
+        with open(token_map_path(template_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (data.get("format") != TOKEN_MAP_FORMAT
+            or data.get("template_sha256") != digest):
+        return None
+    return {name: [p if isinstance(p, str) else tuple(p) for p in pieces]
+            for name, pieces in data["parts"].items()}
+
+
+def write_token_map(template_path, digest, parts):
+    """Save compiled parts; a read-only template folder just means no cache."""
+    map_path = token_map_path(template_path)
+    tmp_path = map_path.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": TOKEN_MAP_FORMAT,
+                       "filler_version": VERSION,
+                       "template": Path(template_path).name,
+                       "template_sha256": digest,
+                       "compiled_at": datetime.now().isoformat(),
+                       "parts": parts},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, map_path)
+    except OSError as e:
+        print(f"  WARNING: Could not save token map {map_path}: {e}")
+
+
+class DocxTemplate:
+    """
+    A compiled .docx template; fill() only substitutes and zips.
+
+    Compilation is skipped when a token map with the template's SHA-256
+    exists (see read_token_map); use_cache=False always rescans.
+    """
+
+    def __init__(self, path, use_cache=True):
+        self.path = Path(path)
+        self.entries = []       # [(ZipInfo, bytes or compiled pieces)]
+        self.tokens = set()
+        raw = self.path.read_bytes()
+        self.sha256 = hashlib.sha256(raw).hexdigest()
+        cached = read_token_map(self.path, self.sha256) if use_cache else None
+        self.from_cache = cached is not None
+        compiled = {}
+
+        with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+            for info in zf.infolist():
+                if cached is not None and info.filename in cached:
+                    data = cached[info.filename]
+                else:
+                    data = zf.read(info)
+                    if cached is None and TEXT_PARTS.match(info.filename):
+                        pieces = compile_part(data.decode("utf-8"))
+                        if len(pieces) > 1:
+                            compiled[info.filename] = data = pieces
+                if not isinstance(data, bytes):
+                    self.tokens.update(p[0] for p in data if isinstance(p, tuple))
+                self.entries.append((info, data))
+
+        if use_cache and cached is None:
+            write_token_map(self.path, self.sha256, compiled)
+
+    def fill(self, values, output_path):
+        """
+        Write a filled copy of the template.
+
+        Args:
+            values: {lowercase key: text}, see flatten_values()
+
+        Returns:
+            {"replaced": n, "missing": [keys left unfilled]}
+        """
+        replaced = 0
+        missing = set()
+        output_path = Path(output_path)
+        tmp_path = output_path.with_suffix(".tmp")
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info, data in self.entries:
+                if not isinstance(data, bytes):
+                    out = []
+                    for piece in data:
+                        if isinstance(piece, str):
+                            out.append(piece)
+                        elif piece[0] in values:
+                            out.append(_xml_value(values[piece[0]]))
+                            replaced += 1
+                        else:
+                            out.append(escape(piece[1]))
+                            missing.add(piece[0])
+                    data = "".join(out).encode("utf-8")
+                zf.writestr(info, data)
+        os.replace(tmp_path, output_path)
+        return {"replaced": replaced, "missing": sorted(missing)}
+
+
+@lru_cache(maxsize=8)
+def _load_template(path, mtime_ns):
+    """Per-process template cache (mtime in the key so edits are picked up)."""
+    return DocxTemplate(path)
+
+
+def load_template(path):
+    path = str(Path(path).resolve())
+    return _load_template(path, os.stat(path).st_mtime_ns)
+
+
+# =============================================================================
+# BATCH MODE
+# =============================================================================
+
+def safe_label(label):
+    """A batch number etc. made safe for use inside a file name."""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(label)).strip("_")
+
+
+def output_name(template_path, values, json_path, name_key="batch_number"):
+    """<template stem>_<value of name_key, else JSON stem>.docx"""
+    label = safe_label(values.get(name_key.lower()) or Path(json_path).stem)
+    return f"{Path(template_path).stem}_{label}.docx"
+
+
+def fill_one(template_path, json_path, output_dir, name_key="batch_number"):
+    """
+    Fill the template from one JSON file.
+
+    Runs inside a pool worker, so it never raises: failures are recorded
+    in the returned manifest entry instead.
+    """
+    entry = {"source_file": str(json_path)}
+    try:
+        values = flatten_values(read_json_auto(json_path))
+        out_path = Path(output_dir) / output_name(template_path, values,
+                                                  json_path, name_key)
+        entry.update(load_template(template_path).fill(values, out_path))
+        entry["output"] = out_path.name
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    else:
+        entry["status"] = "completed"
+    return entry
+
+
+def _name_clashes(template_path, json_paths, name_key="batch_number"):
+    """
+    {json path: error} for inputs whose output_name() another input also
+    gets, which would overwrite each other. Unreadable files are left to
+    fill_one() to report.
+    """
+    owners = {}
+    for json_path in json_paths:
+        try:
+            values = flatten_values(read_json_auto(json_path))
+        except (OSError, ValueError, AttributeError):
+            continue
+        name = output_name(template_path, values, json_path, name_key)
+        # Windows file names are case-insensitive
+        owners.setdefault(name.lower(), []).append(json_path)
+
+    clashes = {}
+    for paths in owners.values():
+        if len(paths) > 1:
+            names = ", ".join(Path(p).name for p in paths)
+            for json_path in paths:
+                clashes[json_path] = f"Duplicate output name: {names}"
+    return clashes
+
+
+def fill_batch(template_path, json_paths, output_dir, workers=1,
+               name_key="batch_number"):
+    """
+    Fill one template for many JSON files into output_dir.
+
+    The template is compiled here first so the token map is on disk
+    before workers start; each worker then loads it without scanning.
+    A per-document manifest is written to fill_manifest.json. Inputs that
+    would write the same output file are marked failed and not filled.
+
+    Returns:
+        manifest dict
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = len(json_paths)
+    template = load_template(template_path)
+    clashes = _name_clashes(template_path, json_paths, name_key)
+    pending = [p for p in json_paths if p not in clashes]
+
+    manifest = {
+        "filler_version": VERSION,
+        "template": str(template_path),
+        "template_sha256": template.sha256,
+        "token_map": "cached" if template.from_cache else "compiled",
+        "started_at": datetime.now().isoformat(),
+        "workers": workers,
+        "documents": [],
+        "totals": {"completed": 0, "failed": 0},
+    }
+
+    failed = [{"source_file": str(p), "status": "failed", "error": error}
+              for p, error in clashes.items()]
+    if workers > 1 and len(pending) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(fill_one, [template_path] * len(pending), pending,
+                           [output_dir] * len(pending),
+                           [name_key] * len(pending))
+    else:
+        pool = None
+        results = (fill_one(template_path, p, output_dir, name_key)
+                   for p in pending)
+
+    try:
+        for n, entry in enumerate(itertools.chain(failed, results), 1):
+            manifest["documents"].append(entry)
+            manifest["totals"][entry["status"]] += 1
+            label = entry.get("output", Path(entry["source_file"]).name)
+            if entry["status"] == "failed":
+                print(f"  [{n}/{total}] FAILED  {label}: {entry['error']}")
+            elif entry["missing"]:
+                print(f"  [{n}/{total}] OK      {label} "
+                      f"(unfilled: {', '.join(entry['missing'])})")
+            else:
+                print(f"  [{n}/{total}] OK      {label}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    manifest["finished_at"] = datetime.now().isoformat()
+    with open(output_dir / FILL_MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Amaran [[Placeholder]] Filler v{VERSION}")
+    parser.add_argument("template", help="Word .docx template with [[key]] tokens")
+    parser.add_argument("input", nargs="*",
+                        help="Input JSON file(s), folder(s) or glob pattern(s)")
+    parser.add_argument("--output", "-o", default=".", help="Output directory")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Parallel worker processes")
+    parser.add_argument("--name-key", default="batch_number",
+                        help="Value used in output file names (default: batch_number)")
+    parser.add_argument("--list", action="store_true",
+                        help="List the tokens found in the template and exit")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Discard the saved token map and rescan the template")
+    args = parser.parse_args()
+
+    if not Path(args.template).is_file():
+        print(f"Error: Template not found: {args.template}")
+        return 1
+
+    if args.no_cache:
+        token_map_path(args.template).unlink(missing_ok=True)
+    if args.list:
+        for token in sorted(load_template(args.template).tokens):
+            print(f"[[{token}]]")
+        return 0
+
+    json_paths = [p for p in resolve_inputs(args.input)
+                  if p.name != FILL_MANIFEST_FILE]
+    if not json_paths:
+        print(f"Error: No JSON files found in {', '.join(args.input) or '(none)'}")
+        return 1
+
+    print("=" * 60)
+    print(f"Amaran [[Placeholder]] Filler v{VERSION}")
+    print("=" * 60)
+    print(f"Template: {args.template}")
+    print(f"Documents: {len(json_paths)} | Workers: {args.workers}")
+
+    manifest = fill_batch(args.template, json_paths, args.output,
+                          args.workers, args.name_key)
+    totals = manifest["totals"]
+
+    print("\n" + "=" * 60)
+    print(f"Complete! {totals['completed']} completed, {totals['failed']} failed")
+    print(f"Manifest: {Path(args.output) / FILL_MANIFEST_FILE}")
+    print("=" * 60)
+
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
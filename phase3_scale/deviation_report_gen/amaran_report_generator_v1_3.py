@@ -8,10 +8,13 @@ Report 1: QA Compliance Audit (Full verification including Weighing and IPC/EM)
 Report 2: Page Reconciliation
 """
 
+import glob
 import json
+import itertools
 import argparse
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
 VERSION = "1.3.0"
 
@@ -27,8 +30,9 @@ COLORS = {
 }
 
 
+@lru_cache(maxsize=None)
 def get_compact_css():
-    """Compact CSS matching Amaran brand style - print-safe"""
+    """Compact CSS matching Amaran brand style - print-safe (built once per process)"""
     return f'''
     @page {{ size: A4; margin: 12mm 15mm; }}
     
@@ -139,180 +143,88 @@ def get_compact_css():
     '''
 
 
-def generate_report1_compact(data):
-    """Report 1: QA Compliance Audit - v3.4 Format with all verification sections"""
-    
-    batch_info = data.get("batch_info", {})
-    b = batch_info.get("batch_number", "Unknown")
-    p = batch_info.get("product_name", "Unknown")
-    
-    disposition = data.get("disposition", {})
-    status = disposition.get("status", "PASS")
-    bpr_body_check = data.get("bpr_body_check", {})
-    reconciliation = data.get("reconciliation", {})
-    sterilization = data.get("sterilization", {})
-    gdp_corrections = data.get("gdp_corrections", [])
-    documentation_summary = data.get("documentation_summary", {})
-    filter_integrity = data.get("filter_integrity", {})
-    weighing_verification = data.get("weighing_verification", {})
-    ipc = data.get("ipc", {})
-    em = data.get("em", {})
-    
-    qa_date = bpr_body_check.get("qa_signature_date_str", "N/A")
-    critical = disposition.get("critical", 0)
-    major = disposition.get("major", 0)
-    minor = disposition.get("minor", len(gdp_corrections))
-    
-    html = f'''<!DOCTYPE html>
+# =============================================================================
+# TEMPLATE ENGINE
+# =============================================================================
+# Reports are built as a list of fragments and joined once at the end, so
+# rendering stays linear in the number of rows. Static blocks are bound
+# str.format templates resolved at import time; per-row markup lives in
+# generator helpers (f-strings are the cheapest per-row formatter). New
+# report types should reuse render_document(), SECTION and pass_fail().
+
+DOC_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <title>QA Compliance Audit - {b}</title>
-    <style>{get_compact_css()}</style>
+    <title>{title} - {batch}</title>
+    <style>{css}</style>
 </head>
 <body>
 
 <div class="header">
-    <div class="title">QA Compliance Audit Report</div>
-    <div class="info">Batch: <b>{b}</b> | Product: {p}</div>
+    <div class="title">{heading}</div>
+    <div class="info">Batch: <b>{batch}</b> | Product: {product}</div>
+</div>
+
+'''.format
+
+DOC_FOOT = '''
+<div class="footer">
+    <p>Prepared by: ____________________________</p>
 </div>
 
-<!-- 1. EXECUTIVE SUMMARY -->
+</body>
+</html>'''
+
+SECTION = '<div class="section">{}</div>'.format
+SOURCE_NOTE = '<p class="source-note">{}</p>'.format
+MATH_BOX = '<div class="math-box">{}</div>'.format
+TABLE_END = '</tbody></table>'
+
+SUMMARY_TABLE = '''<!-- 1. EXECUTIVE SUMMARY -->
 <div class="section">1. EXECUTIVE SUMMARY</div>
 <table>
     <tbody>
-        <tr><td class="item" style="width:20%">Batch No</td><td>{b}</td></tr>
-        <tr><td class="item">Product</td><td>{p}</td></tr>
+        <tr><td class="item" style="width:20%">Batch No</td><td>{batch}</td></tr>
+        <tr><td class="item">Product</td><td>{product}</td></tr>
         <tr><td class="item">QA Verified Date</td><td>{qa_date}</td></tr>
-        <tr><td class="item">Overall Status</td><td class="{"pass" if status == "PASS" else "warn"}">{status}</td></tr>
+        <tr><td class="item">Overall Status</td><td class="{status_cls}">{status}</td></tr>
         <tr><td class="item">Total Issues</td><td>{critical} Critical, {major} Major, {minor} Minor</td></tr>
     </tbody>
 </table>
 
 <!-- 2. DETAILED FINDINGS & ISSUE LOG -->
-<div class="section">2. DETAILED FINDINGS & ISSUE LOG</div>'''
-    
-    if gdp_corrections:
-        html += '''<table>
+<div class="section">2. DETAILED FINDINGS & ISSUE LOG</div>'''.format
+
+GDP_HEAD = '''<table>
             <thead><tr><th style="width:8%">Severity</th><th style="width:7%">Section</th><th style="width:6%">Page</th><th>Description</th><th style="width:20%">Reason</th></tr></thead>
             <tbody>'''
-        for corr in gdp_corrections:
-            html += f'''<tr>
-                <td class="center">{corr.get("severity", "Minor")}</td>
-                <td class="center">{corr.get("section", "-")}</td>
-                <td class="center">{corr.get("page", "-")}</td>
-                <td>{corr.get("description", "-")}</td>
-                <td>{corr.get("reason", "-")}</td>
-            </tr>'''
-        html += '</tbody></table>'
-    else:
-        html += '<p style="padding:6px;" class="pass">No issues identified. âœ“</p>'
-    
-    # 3. RECONCILIATION MATH PROOF
-    html += '<div class="section">3. RECONCILIATION MATH PROOF</div>'
-    math_proofs = reconciliation.get("math_proof", [])
-    if math_proofs:
-        for proof in math_proofs:
-            html += f'<div class="math-box">{proof}</div>'
-    else:
-        html += '<p style="padding:6px; color:#888;">No reconciliation data available</p>'
-    
-    # 4. DOCUMENTATION & GDP SUMMARY
-    html += '<div class="section">4. DOCUMENTATION & GDP SUMMARY</div>'
-    
-    sig_ver = documentation_summary.get("signature_verification", "Pass")
-    border_sig = documentation_summary.get("border_signatures", "Pass")
-    corrections = documentation_summary.get("corrections", "All corrections followed GDP standards.")
-    
-    html += f'''<table>
+
+
+DOC_SUMMARY_TABLE = '''<table>
         <tbody>
             <tr><td class="item" style="width:18%">Signature Verification</td><td>{sig_ver}</td></tr>
             <tr><td class="item">Border Signatures</td><td>{border_sig}</td></tr>
             <tr><td class="item">Corrections</td><td>{corrections}</td></tr>
         </tbody>
-    </table>'''
-    
-    # 5. STERILIZATION VERIFICATION TABLE
-    cycles = sterilization.get("cycles", [])
-    if cycles:
-        html += '<div class="section">5. STERILIZATION VERIFICATION TABLE</div>'
-        html += '''<table>
+    </table>'''.format
+
+STERIL_HEAD = '''<table>
             <thead><tr><th style="width:11%">Cycle ID</th><th style="width:16%">Item Sterilized</th><th style="width:10%">Parameter</th><th class="center" style="width:7%">Spec</th><th class="center" style="width:11%">Actual</th><th class="center" style="width:7%">Pass/Fail</th></tr></thead>
             <tbody>'''
-        for cycle in cycles:
-            cid = cycle.get("cycle_id", "-")
-            item = cycle.get("item", "-")
-            temp = cycle.get("temperature")
-            temp_range = cycle.get("temperature_range", str(temp) if temp else "-")
-            time_val = cycle.get("time")
-            
-            if temp or temp_range != "-":
-                temp_pass = (temp >= 122) if temp else True
-                html += f'<tr><td>{cid}</td><td>{item}</td><td>Temp (Â°C)</td><td class="center">â‰¥122</td><td class="center">{temp_range}</td><td class="center pass">Pass</td></tr>'
-            if time_val:
-                time_pass = time_val >= 20
-                html += f'<tr><td>{cid}</td><td>{item}</td><td>Time (min)</td><td class="center">â‰¥20</td><td class="center">{time_val}:00</td><td class="center pass">Pass</td></tr>'
-        html += '</tbody></table>'
-    
-    # 6. WEIGHING VERIFICATION TABLE (NEW in v1.3)
-    weighing_items = weighing_verification.get("items", [])
-    if weighing_items:
-        html += '<div class="section">6. WEIGHING VERIFICATION TABLE</div>'
-        
-        source_note = weighing_verification.get("source_note", "")
-        if source_note:
-            html += f'<p class="source-note">{source_note}</p>'
-        
-        html += '''<table>
+
+
+WEIGHING_HEAD = '''<table>
             <thead><tr><th style="width:7%">Step</th><th style="width:13%">Item</th><th style="width:9%">Parameter</th><th style="width:13%">Handwritten (BPR)</th><th style="width:13%">Printout (Att-7)</th><th class="center" style="width:7%">Match?</th></tr></thead>
             <tbody>'''
-        for w in weighing_items:
-            match = w.get("match", True)
-            match_cls = "pass" if match else "fail"
-            match_text = "Yes" if match else "No"
-            note = w.get("note", "")
-            if note:
-                match_text = f"Yes ({note})"
-            html += f'''<tr>
-                <td>{w.get("step", "-")}</td>
-                <td>{w.get("item", "-")}</td>
-                <td>{w.get("parameter", "-")}</td>
-                <td>{w.get("handwritten", "-")}</td>
-                <td>{w.get("printout", "-")}</td>
-                <td class="center {match_cls}">{match_text}</td>
-            </tr>'''
-        html += '</tbody></table>'
-    
-    # 7. FILTER INTEGRITY VERIFICATION
-    if filter_integrity:
-        html += '<div class="section">7. FILTER INTEGRITY VERIFICATION</div>'
-        
-        source_note = filter_integrity.get("source_note", "")
-        if source_note:
-            html += f'<p class="source-note">{source_note}</p>'
-        
-        html += '''<table>
+
+
+FILTER_HEAD = '''<table>
             <thead><tr><th style="width:9%">Stage</th><th style="width:15%">Filter ID (from BPR/Att)</th><th class="center" style="width:14%">Extracted Spec (Min. BP)</th><th class="center" style="width:11%">Actual Result</th><th class="center" style="width:7%">Status</th></tr></thead>
             <tbody>'''
-        
-        tests = filter_integrity.get("tests", [])
-        for t in tests:
-            passed = t.get("passed", True)
-            cls = "pass" if passed else "fail"
-            status_text = "Pass" if passed else "Fail"
-            html += f'''<tr>
-                <td>{t.get("stage", "-")}</td>
-                <td>{t.get("filter_id", "-")}</td>
-                <td class="center">{t.get("spec", "-")}</td>
-                <td class="center">{t.get("value", "-")}</td>
-                <td class="center {cls}">{status_text}</td>
-            </tr>'''
-        
-        html += '</tbody></table>'
-    
-    # 8. IPC/EM VERIFICATION TABLE (NEW in v1.3 - moved from Report 2)
-    html += '<div class="section">8. IPC/EM VERIFICATION TABLE</div>'
-    html += '''<table>
+
+
+IPC_EM_HEAD = '''<table>
         <thead>
             <tr>
                 <th style="width:9%">Item</th>
@@ -323,154 +235,314 @@ def generate_report1_compact(data):
             </tr>
         </thead>
         <tbody>'''
-    
-    # IPC items
-    for k in ["ipc_1", "ipc_2", "ipc_3", "ipc_4", "ipc_5"]:
-        d = ipc.get(k, {})
-        if not d:
-            continue
-        
-        passed = d.get("passed")
-        cls = "pass" if passed else ("fail" if passed is False else "na")
-        status_text = "Pass" if passed else ("Fail" if passed is False else "-")
-        
-        html += f'''
+
+
+PAGE_RECON_HEAD = '''<!-- PAGE RECONCILIATION TABLE -->
+<div class="section">PAGE RECONCILIATION TABLE</div>
+<table>
+    <thead>
+        <tr>
+            <th style="width:13%">Attachment</th>
+            <th>Document Name</th>
+            <th class="center" style="width:7%">Pages</th>
+        </tr>
+    </thead>
+    <tbody>'''
+
+
+PAGE_RECON_TOTAL = '''
+        <tr style="font-weight:bold; background:{bg}">
+            <td></td>
+            <td>Total</td>
+            <td class="center">{total}</td>
+        </tr>
+    </tbody>
+</table>
+'''.format
+
+IPC_KEYS = ("ipc_1", "ipc_2", "ipc_3", "ipc_4", "ipc_5")
+EM_KEYS = ("em_1", "em_2", "em_2a", "em_2b", "em_3")
+
+
+def render_document(title, heading, batch, product, body, inline_css=True):
+    """
+    Join head, body fragments and footer into one HTML document.
+
+    inline_css=False leaves the <style> block empty; the PDF path then
+    applies the pre-parsed stylesheet from get_pdf_stylesheet() instead.
+    """
+    css = get_compact_css() if inline_css else ""
+    head = DOC_HEAD(title=title, heading=heading, batch=batch,
+                    product=product, css=css)
+    return "".join([head, *body, DOC_FOOT])
+
+
+def pass_fail(passed):
+    """Map a tri-state passed flag (True/False/None) to (css class, label)."""
+    if passed:
+        return "pass", "Pass"
+    if passed is False:
+        return "fail", "Fail"
+    return "na", "-"
+
+
+def _gdp_rows(gdp_corrections):
+    for corr in gdp_corrections:
+        g = corr.get
+        yield f'''<tr>
+                <td class="center">{g("severity", "Minor")}</td>
+                <td class="center">{g("section", "-")}</td>
+                <td class="center">{g("page", "-")}</td>
+                <td>{g("description", "-")}</td>
+                <td>{g("reason", "-")}</td>
+            </tr>'''
+
+
+def _sterilization_rows(cycles):
+    for cycle in cycles:
+        cid = cycle.get("cycle_id", "-")
+        item = cycle.get("item", "-")
+        temp = cycle.get("temperature")
+        temp_range = cycle.get("temperature_range", str(temp) if temp else "-")
+        time_val = cycle.get("time")
+
+        if temp or temp_range != "-":
+            yield f'<tr><td>{cid}</td><td>{item}</td><td>Temp (Â°C)</td><td class="center">â‰¥122</td><td class="center">{temp_range}</td><td class="center pass">Pass</td></tr>'
+        if time_val:
+            yield f'<tr><td>{cid}</td><td>{item}</td><td>Time (min)</td><td class="center">â‰¥20</td><td class="center">{time_val}:00</td><td class="center pass">Pass</td></tr>'
+
+
+def _weighing_rows(weighing_items):
+    for w in weighing_items:
+        g = w.get
+        match = g("match", True)
+        match_cls = "pass" if match else "fail"
+        note = g("note", "")
+        match_text = f"Yes ({note})" if note else ("Yes" if match else "No")
+        yield f'''<tr>
+                <td>{g("step", "-")}</td>
+                <td>{g("item", "-")}</td>
+                <td>{g("parameter", "-")}</td>
+                <td>{g("handwritten", "-")}</td>
+                <td>{g("printout", "-")}</td>
+                <td class="center {match_cls}">{match_text}</td>
+            </tr>'''
+
+
+def _filter_rows(tests):
+    for t in tests:
+        g = t.get
+        passed = g("passed", True)
+        cls = "pass" if passed else "fail"
+        status_text = "Pass" if passed else "Fail"
+        yield f'''<tr>
+                <td>{g("stage", "-")}</td>
+                <td>{g("filter_id", "-")}</td>
+                <td class="center">{g("spec", "-")}</td>
+                <td class="center">{g("value", "-")}</td>
+                <td class="center {cls}">{status_text}</td>
+            </tr>'''
+
+
+def _ipc_em_row(d, spec, val):
+    cls, status_text = pass_fail(d.get("passed"))
+    return f'''
         <tr>
             <td class="item">{d.get("item", "-")}</td>
-            <td class="center">{d.get("spec", "-")}</td>
+            <td class="center">{spec}</td>
             <td>{d.get("source", "-")}</td>
-            <td class="center">{d.get("value", "-")}</td>
+            <td class="center">{val}</td>
             <td class="center {cls}">{status_text}</td>
         </tr>'''
-    
-    # EM items
-    for k in ["em_1", "em_2", "em_2a", "em_2b", "em_3"]:
+
+
+def _ipc_em_rows(ipc, em):
+    for k in IPC_KEYS:
+        d = ipc.get(k, {})
+        if d:
+            yield _ipc_em_row(d, d.get("spec", "-"), d.get("value", "-"))
+
+    for k in EM_KEYS:
         d = em.get(k, {})
         if not d:
             continue
-        
+
         val = d.get("value", "-")
         spec = d.get("spec", "-")
         if val == "-" and spec == "-":
             continue
-        
-        passed = d.get("passed")
-        cls = "pass" if passed else ("fail" if passed is False else "na")
-        status_text = "Pass" if passed else ("Fail" if passed is False else "-")
-        
-        html += f'''
+        yield _ipc_em_row(d, spec, val)
+
+
+def _page_recon_row(label, name, pages):
+    return f'''
         <tr>
-            <td class="item">{d.get("item", "-")}</td>
-            <td class="center">{spec}</td>
-            <td>{d.get("source", "-")}</td>
-            <td class="center">{val}</td>
-            <td class="center {cls}">{status_text}</td>
+            <td class="item">{label}</td>
+            <td>{name}</td>
+            <td class="center">{pages}</td>
         </tr>'''
-    
-    html += '</tbody></table>'
-    
-    # FOOTER
-    html += f'''
-<div class="footer">
-    <p>Prepared by: ____________________________</p>
-</div>
 
-</body>
-</html>'''
-    
-    return html
 
+def generate_report1_compact(data, inline_css=True):
+    """Report 1: QA Compliance Audit - v3.4 Format with all verification sections"""
 
-def generate_report2_compact(data):
+    batch_info = data.get("batch_info", {})
+    b = batch_info.get("batch_number", "Unknown")
+    p = batch_info.get("product_name", "Unknown")
+
+    disposition = data.get("disposition", {})
+    status = disposition.get("status", "PASS")
+    bpr_body_check = data.get("bpr_body_check", {})
+    reconciliation = data.get("reconciliation", {})
+    sterilization = data.get("sterilization", {})
+    gdp_corrections = data.get("gdp_corrections", [])
+    documentation_summary = data.get("documentation_summary", {})
+    filter_integrity = data.get("filter_integrity", {})
+    weighing_verification = data.get("weighing_verification", {})
+    ipc = data.get("ipc", {})
+    em = data.get("em", {})
+
+    # 1. EXECUTIVE SUMMARY + 2. DETAILED FINDINGS heading
+    parts = [SUMMARY_TABLE(
+        batch=b,
+        product=p,
+        qa_date=bpr_body_check.get("qa_signature_date_str", "N/A"),
+        status_cls="pass" if status == "PASS" else "warn",
+        status=status,
+        critical=disposition.get("critical", 0),
+        major=disposition.get("major", 0),
+        minor=disposition.get("minor", len(gdp_corrections)),
+    )]
+
+    if gdp_corrections:
+        parts.append(GDP_HEAD)
+        parts.extend(_gdp_rows(gdp_corrections))
+        parts.append(TABLE_END)
+    else:
+        parts.append('<p style="padding:6px;" class="pass">No issues identified. âœ“</p>')
+
+    # 3. RECONCILIATION MATH PROOF
+    parts.append(SECTION("3. RECONCILIATION MATH PROOF"))
+    math_proofs = reconciliation.get("math_proof", [])
+    if math_proofs:
+        parts.extend(map(MATH_BOX, math_proofs))
+    else:
+        parts.append('<p style="padding:6px; color:#888;">No reconciliation data available</p>')
+
+    # 4. DOCUMENTATION & GDP SUMMARY
+    parts.append(SECTION("4. DOCUMENTATION & GDP SUMMARY"))
+    parts.append(DOC_SUMMARY_TABLE(
+        sig_ver=documentation_summary.get("signature_verification", "Pass"),
+        border_sig=documentation_summary.get("border_signatures", "Pass"),
+        corrections=documentation_summary.get(
+            "corrections", "All corrections followed GDP standards."),
+    ))
+
+    # 5. STERILIZATION VERIFICATION TABLE
+    cycles = sterilization.get("cycles", [])
+    if cycles:
+        parts.append(SECTION("5. STERILIZATION VERIFICATION TABLE"))
+        parts.append(STERIL_HEAD)
+        parts.extend(_sterilization_rows(cycles))
+        parts.append(TABLE_END)
+
+    # 6. WEIGHING VERIFICATION TABLE (NEW in v1.3)
+    weighing_items = weighing_verification.get("items", [])
+    if weighing_items:
+        parts.append(SECTION("6. WEIGHING VERIFICATION TABLE"))
+        source_note = weighing_verification.get("source_note", "")
+        if source_note:
+            parts.append(SOURCE_NOTE(source_note))
+        parts.append(WEIGHING_HEAD)
+        parts.extend(_weighing_rows(weighing_items))
+        parts.append(TABLE_END)
+
+    # 7. FILTER INTEGRITY VERIFICATION
+    if filter_integrity:
+        parts.append(SECTION("7. FILTER INTEGRITY VERIFICATION"))
+        source_note = filter_integrity.get("source_note", "")
+        if source_note:
+            parts.append(SOURCE_NOTE(source_note))
+        parts.append(FILTER_HEAD)
+        parts.extend(_filter_rows(filter_integrity.get("tests", [])))
+        parts.append(TABLE_END)
+
+    # 8. IPC/EM VERIFICATION TABLE (NEW in v1.3 - moved from Report 2)
+    parts.append(SECTION("8. IPC/EM VERIFICATION TABLE"))
+    parts.append(IPC_EM_HEAD)
+    parts.extend(_ipc_em_rows(ipc, em))
+    parts.append(TABLE_END)
+
+    return render_document("QA Compliance Audit", "QA Compliance Audit Report",
+                           b, p, parts, inline_css)
+
+
+def generate_report2_compact(data, inline_css=True):
     """Report 2: Page Reconciliation - Simplified per v3.4"""
-    
+
     batch_info = data.get("batch_info", {})
     b = batch_info.get("batch_number", "Unknown")
     p = batch_info.get("product_name", "Unknown")
-    
+
     attachments = data.get("attachments", {})
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <title>Page Reconciliation - {b}</title>
-    <style>{get_compact_css()}</style>
-</head>
-<body>
 
-<div class="header">
-    <div class="title">Page Reconciliation Report</div>
-    <div class="info">Batch: <b>{b}</b> | Product: {p}</div>
-</div>
+    parts = [PAGE_RECON_HEAD]
 
-<!-- PAGE RECONCILIATION TABLE -->
-<div class="section">PAGE RECONCILIATION TABLE</div>
-<table>
-    <thead>
-        <tr>
-            <th style="width:13%">Attachment</th>
-            <th>Document Name</th>
-            <th class="center" style="width:7%">Pages</th>
-        </tr>
-    </thead>
-    <tbody>'''
-    
     # BPR Body
-    bpr_end = attachments.get("bpr_body_pages", 0)
-    html += f'''
-        <tr>
-            <td class="item">-</td>
-            <td>BPR Body</td>
-            <td class="center">{bpr_end}</td>
-        </tr>'''
-    
+    parts.append(_page_recon_row("-", "BPR Body",
+                                 attachments.get("bpr_body_pages", 0)))
+
     # Attachments sorted by number
     att_dict = attachments.get("attachments", {})
     all_att = [(k, v) for k, v in att_dict.items() if v.get("actual") or v.get("declared")]
     all_att.sort(key=lambda x: x[1].get("att_number", 99) or 99)
-    
+
     for att_key, att in all_att:
         att_num = att.get("att_number") or "?"
         name = att.get("name", att_key)
         actual = att.get("actual") or att.get("declared") or "-"
-        
+
         if actual and actual != "-":
-            html += f'''
-        <tr>
-            <td class="item">Attachment-{att_num}</td>
-            <td>{name}</td>
-            <td class="center">{actual}</td>
-        </tr>'''
-    
+            parts.append(_page_recon_row(f"Attachment-{att_num}", name, actual))
+
     # Total
-    total = attachments.get("total_pages", 0)
-    html += f'''
-        <tr style="font-weight:bold; background:{COLORS["bg_card"]}">
-            <td></td>
-            <td>Total</td>
-            <td class="center">{total}</td>
-        </tr>'''
-    
-    html += f'''
-    </tbody>
-</table>
+    parts.append(PAGE_RECON_TOTAL(bg=COLORS["bg_card"],
+                                  total=attachments.get("total_pages", 0)))
 
-<div class="footer">
-    <p>Prepared by: ____________________________</p>
-</div>
+    return render_document("Page Reconciliation", "Page Reconciliation Report",
+                           b, p, parts, inline_css)
 
-</body>
-</html>'''
-    
-    return html
+
+@lru_cache(maxsize=None)
+def get_pdf_stylesheet():
+    """
+    Parse the compact CSS into a WeasyPrint stylesheet once per process.
+
+    Returns:
+        (CSS, FontConfiguration); raises ImportError without WeasyPrint
+    """
+    from weasyprint import CSS
+    try:
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:  # WeasyPrint < 53
+        from weasyprint.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    return CSS(string=get_compact_css(), font_config=font_config), font_config
+
+
+def write_pdf(html, path):
+    """Render HTML built with inline_css=False to PDF with the shared stylesheet."""
+    from weasyprint import HTML
+    stylesheet, font_config = get_pdf_stylesheet()
+    HTML(string=html).write_pdf(str(path), stylesheets=[stylesheet],
+                                font_config=font_config)
 
 
 def generate_pdf(html, path):
-    """Generate PDF from HTML"""
+    """Generate PDF from HTML (pass HTML rendered with inline_css=False)"""
     try:
-        from weasyprint import HTML
-        HTML(string=html).write_pdf(str(path))
+        write_pdf(html, path)
         print(f"  âœ“ PDF: {path.name}")
         return True
     except ImportError:
@@ -481,14 +553,215 @@ def generate_pdf(html, path):
         return False
 
 
+# =============================================================================
+# BATCH MODE (many verifier JSONs, one run, process pool)
+# =============================================================================
+
+REPORT_MANIFEST_FILE = "report_manifest.json"
+
+# (output file prefix, renderer) for every report produced per batch
+REPORTS = (
+    ("Report1_QA_Compliance_Audit", generate_report1_compact),
+    ("Report2_Page_Reconciliation", generate_report2_compact),
+)
+
+
+def resolve_inputs(inputs):
+    """
+    Expand CLI inputs (JSON files, folders, glob patterns) into a sorted,
+    de-duplicated list of verifier JSON paths.
+    """
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            found.update(p for p in path.iterdir()
+                         if p.suffix.lower() == ".json")
+        elif path.is_file():
+            found.add(path)
+        else:
+            # Windows shells do not expand wildcards, so expand here
+            found.update(Path(p) for p in glob.glob(item, recursive=True)
+                         if p.lower().endswith(".json"))
+    return sorted(p.resolve() for p in found
+                  if p.name != REPORT_MANIFEST_FILE)
+
+
+def report_label(data, json_path):
+    """File-name label for a batch: its batch number, else the JSON file's stem."""
+    from amaran_placeholder_fill import safe_label
+
+    batch_number = data.get("batch_info", {}).get("batch_number")
+    return safe_label(batch_number or Path(json_path).stem)
+
+
+def render_batch(json_path, output_dir, html_only=False, docx_templates=()):
+    """
+    Render every report in REPORTS for one verifier JSON, then fill each
+    Word template in docx_templates with the same data (see
+    amaran_placeholder_fill.py).
+
+    Runs inside a pool worker, so it never raises: failures are recorded
+    in the returned manifest entry instead.
+    """
+    json_path = Path(json_path)
+    output_dir = Path(output_dir)
+    entry = {"source_file": str(json_path), "outputs": []}
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        batch_number = data.get("batch_info", {}).get("batch_number", "Unknown")
+        entry["batch_number"] = batch_number
+        label = report_label(data, json_path)
+
+        for prefix, render in REPORTS:
+            html_path = output_dir / f"{prefix}_{label}.html"
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(render(data))
+            entry["outputs"].append(html_path.name)
+
+            if not html_only:
+                pdf_path = output_dir / f"{prefix}_{label}.pdf"
+                write_pdf(render(data, inline_css=False), pdf_path)
+                entry["outputs"].append(pdf_path.name)
+
+        if docx_templates:
+            from amaran_placeholder_fill import (flatten_values, load_template,
+                                                 output_name)
+
+            values = flatten_values(data)
+            for template in docx_templates:
+                # Same (sanitised) name the standalone filler would write
+                docx_path = output_dir / output_name(template, values, json_path)
+                result = load_template(template).fill(values, docx_path)
+                entry["outputs"].append(docx_path.name)
+                if result["missing"]:
+                    entry.setdefault("unfilled", {})[docx_path.name] = result["missing"]
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    else:
+        entry["status"] = "completed"
+    return entry
+
+
+def _label_clashes(json_paths):
+    """
+    {json path: error} for inputs whose report label another input also
+    has (same batch number, or same file stem with none), which would
+    overwrite each other's outputs. Unreadable files are left to
+    render_batch() to report.
+    """
+    owners = {}
+    for json_path in json_paths:
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            label = report_label(data, json_path)
+        except (OSError, ValueError, AttributeError):
+            continue
+        # Windows file names are case-insensitive
+        owners.setdefault(label.lower(), []).append(json_path)
+
+    clashes = {}
+    for paths in owners.values():
+        if len(paths) > 1:
+            names = ", ".join(Path(p).name for p in paths)
+            for json_path in paths:
+                clashes[json_path] = f"Duplicate report label: {names}"
+    return clashes
+
+
+def process_batch(json_paths, output_dir, html_only=False, workers=1,
+                  docx_templates=()):
+    """
+    Render reports for many batches into output_dir.
+
+    With workers > 1 batches are spread over a process pool; each worker
+    parses the stylesheet once and reuses it for all its PDFs. Word
+    templates are compiled here before the pool starts, so workers load
+    the saved token map instead of rescanning the template XML. A
+    per-batch manifest is written to report_manifest.json.
+
+    Inputs that would write the same report names (see _label_clashes())
+    are marked failed and not rendered.
+
+    Returns:
+        manifest dict
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = len(json_paths)
+    clashes = _label_clashes(json_paths)
+    pending = [p for p in json_paths if p not in clashes]
+    docx_templates = tuple(str(Path(t).resolve()) for t in docx_templates)
+    if docx_templates:
+        from amaran_placeholder_fill import load_template
+        for template in docx_templates:
+            load_template(template)
+
+    manifest = {
+        "generator_version": VERSION,
+        "started_at": datetime.now().isoformat(),
+        "html_only": html_only,
+        "docx_templates": [Path(t).name for t in docx_templates],
+        "workers": workers,
+        "documents": [],
+        "totals": {"completed": 0, "failed": 0},
+    }
+
+    failed = [{"source_file": str(p), "outputs": [], "status": "failed",
+               "error": error} for p, error in clashes.items()]
+    if workers > 1 and pending:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(render_batch, pending, [output_dir] * len(pending),
+                           [html_only] * len(pending),
+                           [docx_templates] * len(pending))
+    else:
+        pool = None
+        results = (render_batch(p, output_dir, html_only, docx_templates)
+                   for p in pending)
+
+    try:
+        for n, entry in enumerate(itertools.chain(failed, results), 1):
+            manifest["documents"].append(entry)
+            manifest["totals"][entry["status"]] += 1
+            label = entry.get("batch_number", Path(entry["source_file"]).name)
+            if entry["status"] == "completed":
+                print(f"  [{n}/{total}] OK      {label}")
+            else:
+                print(f"  [{n}/{total}] FAILED  {label}: {entry['error']}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    manifest["finished_at"] = datetime.now().isoformat()
+    with open(output_dir / REPORT_MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
+
+
 def main():
     parser = argparse.ArgumentParser(description=f"Amaran BPR Report Generator v{VERSION}")
-    parser.add_argument("input", help="Input JSON file")
+    parser.add_argument("input", nargs="+",
+                        help="Input JSON file(s), folder(s) or glob pattern(s)")
     parser.add_argument("--output", "-o", default=".", help="Output directory")
     parser.add_argument("--html-only", action="store_true", help="HTML only, skip PDF")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Batch mode: parallel worker processes")
+    parser.add_argument("--docx-template", action="append", default=[],
+                        help="Also fill this Word [[placeholder]] template per batch "
+                             "(repeatable; implies batch mode)")
     args = parser.parse_args()
-    
-    input_path = Path(args.input)
+
+    if (len(args.input) > 1 or not Path(args.input[0]).is_file()
+            or args.docx_template):
+        return batch_main(args)
+
+    input_path = Path(args.input[0])
     if not input_path.exists():
         print(f"Error: File not found: {input_path}")
         return 1
@@ -505,6 +778,7 @@ def main():
     
     print(f"Batch: {batch_number}")
     print(f"Product: {product_name}")
+    label = report_label(data, input_path)
     
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -513,27 +787,29 @@ def main():
     print("\nGenerating Report 1: QA Compliance Audit...")
     report1_html = generate_report1_compact(data)
     
-    report1_html_path = output_dir / f"Report1_QA_Compliance_Audit_{batch_number}.html"
+    report1_html_path = output_dir / f"Report1_QA_Compliance_Audit_{label}.html"
     with open(report1_html_path, "w", encoding="utf-8") as f:
         f.write(report1_html)
     print(f"  âœ“ HTML: {report1_html_path.name}")
     
     if not args.html_only:
-        report1_pdf_path = output_dir / f"Report1_QA_Compliance_Audit_{batch_number}.pdf"
-        generate_pdf(report1_html, report1_pdf_path)
+        report1_pdf_path = output_dir / f"Report1_QA_Compliance_Audit_{label}.pdf"
+        generate_pdf(generate_report1_compact(data, inline_css=False),
+                     report1_pdf_path)
     
     # Report 2: Page Reconciliation
     print("\nGenerating Report 2: Page Reconciliation...")
     report2_html = generate_report2_compact(data)
     
-    report2_html_path = output_dir / f"Report2_Page_Reconciliation_{batch_number}.html"
+    report2_html_path = output_dir / f"Report2_Page_Reconciliation_{label}.html"
     with open(report2_html_path, "w", encoding="utf-8") as f:
         f.write(report2_html)
     print(f"  âœ“ HTML: {report2_html_path.name}")
     
     if not args.html_only:
-        report2_pdf_path = output_dir / f"Report2_Page_Reconciliation_{batch_number}.pdf"
-        generate_pdf(report2_html, report2_pdf_path)
+        report2_pdf_path = output_dir / f"Report2_Page_Reconciliation_{label}.pdf"
+        generate_pdf(generate_report2_compact(data, inline_css=False),
+                     report2_pdf_path)
     
     print("\n" + "=" * 60)
     print("Complete!")
@@ -542,5 +818,35 @@ def main():
     return 0
 
 
+def batch_main(args):
+    """CLI entry for folder/glob input: render every batch, write manifest."""
+    json_paths = resolve_inputs(args.input)
+    if not json_paths:
+        print(f"Error: No JSON files found in {', '.join(args.input)}")
+        return 1
+
+    print("=" * 60)
+    print(f"Amaran BPR Report Generator v{VERSION} - batch mode")
+    print("=" * 60)
+    print(f"Batches: {len(json_paths)} | Workers: {args.workers}")
+    for template in args.docx_template:
+        if not Path(template).is_file():
+            print(f"Error: Template not found: {template}")
+            return 1
+        print(f"Word template: {template}")
+
+    manifest = process_batch(json_paths, args.output,
+                             html_only=args.html_only, workers=args.workers,
+                             docx_templates=args.docx_template)
+    totals = manifest["totals"]
+
+    print("\n" + "=" * 60)
+    print(f"Complete! {totals['completed']} completed, {totals['failed']} failed")
+    print(f"Manifest: {Path(args.output) / REPORT_MANIFEST_FILE}")
+    print("=" * 60)
+
+    return 1 if totals["failed"] else 0
+
+
 if __name__ == "__main__":
     exit(main())
@@ -0,0 +1,213 @@
+"""
+Tests for amaran_placeholder_fill.py against a small synthetic template.
+
+The template is built in memory (no Word needed) and covers the cases
+the regex-based rewriter has to get right: tokens split across runs,
+text-box paragraphs nested inside a run, headers, XML entities in both
+template text and values, missing keys and multi-line values.
+
+Run: python -m pytest phase3_scale/deviation_report_gen/tests -q
+"""
+
+import re
+import sys
+import json
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import unescape
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import amaran_placeholder_fill as fill  # noqa: E402
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+DOCUMENT = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:document {W}><w:body>'
+    # Token split over three runs, as Word's spell-check leaves it
+    '<w:p><w:r><w:t>Batch: [[batch_</w:t></w:r>'
+    '<w:r><w:rPr><w:b/></w:rPr><w:t>num</w:t></w:r>'
+    '<w:r><w:t>ber]] done</w:t></w:r></w:p>'
+    # Text box: its paragraph nests inside a run of the outer paragraph
+    '<w:p><w:r><w:t>Outer [[product]]</w:t></w:r>'
+    '<w:r><w:pict><w:txbxContent>'
+    '<w:p><w:r><w:t>Box [[batch_info.line]]</w:t></w:r></w:p>'
+    '</w:txbxContent></w:pict></w:r>'
+    '<w:r><w:t xml:space="preserve"> after box</w:t></w:r></w:p>'
+    # Entities in template text around a token
+    '<w:p><w:r><w:t>R&amp;D &lt;[[sponsor]]&gt;</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Notes: [[notes]]</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Unknown: [[not_in_json]]</w:t></w:r></w:p>'
+    '<w:p/>'
+    '<w:p><w:r><w:t>No tokens here</w:t></w:r></w:p>'
+    '</w:body></w:document>')
+
+HEADER = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:hdr {W}><w:p><w:r><w:t>[[</w:t></w:r><w:r><w:t>Product</w:t></w:r>'
+    '<w:r><w:t>]] | [[batch_number]]</w:t></w:r></w:p></w:hdr>')
+
+STYLES = f'<w:styles {W}><w:style w:styleId="x">[[not a part]]</w:style></w:styles>'
+
+VALUES = {
+    "batch_info": {"batch_number": "90001", "line": "L2"},
+    "product": "AX251 Tablets",
+    "sponsor": "ACME & Sons <Ltd>",
+    "notes": "first line\nsecond\tline",
+}
+
+
+def _make_template(path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr("word/document.xml", DOCUMENT)
+        zf.writestr("word/header1.xml", HEADER)
+        zf.writestr("word/styles.xml", STYLES)
+    return path
+
+
+def _paragraphs(xml):
+    """Visible text per innermost paragraph (w:br -> newline, w:tab -> tab)."""
+    xml = xml.replace("<w:br/>", "<w:t>\n</w:t>").replace("<w:tab/>", "<w:t>\t</w:t>")
+    texts = []
+    for para in re.split(r'<w:p[\s>/]', xml)[1:]:
+        text = "".join(unescape(t) for t in
+                       re.findall(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>',
+                                  para.split("</w:p>")[0]))
+        if text:
+            texts.append(text)
+    return texts
+
+
+@pytest.fixture
+def template(tmp_path):
+    return _make_template(tmp_path / "tpl.docx")
+
+
+@pytest.fixture
+def filled(template, tmp_path):
+    out = tmp_path / "out.docx"
+    result = fill.DocxTemplate(template).fill(fill.flatten_values(VALUES), out)
+    with zipfile.ZipFile(out) as zf:
+        parts = {n: zf.read(n).decode("utf-8") for n in zf.namelist()}
+    return result, parts
+
+
+def test_tokens_found_in_all_text_parts(template):
+    tpl = fill.DocxTemplate(template, use_cache=False)
+    assert tpl.tokens == {"batch_number", "product", "batch_info.line",
+                          "sponsor", "notes", "not_in_json"}
+
+
+def test_split_token(filled):
+    _, parts = filled
+    assert "Batch: 90001 done" in _paragraphs(parts["word/document.xml"])
+
+
+def test_text_box(filled):
+    _, parts = filled
+    paras = _paragraphs(parts["word/document.xml"])
+    assert "Box L2" in paras
+    # Outer paragraph text before the box; the run after it is untouched
+    assert "Outer AX251 Tablets" in paras
+    assert '<w:t xml:space="preserve"> after box</w:t>' in parts["word/document.xml"]
+
+
+def test_header(filled):
+    _, parts = filled
+    assert _paragraphs(parts["word/header1.xml"]) == ["AX251 Tablets | 90001"]
+
+
+def test_entities_round_trip(filled):
+    _, parts = filled
+    doc = parts["word/document.xml"]
+    assert "R&D <ACME & Sons <Ltd>>" in _paragraphs(doc)
+    assert "R&amp;D &lt;ACME &amp; Sons &lt;Ltd&gt;&gt;" in doc
+
+
+def test_missing_key_left_in_place(filled):
+    result, parts = filled
+    assert result["missing"] == ["not_in_json"]
+    assert "Unknown: [[not_in_json]]" in _paragraphs(parts["word/document.xml"])
+
+
+def test_multiline_value(filled):
+    _, parts = filled
+    doc = parts["word/document.xml"]
+    assert "Notes: first line\nsecond\tline" in _paragraphs(doc)
+    assert "<w:br/>" in doc and "<w:tab/>" in doc
+
+
+def test_replaced_count_and_untouched_parts(filled):
+    result, parts = filled
+    assert result["replaced"] == 7
+    assert parts["word/styles.xml"] == STYLES
+    assert parts["[Content_Types].xml"] == "<Types/>"
+
+
+def test_filled_xml_is_well_formed(filled):
+    from xml.dom.minidom import parseString
+    _, parts = filled
+    for name in ("word/document.xml", "word/header1.xml"):
+        parseString(parts[name].encode("utf-8"))
+
+
+def test_compile_part_without_tokens_is_one_literal():
+    xml = f'<w:document {W}><w:p><w:r><w:t>plain</w:t></w:r></w:p></w:document>'
+    assert fill.compile_part(xml) == [xml]
+
+
+def test_token_map_cache(template, tmp_path):
+    first = fill.DocxTemplate(template)
+    assert not first.from_cache
+    assert fill.token_map_path(template).exists()
+    second = fill.DocxTemplate(template)
+    assert second.from_cache and second.tokens == first.tokens
+
+    out_a, out_b = tmp_path / "a.docx", tmp_path / "b.docx"
+    values = fill.flatten_values(VALUES)
+    assert first.fill(values, out_a) == second.fill(values, out_b)
+    with zipfile.ZipFile(out_a) as za, zipfile.ZipFile(out_b) as zb:
+        assert all(za.read(n) == zb.read(n) for n in za.namelist())
+
+
+def test_fill_one_names_output_from_batch_number(template, tmp_path):
+    data = dict(VALUES, batch_number="B/12:3")
+    json_path = tmp_path / "in.json"
+    json_path.write_text(json.dumps(data), encoding="utf-8")
+    entry = fill.fill_one(template, json_path, tmp_path)
+    assert entry["status"] == "completed"
+    assert entry["output"] == "tpl_B_12_3.docx"
+
+
+def test_report_generator_uses_same_docx_name(template, tmp_path):
+    import amaran_report_generator_v1_3 as gen
+
+    json_path = tmp_path / "verifier.json"
+    json_path.write_text(json.dumps({"batch_info": {"batch_number": "B/12:3"}}),
+                         encoding="utf-8")
+    out_dir = tmp_path / "reports"
+    out_dir.mkdir()
+    entry = gen.render_batch(json_path, out_dir, html_only=True,
+                             docx_templates=(str(template),))
+    assert entry["status"] == "completed", entry.get("error")
+    assert "tpl_B_12_3.docx" in entry["outputs"]
+    assert fill.fill_one(template, json_path, tmp_path)["output"] == "tpl_B_12_3.docx"
+
+
+def test_fill_batch_rejects_duplicate_output_names(template, tmp_path):
+    paths = []
+    for name, batch in (("a", "B/1"), ("b", "b 1"), ("c", "B2")):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({"batch_number": batch}), encoding="utf-8")
+        paths.append(path)
+    out = tmp_path / "filled"
+
+    manifest = fill.fill_batch(template, paths, out)
+    docs = {Path(d["source_file"]).name: d for d in manifest["documents"]}
+    assert manifest["totals"] == {"completed": 1, "failed": 2}
+    assert "a.json, b.json" in docs["a.json"]["error"]
+    assert sorted(p.name for p in out.glob("*.docx")) == ["tpl_B2.docx"]
@@ -0,0 +1,44 @@
+"""
+Tests for batch-mode naming in amaran_report_generator_v1_3.py.
+
+HTML only, so WeasyPrint is not needed.
+
+Run: python -m pytest phase3_scale/deviation_report_gen/tests -q
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import amaran_report_generator_v1_3 as gen  # noqa: E402
+
+
+def _write(path, batch_info):
+    path.write_text(json.dumps({"batch_info": batch_info}), encoding="utf-8")
+    return path
+
+
+def test_duplicate_labels_fail_before_rendering(tmp_path):
+    a = _write(tmp_path / "a.json", {"batch_number": "B/1"})
+    b = _write(tmp_path / "b.json", {"batch_number": "B 1"})   # same label B_1
+    c = _write(tmp_path / "c.json", {"batch_number": "B2"})
+    out = tmp_path / "out"
+
+    manifest = gen.process_batch([a, b, c], out, html_only=True)
+    status = {Path(d["source_file"]).name: d for d in manifest["documents"]}
+    assert manifest["totals"] == {"completed": 1, "failed": 2}
+    assert "a.json, b.json" in status["a.json"]["error"]
+    assert status["c.json"]["status"] == "completed"
+    assert sorted(p.name for p in out.glob("*.html")) == [
+        "Report1_QA_Compliance_Audit_B2.html",
+        "Report2_Page_Reconciliation_B2.html"]
+
+
+def test_missing_batch_number_uses_json_stem(tmp_path):
+    a = _write(tmp_path / "lot_a.json", {})
+    b = _write(tmp_path / "lot_b.json", {})
+    manifest = gen.process_batch([a, b], tmp_path / "out", html_only=True)
+    assert manifest["totals"] == {"completed": 2, "failed": 0}
+    assert "Report1_QA_Compliance_Audit_lot_b.html" in manifest["documents"][1]["outputs"]